@@ -0,0 +1,298 @@
+import os
+import logging
+import time
+import queue
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCAN_WORKERS = 4
+# Files handed from the directory walkers to the diff in one item
+_CHUNK_SIZE = 1000
+# Chunks waiting to be diffed; bounds memory regardless of tree size
+_CHUNK_QUEUE_SIZE = 64
+# Snapshot rows written per transaction
+_FLUSH_EVERY = 1000
+
+# (size, mtime_ns, inode)
+FileState = Tuple[int, int, int]
+
+
+def file_state(st: os.stat_result) -> FileState:
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class SnapshotStore:
+    """Persisted path -> (size, mtime, inode) map of one watched tree.
+
+    Rows live in a standalone SQLite file and are only looked up one path at
+    a time, so memory use does not depend on the number of files. Changes
+    are buffered and written in batches; ``close()`` writes the rest.
+    Every row carries the generation of the scan (or live event) that last
+    saw it, which is how files missing from a completed scan are found.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, seen INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_files_seen ON files (seen)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # path -> (state, generation) to upsert, or None to delete
+        self._pending: Dict[str, Optional[Tuple[FileState, int]]] = {}
+        self.generation = self._meta('generation')
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key: str, value: int) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        self._conn.commit()
+
+    def has_baseline(self) -> bool:
+        """Whether a scan ever ran to completion; until then scans only record state."""
+        with self._lock:
+            return self._meta('completed') > 0
+
+    def begin_scan(self) -> int:
+        with self._lock:
+            self.generation += 1
+            self._set_meta('generation', self.generation)
+            return self.generation
+
+    def complete_scan(self, generation: int) -> None:
+        with self._lock:
+            self._flush()
+            self._set_meta('completed', generation)
+
+    def lookup(self, path: str) -> Optional[FileState]:
+        with self._lock:
+            if path in self._pending:
+                pending = self._pending[path]
+                return pending[0] if pending else None
+            row = self._conn.execute("SELECT size, mtime_ns, inode FROM files WHERE path = ?", (path,)).fetchone()
+            return tuple(row) if row else None
+
+    def mark(self, path: str, state: FileState) -> None:
+        """Record ``path`` as seen in the current generation."""
+        with self._lock:
+            self._pending[path] = (state, self.generation)
+            if len(self._pending) >= _FLUSH_EVERY:
+                self._flush()
+
+    def forget(self, path: str) -> None:
+        with self._lock:
+            self._pending[path] = None
+            if len(self._pending) >= _FLUSH_EVERY:
+                self._flush()
+
+    def stale(self, generation: int) -> Iterator[str]:
+        """Paths not seen since before ``generation``, in batches of rows."""
+        with self._lock:
+            self._flush()
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT path FROM files WHERE seen < ? AND path > ? ORDER BY path LIMIT ?",
+                    (generation, last, _FLUSH_EVERY)
+                ).fetchall()
+            if not rows:
+                return
+            for (path,) in rows:
+                yield path
+            last = rows[-1][0]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        upserts = [(path, *item[0], item[1]) for path, item in self._pending.items() if item is not None]
+        deletes = [(path,) for path, item in self._pending.items() if item is None]
+        self._pending = {}
+        try:
+            if upserts:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, seen) VALUES (?, ?, ?, ?, ?)", upserts
+                )
+            if deletes:
+                self._conn.executemany("DELETE FROM files WHERE path = ?", deletes)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Snapshot write failed: %s", e)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+
+class CatchUpScan:
+    """Diff a watched tree against its snapshot and replay what was missed.
+
+    Directories are listed with ``os.scandir`` by ``workers`` threads; one
+    diff thread compares each tracked file with the snapshot and calls
+    ``emit(event_type, path)`` for created and modified files and, once the
+    walk completed, for snapshot entries that no longer exist. The first
+    scans, until one completes, only record a baseline.
+    """
+
+    def __init__(self, root: str, snapshot: SnapshotStore, emit: Callable[[str, str], None],
+                 should_track: Callable[[str], bool], recursive: bool = True,
+                 workers: int = DEFAULT_SCAN_WORKERS, name: str = "catchup"):
+        self.root = root
+        self.snapshot = snapshot
+        self.emit = emit
+        self.should_track = should_track
+        self.recursive = recursive
+        self.workers = max(1, int(workers))
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"files": 0, "created": 0, "modified": 0, "deleted": 0, "errors": 0}
+
+    def start(self) -> "CatchUpScan":
+        """Start scanning; call before live events can update the snapshot."""
+        # Files changed from here on are reported by the live observer
+        self._cutoff_ns = time.time_ns()
+        self._baseline = not self.snapshot.has_baseline()
+        self._generation = self.snapshot.begin_scan()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Abandon the scan; files already diffed stay recorded in the snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        started = time.time()
+        baseline = self._baseline
+        try:
+            complete = self._walk(self._cutoff_ns, baseline)
+            if complete and not baseline:
+                for path in self.snapshot.stale(self._generation):
+                    if self._stop.is_set():
+                        break
+                    if os.path.lexists(path):
+                        # Changed after the scan started and handled live
+                        continue
+                    self.snapshot.forget(path)
+                    self.stats["deleted"] += 1
+                    self.emit("deleted", path)
+            if complete and not self._stop.is_set():
+                self.snapshot.complete_scan(self._generation)
+            else:
+                self.snapshot.flush()
+        except Exception as e:
+            logger.error("❌ Catch-up scan of %s failed: %s", self.root, e)
+            return
+        action = "recorded baseline of" if baseline else "diffed"
+        state = "" if complete else " (interrupted)"
+        logger.info("🔎 Catch-up scan %s %s%s in %.1fs: %s", action, self.root, state, time.time() - started, self.stats)
+
+    def _walk(self, cutoff_ns: int, baseline: bool) -> bool:
+        directories: "queue.LifoQueue[Optional[str]]" = queue.LifoQueue()
+        chunks: "queue.Queue[Optional[List[Tuple[str, FileState]]]]" = queue.Queue(maxsize=_CHUNK_QUEUE_SIZE)
+        pending = [1]  # directories queued or being listed
+        pending_lock = threading.Lock()
+        directories.put(self.root)
+
+        def put(item) -> bool:
+            while not self._stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_directories() -> None:
+            while True:
+                directory = directories.get()
+                if directory is None:
+                    return
+                chunk: List[Tuple[str, FileState]] = []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if self._stop.is_set():
+                                break
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    if self.recursive:
+                                        with pending_lock:
+                                            pending[0] += 1
+                                        directories.put(entry.path)
+                                    continue
+                                if not self.should_track(entry.path):
+                                    continue
+                                st = entry.stat()
+                            except OSError:
+                                self.stats["errors"] += 1
+                                continue
+                            if st.st_mtime_ns >= cutoff_ns:
+                                continue
+                            chunk.append((entry.path, file_state(st)))
+                            if len(chunk) >= _CHUNK_SIZE:
+                                put(chunk)
+                                chunk = []
+                except OSError:
+                    self.stats["errors"] += 1
+                if chunk:
+                    put(chunk)
+                with pending_lock:
+                    pending[0] -= 1
+                    done = pending[0] == 0
+                if done or self._stop.is_set():
+                    # Walk finished: release the other listers and the diff
+                    for _ in range(self.workers):
+                        directories.put(None)
+                    put(None)
+
+        listers = [
+            threading.Thread(target=list_directories, name=f"{self.name}-list-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for lister in listers:
+            lister.start()
+
+        while True:
+            try:
+                chunk = chunks.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+                continue
+            if chunk is None:
+                break
+            for path, state in chunk:
+                self.stats["files"] += 1
+                previous = self.snapshot.lookup(path)
+                self.snapshot.mark(path, state)
+                if baseline or previous == state:
+                    continue
+                event_type = "created" if previous is None or previous[2] != state[2] else "modified"
+                self.stats[event_type] += 1
+                self.emit(event_type, path)
+                if self._stop.is_set():
+                    break
+        for lister in listers:
+            lister.join(timeout=1)
+        return not self._stop.is_set()
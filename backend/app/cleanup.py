@@ -0,0 +1,240 @@
+import os
+import logging
+import time
+import queue
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import select, delete, func
+from .db import SessionLocal
+from .models import Event, Watcher
+
+logger = logging.getLogger(__name__)
+
+# Rows removed per DELETE statement; each chunk is its own short transaction
+# so watcher writers and API readers are never locked out for long
+DELETE_CHUNK_SIZE = int(os.getenv("WATCHER_DELETE_CHUNK_SIZE", "5000"))
+# Pause between chunks to leave the write lock to watcher processes
+DELETE_CHUNK_PAUSE_MS = int(os.getenv("WATCHER_DELETE_CHUNK_PAUSE_MS", "20"))
+# Finished jobs kept for progress queries
+MAX_FINISHED_JOBS = 100
+
+
+class CleanupJob:
+    """Progress of one background deletion."""
+
+    def __init__(self, job_id: int, kind: str, watcher_id: Optional[int] = None,
+                 max_event_id: Optional[int] = None):
+        self.id = job_id
+        self.kind = kind  # "watcher" | "orphans" | "retention"
+        self.watcher_id = watcher_id
+        # Upper bound for a watcher job: SQLite may hand a deleted watcher's
+        # id to a new watcher, whose events must survive
+        self.max_event_id = max_event_id
+        self.status = "queued"  # queued | running | done | failed
+        self.total: Optional[int] = None
+        self.deleted = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "watcher_id": self.watcher_id,
+            "status": self.status,
+            "total": self.total,
+            "deleted": self.deleted,
+            "progress": round(self.deleted / self.total, 4) if self.total else (1.0 if self.status == "done" else 0.0),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _delete_chunk(db, watcher_id: int, max_event_id: Optional[int], chunk_size: int) -> int:
+    ids = select(Event.id).where(Event.watcher_id == watcher_id)
+    if max_event_id is not None:
+        ids = ids.where(Event.id <= max_event_id)
+    ids = ids.order_by(Event.id).limit(chunk_size)
+    result = db.execute(delete(Event).where(Event.id.in_(ids.scalar_subquery())))
+    db.commit()
+    return result.rowcount or 0
+
+
+def delete_events_for_watcher(watcher_id: int, max_event_id: Optional[int] = None,
+                              chunk_size: int = DELETE_CHUNK_SIZE, job: Optional[CleanupJob] = None) -> int:
+    """Delete a watcher's events in chunks of ``chunk_size`` rows, one transaction each."""
+    deleted = 0
+    db = SessionLocal()
+    try:
+        while True:
+            count = _delete_chunk(db, watcher_id, max_event_id, chunk_size)
+            deleted += count
+            if job is not None:
+                job.deleted += count
+            if count < chunk_size:
+                return deleted
+            if DELETE_CHUNK_PAUSE_MS:
+                time.sleep(DELETE_CHUNK_PAUSE_MS / 1000.0)
+    finally:
+        db.close()
+
+
+def orphaned_watcher_ids() -> List[int]:
+    """Watcher ids that still have events but no longer exist."""
+    db = SessionLocal()
+    try:
+        # DISTINCT walks the watcher_id index instead of loading events
+        existing = select(Watcher.id)
+        return list(db.execute(
+            select(Event.watcher_id).distinct().where(Event.watcher_id.not_in(existing))
+        ).scalars())
+    finally:
+        db.close()
+
+
+def _count_events(watcher_ids: List[int], max_event_id: Optional[int] = None) -> int:
+    if not watcher_ids:
+        return 0
+    db = SessionLocal()
+    try:
+        query = select(func.count()).select_from(Event).where(Event.watcher_id.in_(watcher_ids))
+        if max_event_id is not None:
+            query = query.where(Event.id <= max_event_id)
+        return db.execute(query).scalar() or 0
+    finally:
+        db.close()
+
+
+class CleanupQueue:
+    """Runs deletion jobs one at a time on a background thread.
+
+    Jobs only live in memory. Rows left behind by a job interrupted by a
+    restart belong to watchers that no longer exist, so the orphan cleanup
+    run at startup picks them up.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[int, CleanupJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, kind: str, run: Callable[[CleanupJob], None], watcher_id: Optional[int] = None,
+               max_event_id: Optional[int] = None) -> CleanupJob:
+        """Queue ``run(job)``; a job of a kind already waiting or running is reused."""
+        with self._lock:
+            if watcher_id is None:
+                for job in self._jobs.values():
+                    if job.kind == kind and job.status in ("queued", "running"):
+                        return job
+            job = CleanupJob(next(self._ids), kind, watcher_id, max_event_id)
+            self._jobs[job.id] = job
+            self._trim()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cleanup-jobs", daemon=True)
+                self._thread.start()
+        self._queue.put((job, run))
+        return job
+
+    def delete_watcher_events(self, watcher_id: int, max_event_id: Optional[int]) -> CleanupJob:
+        return self.submit("watcher", _delete_watcher_job, watcher_id, max_event_id)
+
+    def delete_orphans(self) -> CleanupJob:
+        return self.submit("orphans", _delete_orphans_job)
+
+    def get(self, job_id: int) -> Optional[CleanupJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[CleanupJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id, reverse=True)
+
+    def _trim(self) -> None:
+        finished = sorted(job.id for job in self._jobs.values() if job.status in ("done", "failed"))
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self) -> None:
+        while True:
+            job, run = self._queue.get()
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            try:
+                run(job)
+                job.status = "done"
+            except Exception as e:
+                logger.error("❌ Cleanup job %s failed: %s", job.id, e)
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now(timezone.utc)
+
+
+def _delete_watcher_job(job: CleanupJob) -> None:
+    job.total = _count_events([job.watcher_id], job.max_event_id)
+    delete_events_for_watcher(job.watcher_id, job.max_event_id, job=job)
+    logger.info("🧹 Deleted %s events of watcher %s", job.deleted, job.watcher_id)
+
+
+def _delete_orphans_job(job: CleanupJob) -> None:
+    from .counters import delete_counters
+
+    watcher_ids = orphaned_watcher_ids()
+    job.total = _count_events(watcher_ids)
+    for watcher_id in watcher_ids:
+        delete_events_for_watcher(watcher_id, job=job)
+    db = SessionLocal()
+    try:
+        delete_counters(db, watcher_ids)
+        db.commit()
+    finally:
+        db.close()
+    if job.deleted:
+        logger.info("✅ Cleaned up %s orphaned events", job.deleted)
+    else:
+        logger.info("ℹ️  No orphaned events found")
+
+
+cleanup_jobs = CleanupQueue()
+
+
+class PeriodicJob:
+    """Queue a ``kind`` job on the cleanup queue every ``interval_s`` seconds.
+
+    The first job is queued on ``start()``, or one interval later with
+    ``run_on_start=False``.
+    """
+
+    def __init__(self, kind: str, run: Callable[[CleanupJob], None], interval_s: int, run_on_start: bool = True):
+        self.kind = kind
+        self.run = run
+        self.interval_s = interval_s
+        self.run_on_start = run_on_start
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval_s <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.kind, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        if not self.run_on_start and self._stop.wait(self.interval_s):
+            return
+        while True:
+            cleanup_jobs.submit(self.kind, self.run)
+            if self._stop.wait(self.interval_s):
+                return
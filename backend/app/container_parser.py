@@ -0,0 +1,611 @@
+import os
+import sys
+import struct
+import logging
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .schemas import VideoMetadataConfig
+from .probe import BudgetedReader
+
+logger = logging.getLogger(__name__)
+
+# Names from the default field lists that MediaInfo has no attribute for; a
+# MediaInfo parse never fills them either, so they do not force a fallback
+NOT_MEDIAINFO_FIELDS = frozenset({"codec_name", "format_name", "channels", "sample_rate"})
+
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+MATROSKA_EXTENSIONS = {".mkv", ".webm"}
+
+MP4_VIDEO_FORMATS = {
+    "avc1": "AVC", "avc3": "AVC", "hvc1": "HEVC", "hev1": "HEVC", "av01": "AV1", "vp09": "VP9",
+    "mp4v": "MPEG-4 Visual",
+    "apch": "ProRes", "apcn": "ProRes", "apcs": "ProRes", "apco": "ProRes", "ap4h": "ProRes", "ap4x": "ProRes",
+}
+MP4_AUDIO_FORMATS = {"mp4a": "AAC", "ac-3": "AC-3", "ec-3": "E-AC-3", "lpcm": "PCM", "sowt": "PCM", "twos": "PCM"}
+MATROSKA_VIDEO_FORMATS = {
+    "V_MPEG4/ISO/AVC": "AVC", "V_MPEGH/ISO/HEVC": "HEVC", "V_AV1": "AV1", "V_VP8": "VP8", "V_VP9": "VP9",
+    "V_MPEG4/ISO/ASP": "MPEG-4 Visual", "V_MPEG2": "MPEG Video", "V_PRORES": "ProRes",
+}
+MATROSKA_AUDIO_FORMATS = {
+    "A_AAC": "AAC", "A_AC3": "AC-3", "A_EAC3": "E-AC-3", "A_DTS": "DTS", "A_OPUS": "Opus",
+    "A_VORBIS": "Vorbis", "A_FLAC": "Flac", "A_MPEG/L3": "MPEG Audio", "A_PCM/INT/LIT": "PCM",
+}
+AAC_LC = 2
+
+
+class Track:
+    """Stand-in for a pymediainfo track built from container headers.
+
+    Like pymediainfo, any attribute without a value reads as None. ``fields``
+    holds only what the parser is authoritative about, i.e. values computed
+    the way MediaInfo computes them; a None there means MediaInfo would
+    report nothing either.
+    """
+
+    def __init__(self, track_type: str, **fields: Any):
+        self.track_type = track_type
+        self.fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        return self.__dict__.get("fields", {}).get(name)
+
+    def __repr__(self) -> str:
+        return f"Track({self.track_type!r}, {self.fields!r})"
+
+
+def _ratio(value: float) -> str:
+    return "%.3f" % value
+
+
+def _ms(seconds: float) -> int:
+    return int(round(seconds * 1000))
+
+
+def _general(format_: str, file_size: int, duration_s: Optional[float], video: List[Track],
+             **fields: Any) -> Track:
+    general = Track("General", format=format_, file_size=file_size, **fields)
+    if duration_s:
+        duration = _ms(duration_s)
+        general.fields["duration"] = duration
+        if duration:
+            general.fields["overall_bit_rate"] = int(round(file_size * 8000 / duration))
+    if not video:
+        general.fields["frame_rate"] = None
+    elif "frame_rate" in video[0].fields:
+        general.fields["frame_rate"] = video[0].fields["frame_rate"]
+    return general
+
+
+def _aspect(track: Track, width: int, height: int, par: Optional[float] = None,
+            dar: Optional[float] = None) -> None:
+    if not width or not height:
+        return
+    if dar is None:
+        dar = width * (par or 1.0) / height
+    if par is None:
+        par = dar * height / width
+    track.fields["pixel_aspect_ratio"] = _ratio(par)
+    track.fields["display_aspect_ratio"] = _ratio(dar)
+
+
+# ---------------------------------------------------------------- MP4 / MOV
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """(type, payload start, payload end) of the boxes in ``data[start:end]``."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _child(data: bytes, start: int, end: int, *path: bytes) -> Optional[Tuple[int, int]]:
+    for kind in path:
+        for child, child_start, child_end in _boxes(data, start, end):
+            if child == kind:
+                start, end = child_start, child_end
+                break
+        else:
+            return None
+    return start, end
+
+
+def _read_mp4_header(f: BinaryIO, size: int, max_bytes: int) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """Major brand and ``moov`` payload, seeking over ``mdat`` and anything else."""
+    brand = moov = None
+    pos = 0
+    while pos + 8 <= size:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            break
+        box_size, kind = struct.unpack_from(">I4s", header)
+        header_len = 8
+        if box_size == 1 and len(header) == 16:
+            box_size = struct.unpack_from(">Q", header, 8)[0]
+            header_len = 16
+        elif box_size == 0:
+            box_size = size - pos
+        if box_size < header_len:
+            break
+        if kind == b"ftyp" and len(header) >= 12:
+            brand = header[8:12]
+        elif kind == b"moov":
+            if box_size - header_len > max_bytes:
+                return brand, None
+            f.seek(pos + header_len)
+            moov = f.read(box_size - header_len)
+            break
+        elif kind == b"moof":
+            break
+        pos += box_size
+    return brand, moov
+
+
+def _stream_size(data: bytes, start: int, end: int) -> Tuple[int, int]:
+    """(sample count, total bytes) from an ``stsz`` box."""
+    sample_size, count = struct.unpack_from(">II", data, start + 4)
+    if sample_size:
+        return count, sample_size * count
+    sizes = array("I")
+    sizes.frombytes(data[start + 12:start + 12 + 4 * count])
+    if sys.byteorder == "little":
+        sizes.byteswap()
+    return count, sum(sizes)
+
+
+def _esds(data: bytes, start: int, end: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(objectTypeIndication, audio object type, channel configuration) from an ``esds`` box."""
+    pos = start + 4
+    oti = aot = channels = None
+
+    def descriptor(pos: int) -> Tuple[int, int, int]:
+        tag = data[pos]
+        length = 0
+        pos += 1
+        for _ in range(4):
+            byte = data[pos]
+            pos += 1
+            length = (length << 7) | (byte & 0x7F)
+            if not byte & 0x80:
+                break
+        return tag, pos, length
+
+    try:
+        tag, pos, _ = descriptor(pos)
+        if tag != 0x03:
+            return None, None, None
+        flags = data[pos + 2]
+        pos += 3 + (2 if flags & 0x80 else 0)
+        if flags & 0x40:
+            pos += 1 + data[pos]
+        pos += 2 if flags & 0x20 else 0
+        tag, pos, _ = descriptor(pos)
+        if tag != 0x04:
+            return None, None, None
+        oti = data[pos]
+        tag, pos, _ = descriptor(pos + 13)
+        if tag == 0x05:
+            bits = int.from_bytes(data[pos:pos + 4], "big")
+            aot = bits >> 27
+            offset = 5
+            if aot == 31:
+                aot = 32 + ((bits >> 21) & 0x3F)
+                offset = 11
+            index = (bits >> (32 - offset - 4)) & 0xF
+            offset += 4 + (24 if index == 0xF else 0)
+            if offset + 4 <= 32:
+                channels = (bits >> (32 - offset - 4)) & 0xF
+    except IndexError:
+        pass
+    return oti, aot, channels
+
+
+def _mp4_track(data: bytes, start: int, end: int, movie_timescale: int) -> Optional[Track]:
+    tkhd = _child(data, start, end, b"tkhd")
+    mdhd = _child(data, start, end, b"mdia", b"mdhd")
+    hdlr = _child(data, start, end, b"mdia", b"hdlr")
+    stbl = _child(data, start, end, b"mdia", b"minf", b"stbl")
+    if not (tkhd and mdhd and hdlr and stbl):
+        return None
+    handler = data[hdlr[0] + 8:hdlr[0] + 12]
+    if handler not in (b"vide", b"soun"):
+        return None
+
+    version = data[tkhd[0]]
+    if version == 1:
+        track_id, duration = struct.unpack_from(">I4xQ", data, tkhd[0] + 20)
+        tail = tkhd[0] + 36
+    else:
+        track_id, duration = struct.unpack_from(">I4xI", data, tkhd[0] + 12)
+        tail = tkhd[0] + 24
+    matrix = struct.unpack_from(">9i", data, tail + 16)
+    display_width, display_height = (value / 65536 for value in struct.unpack_from(">II", data, tail + 52))
+    timescale = struct.unpack_from(">I", data, mdhd[0] + (20 if data[mdhd[0]] == 1 else 12))[0]
+
+    stsd = _child(data, *stbl, b"stsd")
+    entries = list(_boxes(data, stsd[0] + 8, stsd[1])) if stsd else []
+    if not entries or not timescale:
+        return None
+    fourcc, entry_start, entry_end = entries[0]
+    codec_id = fourcc.decode("latin-1")
+
+    track = Track("Video" if handler == b"vide" else "Audio", track_id=track_id, codec_id=codec_id)
+    # Track durations come from tkhd, in movie time units, not from mdhd
+    duration_ms = _ms(duration / movie_timescale) if movie_timescale else None
+    if duration_ms is not None:
+        track.fields["duration"] = duration_ms
+
+    stts = _child(data, *stbl, b"stts")
+    stsz = _child(data, *stbl, b"stsz")
+    count = stream_size = frame_rate = None
+    if stsz:
+        count, stream_size = _stream_size(data, *stsz)
+    if stts and count:
+        entry_count = struct.unpack_from(">I", data, stts[0] + 4)[0]
+        deltas = {struct.unpack_from(">I", data, stts[0] + 12 + 8 * i)[0] for i in range(entry_count)}
+        # Variable frame durations are averaged with heuristics this parser does not mirror
+        if len(deltas) == 1:
+            frame_rate = _ratio(timescale / deltas.pop())
+
+    if handler == b"vide":
+        format_ = MP4_VIDEO_FORMATS.get(codec_id)
+        children = dict((kind, (s, e)) for kind, s, e in _boxes(data, entry_start + 78, entry_end))
+        if codec_id == "mp4v" and b"esds" in children and _esds(data, *children[b"esds"])[0] != 0x20:
+            format_ = None
+        if format_:
+            track.fields["format"] = format_
+        width, height = struct.unpack_from(">HH", data, entry_start + 24)
+        track.fields.update(width=width, height=height)
+        if count is not None:
+            track.fields["frame_count"] = str(count)
+        if frame_rate:
+            # For video, the duration behind bit_rate is frame_count over the rounded frame rate
+            track.fields.update(frame_rate=frame_rate,
+                                bit_rate=int(round(stream_size * 8 * float(frame_rate) / count)))
+        identity = matrix[1] == matrix[3] == 0 and matrix[0] > 0 and matrix[4] > 0
+        display_differs = display_width and display_height and (display_width, display_height) != (width, height)
+        if b"pasp" in children:
+            h_spacing, v_spacing = struct.unpack_from(">II", data, children[b"pasp"][0])
+            if h_spacing and v_spacing and h_spacing != v_spacing:
+                if display_differs and identity:
+                    _aspect(track, width, height, par=h_spacing / v_spacing, dar=display_width / display_height)
+                elif not display_differs:
+                    _aspect(track, width, height, par=h_spacing / v_spacing)
+            elif not display_differs:
+                _aspect(track, width, height)
+        elif display_differs:
+            if identity:
+                _aspect(track, width, height, dar=display_width / display_height)
+        else:
+            _aspect(track, width, height)
+        return track
+
+    format_ = MP4_AUDIO_FORMATS.get(codec_id)
+    sound_version = struct.unpack_from(">H", data, entry_start + 8)[0]
+    channels, sample_size = struct.unpack_from(">HH", data, entry_start + 16)
+    sample_rate = struct.unpack_from(">I", data, entry_start + 24)[0] >> 16
+    child_offset = entry_start + {0: 28, 1: 44, 2: 64}.get(sound_version, 28)
+    children = dict((kind, (s, e)) for kind, s, e in _boxes(data, child_offset, entry_end))
+    bit_rate = int(round(stream_size * 8000 / duration_ms)) if stream_size and duration_ms else None
+    if codec_id == "mp4a":
+        oti, aot, config_channels = _esds(data, *children[b"esds"]) if b"esds" in children else (None, None, None)
+        # Only plain AAC-LC: SBR/PS variants are reported with derived rates and channels
+        if oti != 0x40 or aot != AAC_LC:
+            return track
+        track.fields.update(format=format_, codec_id=f"mp4a-40-{aot}", channel_s=config_channels or channels,
+                            sampling_rate=sample_rate)
+        if bit_rate:
+            track.fields["bit_rate"] = bit_rate
+    elif codec_id in ("ac-3", "ec-3"):
+        track.fields.update(format=format_, sampling_rate=sample_rate)
+        # Channels are read from the frames themselves, which a header parse does not reach
+        if codec_id == "ac-3" and bit_rate:
+            track.fields["bit_rate"] = bit_rate
+    elif format_ == "PCM" and sound_version in (0, 1):
+        track.fields.update(format=format_, channel_s=channels, sampling_rate=sample_rate,
+                            bit_rate=channels * sample_rate * sample_size)
+    return track
+
+
+def parse_mp4(f: BinaryIO, file_size: int, max_bytes: int) -> Optional[List[Track]]:
+    brand, moov = _read_mp4_header(f, file_size, max_bytes)
+    if moov is None or _child(moov, 0, len(moov), b"mvex"):
+        # Missing, oversized, or fragmented (durations live in the fragments)
+        return None
+    mvhd = _child(moov, 0, len(moov), b"mvhd")
+    if not mvhd:
+        return None
+    if moov[mvhd[0]] == 1:
+        timescale, duration = struct.unpack_from(">IQ", moov, mvhd[0] + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", moov, mvhd[0] + 12)
+    video, audio = [], []
+    for kind, start, end in _boxes(moov):
+        if kind != b"trak":
+            continue
+        track = _mp4_track(moov, start, end, timescale)
+        if track is not None:
+            (video if track.track_type == "Video" else audio).append(track)
+    general_fields = {"codec_id": brand.decode("latin-1")} if brand else {}
+    general = _general("MPEG-4", file_size, duration / timescale if timescale else None, video, **general_fields)
+    return [general, *video, *audio]
+
+
+# ---------------------------------------------------------------- Matroska
+
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD, SEEK, SEEK_ID, SEEK_POSITION = 0x114D9B74, 0x4DBB, 0x53AB, 0x53AC
+INFO, TIMECODE_SCALE, DURATION = 0x1549A966, 0x2AD7B1, 0x4489
+TRACKS, TRACK_ENTRY = 0x1654AE6B, 0xAE
+CLUSTER = 0x1F43B675
+UNKNOWN_SIZE = -1
+
+
+def _vint(data: bytes, pos: int, strip: bool) -> Tuple[int, int]:
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8:
+        raise ValueError("Invalid EBML variable-size integer")
+    value = first & (mask - 1) if strip else first
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    if strip and value == (1 << (7 * length)) - 1:
+        value = UNKNOWN_SIZE
+    return value, pos + length
+
+
+def _elements(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """(id, payload start, payload end) of the EBML elements in ``data[start:end]``."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos < end:
+        element_id, pos = _vint(data, pos, strip=False)
+        size, pos = _vint(data, pos, strip=True)
+        if size == UNKNOWN_SIZE or pos + size > end:
+            return
+        yield element_id, pos, pos + size
+        pos += size
+
+
+def _uint(data: bytes, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def _float(data: bytes, start: int, end: int) -> Optional[float]:
+    if end - start == 8:
+        return struct.unpack_from(">d", data, start)[0]
+    if end - start == 4:
+        return struct.unpack_from(">f", data, start)[0]
+    return None
+
+
+def _read_element(f: BinaryIO, pos: int, file_size: int) -> Optional[Tuple[int, int, int]]:
+    """(id, payload offset, payload size) of the element at ``pos``; size is UNKNOWN_SIZE if unknown."""
+    if pos >= file_size:
+        return None
+    f.seek(pos)
+    header = f.read(12)
+    try:
+        element_id, offset = _vint(header, 0, strip=False)
+        size, offset = _vint(header, offset, strip=True)
+    except (IndexError, ValueError):
+        return None
+    return element_id, pos + offset, size
+
+
+def _audio_object_type(data: bytes, start: int, end: int) -> Optional[int]:
+    """Object type at the start of an AudioSpecificConfig, with the 31 escape."""
+    if end - start < 2:
+        return None
+    aot = data[start] >> 3
+    if aot == 31:
+        aot = 32 + (((data[start] & 0x07) << 3) | (data[start + 1] >> 5))
+    return aot
+
+
+def _matroska_track(data: bytes, start: int, end: int) -> Optional[Track]:
+    values: Dict[int, Tuple[int, int]] = {child: (s, e) for child, s, e in _elements(data, start, end)}
+    if 0x83 not in values or 0x86 not in values:
+        return None
+    track_type = _uint(data, *values[0x83])
+    codec_id = data[values[0x86][0]:values[0x86][1]].rstrip(b"\0").decode("ascii", "replace")
+    track_id = _uint(data, *values[0xD7]) if 0xD7 in values else None
+
+    if track_type == 1 and 0xE0 in values:
+        video = {child: (s, e) for child, s, e in _elements(data, *values[0xE0])}
+        track = Track("Video", track_id=track_id, codec_id=codec_id)
+        if codec_id in MATROSKA_VIDEO_FORMATS:
+            track.fields["format"] = MATROSKA_VIDEO_FORMATS[codec_id]
+        if 0x23E383 in values:
+            default_duration = _uint(data, *values[0x23E383])
+            if default_duration:
+                track.fields["frame_rate"] = _ratio(1e9 / default_duration)
+        cropped = any(child in video for child in (0x54AA, 0x54BB, 0x54CC, 0x54DD))
+        if 0xB0 in video and 0xBA in video and not cropped:
+            width, height = _uint(data, *video[0xB0]), _uint(data, *video[0xBA])
+            track.fields.update(width=width, height=height)
+            if 0x54B0 in video and 0x54BA in video:
+                display_width, display_height = _uint(data, *video[0x54B0]), _uint(data, *video[0x54BA])
+                if display_width and display_height:
+                    _aspect(track, width, height, dar=display_width / display_height)
+            else:
+                _aspect(track, width, height)
+        return track
+
+    if track_type == 2 and 0xE1 in values:
+        audio = {child: (s, e) for child, s, e in _elements(data, *values[0xE1])}
+        format_ = MATROSKA_AUDIO_FORMATS.get(codec_id)
+        aot = _audio_object_type(data, *values[0x63A2]) if codec_id == "A_AAC" and 0x63A2 in values else None
+        if aot is not None:
+            # MediaInfo appends the object type from CodecPrivate, e.g. A_AAC-2
+            codec_id = f"{codec_id}-{aot}"
+        track = Track("Audio", track_id=track_id, codec_id=codec_id)
+        if format_:
+            track.fields["format"] = format_
+        if aot is not None and aot != AAC_LC:
+            # SBR/PS variants are reported with derived rates and channels
+            return track
+        track.fields["channel_s"] = _uint(data, *audio[0x9F]) if 0x9F in audio else 1
+        if 0xB5 in audio:
+            sampling_rate = _float(data, *audio[0xB5])
+            if sampling_rate and sampling_rate.is_integer():
+                track.fields["sampling_rate"] = int(sampling_rate)
+        return track
+    return None
+
+
+def parse_matroska(f: BinaryIO, file_size: int, max_bytes: int) -> Optional[List[Track]]:
+    header = _read_element(f, 0, file_size)
+    if header is None or header[0] != EBML_HEADER or header[2] in (UNKNOWN_SIZE, 0) or header[2] > 4096:
+        return None
+    f.seek(header[1])
+    ebml = f.read(header[2])
+    doc_types = [ebml[s:e] for child, s, e in _elements(ebml) if child == 0x4282]
+    format_ = {b"matroska": "Matroska", b"webm": "WebM"}.get(doc_types[0] if doc_types else b"matroska")
+    segment = _read_element(f, header[1] + header[2], file_size)
+    if format_ is None or segment is None or segment[0] != SEGMENT:
+        return None
+    segment_start = segment[1]
+    segment_end = file_size if segment[2] == UNKNOWN_SIZE else min(file_size, segment_start + segment[2])
+
+    # Level-1 elements up to the first cluster; SeekHead covers the rest
+    found: Dict[int, bytes] = {}
+    seeks: Dict[int, int] = {}
+    budget = max_bytes
+    pos = segment_start
+    while pos < segment_end and not (INFO in found and TRACKS in found):
+        element = _read_element(f, pos, segment_end)
+        if element is None or element[0] == CLUSTER or element[2] == UNKNOWN_SIZE:
+            break
+        element_id, offset, size = element
+        if element_id in (SEEK_HEAD, INFO, TRACKS) and element_id not in found:
+            if size > budget:
+                return None
+            budget -= size
+            f.seek(offset)
+            found[element_id] = f.read(size)
+            if element_id == SEEK_HEAD:
+                for seek_id, s, e in _elements(found[SEEK_HEAD]):
+                    if seek_id != SEEK:
+                        continue
+                    entry = {child: found[SEEK_HEAD][cs:ce] for child, cs, ce in _elements(found[SEEK_HEAD], s, e)}
+                    if SEEK_ID in entry and SEEK_POSITION in entry:
+                        seeks[int.from_bytes(entry[SEEK_ID], "big")] = int.from_bytes(entry[SEEK_POSITION], "big")
+        pos = offset + size
+    # MediaInfo takes the duration from an Info element ahead of the clusters only
+    info_in_header = INFO in found
+    for element_id in (INFO, TRACKS):
+        if element_id in found or element_id not in seeks:
+            continue
+        element = _read_element(f, segment_start + seeks[element_id], segment_end)
+        if element is None or element[0] != element_id or element[2] == UNKNOWN_SIZE or element[2] > budget:
+            return None
+        budget -= element[2]
+        f.seek(element[1])
+        found[element_id] = f.read(element[2])
+    if INFO not in found or TRACKS not in found:
+        return None
+
+    info = {child: found[INFO][s:e] for child, s, e in _elements(found[INFO])}
+    timecode_scale = int.from_bytes(info[TIMECODE_SCALE], "big") if TIMECODE_SCALE in info else 1000000
+    duration_s = None
+    if DURATION in info and info_in_header:
+        duration = _float(info[DURATION], 0, len(info[DURATION]))
+        if duration:
+            duration_s = duration * timecode_scale / 1e9
+
+    video, audio = [], []
+    for element_id, s, e in _elements(found[TRACKS]):
+        if element_id != TRACK_ENTRY:
+            continue
+        track = _matroska_track(found[TRACKS], s, e)
+        if track is not None:
+            (video if track.track_type == "Video" else audio).append(track)
+    return [_general(format_, file_size, duration_s, video, codec_id=None), *video, *audio]
+
+
+# ---------------------------------------------------------------- entry points
+
+def _parse_file(file_path: str, max_bytes: int) -> Tuple[Optional[List[Track]], Optional[BudgetedReader]]:
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in MP4_EXTENSIONS:
+        parse = parse_mp4
+    elif ext in MATROSKA_EXTENSIONS:
+        parse = parse_matroska
+    else:
+        return None, None
+    try:
+        with open(file_path, "rb") as raw:
+            reader = BudgetedReader(raw, max_bytes)
+            tracks = parse(reader, os.fstat(raw.fileno()).st_size, max_bytes)
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        logger.debug("Header parse of %s failed, using MediaInfo: %s", file_path, e)
+        return None, None
+    if reader.exhausted:
+        # Some read came back short, so the parse may have seen a truncated header
+        return None, None
+    return tracks, reader
+
+
+def parse_tracks(file_path: str, max_bytes: int) -> Optional[List[Track]]:
+    """General, Video and Audio tracks from the container headers of ``file_path``.
+
+    Returns None for containers this parser does not handle, files it
+    cannot make sense of, and headers larger than ``max_bytes``. At most
+    ``max_bytes`` are read in total.
+    """
+    return _parse_file(file_path, max_bytes)[0]
+
+
+def covers(tracks: List[Track], video_config: VideoMetadataConfig) -> bool:
+    """Whether ``tracks`` resolve every requested field exactly as a MediaInfo parse would."""
+    for track_type, fields in (("General", video_config.general_fields), ("Video", video_config.video_fields),
+                               ("Audio", video_config.audio_fields)):
+        for track in tracks:
+            if track.track_type != track_type:
+                continue
+            for field in fields:
+                if field not in track.fields and field not in NOT_MEDIAINFO_FIELDS:
+                    return False
+    for field in video_config.custom_fields:
+        if field in NOT_MEDIAINFO_FIELDS:
+            continue
+        # MediaInfo's first track with a value wins, so every track before it must be known
+        for track in tracks:
+            if field not in track.fields:
+                return False
+            if track.fields[field] is not None:
+                break
+        else:
+            # MediaInfo may still find it in a track kind this parser skips (text, menu)
+            return False
+    return True
+
+
+def fast_tracks(file_path: str, video_config: VideoMetadataConfig) -> Optional[Tuple[List[Track], BudgetedReader]]:
+    """Header-parsed tracks if they cover the requested fields, else None (use MediaInfo).
+
+    The tracks come with the reader they were parsed through, whose
+    ``bytes_read`` counts what the parse read.
+    """
+    tracks, reader = _parse_file(file_path, video_config.probe_max_bytes)
+    if tracks is None or not covers(tracks, video_config):
+        return None
+    return tracks, reader
@@ -0,0 +1,150 @@
+import os
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import select, delete, func, case, and_, cast, String
+from .db import SessionLocal
+from .models import Event, EventCounter, Watcher
+from .cleanup import CleanupJob, PeriodicJob, cleanup_jobs
+
+logger = logging.getLogger(__name__)
+
+# How often counters are recomputed from the events table (0 disables it)
+RECONCILE_INTERVAL_S = int(os.getenv("WATCHER_COUNTER_RECONCILE_INTERVAL_S", "86400"))
+
+# (watcher_id, event_type) -> [events, with video metadata, with validation result]
+Deltas = Dict[Tuple[int, str], List[int]]
+
+
+def has_value(column):
+    """SQL test for a JSON column holding a value; older rows store JSON null as text."""
+    return and_(column.isnot(None), cast(column, String) != "null")
+
+
+def deltas_for_rows(rows: Iterable[Dict[str, Any]], sign: int = 1) -> Deltas:
+    """Counter changes for inserting (``sign=1``) or deleting (``sign=-1``) event rows."""
+    deltas: Deltas = defaultdict(lambda: [0, 0, 0])
+    for row in rows:
+        delta = deltas[(row["watcher_id"], row["event_type"])]
+        delta[0] += sign
+        if row.get("video_metadata") is not None:
+            delta[1] += sign
+        if row.get("validation_result") is not None:
+            delta[2] += sign
+    return deltas
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def apply_deltas(db, deltas: Deltas) -> None:
+    """Add ``deltas`` to the counters inside the caller's transaction."""
+    values = [
+        {"watcher_id": watcher_id, "event_type": event_type,
+         "count": delta[0], "with_video_metadata": delta[1], "with_validation": delta[2]}
+        for (watcher_id, event_type), delta in deltas.items() if any(delta)
+    ]
+    if not values:
+        return
+    insert = _upsert_statement(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(EventCounter).values(values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[EventCounter.watcher_id, EventCounter.event_type],
+            set_={
+                "count": EventCounter.count + stmt.excluded.count,
+                "with_video_metadata": EventCounter.with_video_metadata + stmt.excluded.with_video_metadata,
+                "with_validation": EventCounter.with_validation + stmt.excluded.with_validation,
+            },
+        ))
+        return
+    for value in values:
+        counter = db.get(EventCounter, (value["watcher_id"], value["event_type"]))
+        if counter is None:
+            db.add(EventCounter(**value))
+        else:
+            counter.count += value["count"]
+            counter.with_video_metadata += value["with_video_metadata"]
+            counter.with_validation += value["with_validation"]
+    db.flush()
+
+
+def delete_counters(db, watcher_ids: List[int]) -> None:
+    if watcher_ids:
+        db.execute(delete(EventCounter).where(EventCounter.watcher_id.in_(watcher_ids)))
+
+
+def _aggregate(db, *criteria) -> Deltas:
+    query = select(
+        Event.watcher_id, Event.event_type, func.count(),
+        func.sum(case((has_value(Event.video_metadata), 1), else_=0)),
+        func.sum(case((has_value(Event.validation_result), 1), else_=0)),
+    ).where(*criteria).group_by(Event.watcher_id, Event.event_type)
+    return {
+        (watcher_id, event_type): [count, with_metadata or 0, with_validation or 0]
+        for watcher_id, event_type, count, with_metadata, with_validation in db.execute(query)
+    }
+
+
+def reconcile(job: CleanupJob) -> None:
+    """Recompute all counters from the events table (a cleanup job).
+
+    The full scan runs without blocking writers; only rows added after it
+    started are counted again inside the short transaction that replaces
+    the counters.
+    """
+    db = SessionLocal()
+    try:
+        max_id = db.execute(select(func.max(Event.id))).scalar() or 0
+        totals = _aggregate(db, Event.id <= max_id)
+        db.commit()
+
+        # The DELETE takes the write lock first, so no insert can slip in
+        # between counting the tail and writing the counters
+        db.execute(delete(EventCounter))
+        for key, delta in _aggregate(db, Event.id > max_id).items():
+            total = totals.setdefault(key, [0, 0, 0])
+            for i in range(3):
+                total[i] += delta[i]
+        existing = set(db.execute(select(Watcher.id)).scalars())
+        apply_deltas(db, {key: total for key, total in totals.items() if key[0] in existing})
+        db.commit()
+        logger.info("🔢 Reconciled event counters (%s watcher/event type pairs)", len(totals))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def reconcile_now() -> CleanupJob:
+    return cleanup_jobs.submit("reconcile", reconcile)
+
+
+def _bootstrap(job: CleanupJob) -> None:
+    """Reconcile once if events exist but no counters do, e.g. after an upgrade."""
+    db = SessionLocal()
+    try:
+        missing = (
+            db.execute(select(EventCounter.watcher_id).limit(1)).first() is None
+            and db.execute(select(Event.id).limit(1)).first() is not None
+        )
+    finally:
+        db.close()
+    if missing:
+        reconcile(job)
+
+
+def bootstrap_counters() -> CleanupJob:
+    return cleanup_jobs.submit("reconcile", _bootstrap)
+
+
+# Not at startup: the full scan would compete with cleanup on every API restart
+reconcile_scheduler = PeriodicJob("reconcile", reconcile, RECONCILE_INTERVAL_S, run_on_start=False)
@@ -1,14 +1,119 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os
+import logging
+from typing import Any, AsyncIterator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./watcher.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv("WATCHER_DATABASE_URL", "sqlite:///./watcher.db")
+
+# SQLite tuning, overridable from the environment. WAL lets the API read while
+# watcher processes write; busy_timeout makes concurrent writers wait for the
+# lock instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("WATCHER_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("WATCHER_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("WATCHER_SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("WATCHER_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("WATCHER_SQLITE_BUSY_TIMEOUT_MS", "30000"))
+
+# Serve the hot read endpoints from an async engine (aiosqlite for SQLite,
+# asyncpg for PostgreSQL) instead of the request threadpool
+ASYNC_DB = os.getenv("WATCHER_ASYNC_DB", "").lower() in ("1", "true", "yes")
+# Pooled connections of the async engine; requests beyond them wait for one
+ASYNC_POOL_SIZE = int(os.getenv("WATCHER_ASYNC_POOL_SIZE", "10"))
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def _create_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True)
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000.0},
+    )
+    event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+    return sqlite_engine
+
+def async_url(url: str) -> str:
+    """``url`` with its driver replaced by the matching async one."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {dialect!r} databases")
+    return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+def _create_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_url(url)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_pre_ping=True, pool_size=ASYNC_POOL_SIZE)
+    async_engine = create_async_engine(
+        url, pool_size=ASYNC_POOL_SIZE, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000.0}
+    )
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# Created on first use, so watcher processes never import the async driver
+_async_engine = None
+_AsyncSessionLocal = None
+
+def get_async_sessionmaker():
+    global _async_engine, _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_engine = _create_async_engine(DATABASE_URL)
+        _AsyncSessionLocal = async_sessionmaker(bind=_async_engine, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+def _reset_engine_after_fork():
+    # Watcher processes are forked from the API process. Pooled connections
+    # inherited from the parent must not be used (or closed) by the child,
+    # so drop them and let the child open its own.
+    engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_engine_after_fork)
+
 def init_db():
     from . import models  # noqa
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+
+def ensure_indexes():
+    """Create indexes added after a table was first created.
+
+    create_all() only creates indexes together with their table, so existing
+    databases would otherwise never get them. Like create_all(), it covers
+    the models imported so far; init_db() imports them first.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     db = SessionLocal()
@@ -17,32 +122,54 @@ def get_db():
     finally:
         db.close()
 
-def cleanup_orphaned_events():
-    """Remove any events that reference non-existent watchers."""
-    from .models import Event, Watcher
-    
+class ReadSession:
+    """Read-only statements for ``async def`` endpoints.
+
+    Runs them on the async engine when ``WATCHER_ASYNC_DB`` is set, and
+    otherwise on a sync session in the threadpool. Results are buffered, so
+    they can be consumed on the event loop either way.
+    """
+
+    def __init__(self, async_session: Optional[Any] = None, session: Optional[Session] = None):
+        self.async_session = async_session
+        self.session = session
+
+    async def execute(self, statement) -> Result:
+        if self.async_session is not None:
+            return await self.async_session.execute(statement)
+        from starlette.concurrency import run_in_threadpool
+
+        frozen = await run_in_threadpool(lambda: self.session.execute(statement).freeze())
+        return frozen()
+
+async def get_read_db() -> AsyncIterator[ReadSession]:
+    if ASYNC_DB:
+        async with get_async_sessionmaker()() as async_session:
+            yield ReadSession(async_session=async_session)
+        return
     db = SessionLocal()
     try:
-        # Find events with watcher_id that don't exist in watchers table
-        orphaned_events = db.query(Event).outerjoin(Watcher, Event.watcher_id == Watcher.id).filter(Watcher.id.is_(None)).all()
-        
-        if orphaned_events:
-            count = len(orphaned_events)
-            print(f"🧹 Found {count} orphaned events, cleaning up...")
-            
-            for event in orphaned_events:
-                db.delete(event)
-            
-            db.commit()
-            print(f"✅ Cleaned up {count} orphaned events")
-            return count
+        yield ReadSession(session=db)
+    finally:
+        db.close()
+
+def cleanup_orphaned_events():
+    """Remove any events that reference non-existent watchers.
+
+    Deletes in chunks with set-based statements, so memory use does not grow
+    with the number of orphaned rows. Returns the number of events removed.
+    """
+    from .cleanup import orphaned_watcher_ids, delete_events_for_watcher
+
+    try:
+        count = 0
+        for watcher_id in orphaned_watcher_ids():
+            count += delete_events_for_watcher(watcher_id)
+        if count:
+            logger.info("✅ Cleaned up %s orphaned events", count)
         else:
-            print("ℹ️  No orphaned events found")
-            return 0
-            
+            logger.info("ℹ️  No orphaned events found")
+        return count
     except Exception as e:
-        print(f"❌ Error cleaning up orphaned events: {e}")
-        db.rollback()
+        logger.error("❌ Error cleaning up orphaned events: %s", e)
         return 0
-    finally:
-        db.close()
\ No newline at end of file
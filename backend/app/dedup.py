@@ -0,0 +1,318 @@
+import os
+import time
+import queue
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEDUP_POLICIES = ("tag", "skip", "delete")
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_PARTIAL_BYTES = 1024 * 1024
+DEFAULT_MAX_READ_MB_S = 100
+CHUNK_SIZE = 1024 * 1024
+
+
+class Throttle:
+    """Token bucket shared by the threads reading files for one watcher."""
+
+    def __init__(self, bytes_per_s: float):
+        self.rate = float(bytes_per_s)
+        self._allowance = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # At most one second of burst
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= amount
+            wait = -self._allowance / self.rate if self._allowance < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _digest(f, length: int, throttle: Optional[Throttle], buffer: bytearray) -> Tuple[bytes, int]:
+    """blake2b of the next ``length`` bytes of ``f`` (all remaining bytes if negative)."""
+    h = hashlib.blake2b(digest_size=16)
+    view = memoryview(buffer)
+    read = 0
+    while length < 0 or read < length:
+        want = len(buffer) if length < 0 else min(len(buffer), length - read)
+        n = f.readinto(view[:want])
+        if not n:
+            break
+        if throttle is not None:
+            throttle.consume(n)
+        h.update(view[:n])
+        read += n
+    return h.digest(), read
+
+
+def partial_hash(path: str, size: int, partial_bytes: int, throttle: Optional[Throttle] = None) -> str:
+    """Hash of the first and last ``partial_bytes`` of a file (the whole file if it is that small)."""
+    buffer = bytearray(min(CHUNK_SIZE, max(1, partial_bytes)))
+    with open(path, "rb", buffering=0) as f:
+        head, _ = _digest(f, partial_bytes, throttle, buffer)
+        tail = b""
+        if size > 2 * partial_bytes:
+            f.seek(size - partial_bytes)
+            tail, _ = _digest(f, partial_bytes, throttle, buffer)
+        elif size > partial_bytes:
+            tail, _ = _digest(f, -1, throttle, buffer)
+    return (head + tail).hex()
+
+
+def full_hash(path: str, throttle: Optional[Throttle] = None) -> Tuple[str, int]:
+    """Hash of the whole file and the number of bytes it covered."""
+    buffer = bytearray(CHUNK_SIZE)
+    with open(path, "rb", buffering=0) as f:
+        digest, read = _digest(f, -1, throttle, buffer)
+    return digest.hex(), read
+
+
+class DuplicateIndex:
+    """Persisted content hash -> first file seen with that content.
+
+    Files are first compared by size and a partial hash (head and tail);
+    full hashes are only computed, and then stored, when those collide. The
+    index is a standalone SQLite file, so several watchers can share one to
+    catch copies delivered to different trees.
+
+    Rows follow their files: ``forget()`` and ``rename()`` apply deletes and
+    moves, and a path whose content changed loses its old row on the next
+    ``check()``. Since the index can still lag behind the filesystem,
+    ``confirm()`` re-checks the first copy before a duplicate is acted on.
+    """
+
+    def __init__(self, db_path: str, partial_bytes: int = DEFAULT_PARTIAL_BYTES,
+                 throttle: Optional[Throttle] = None):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.partial_bytes = max(0, int(partial_bytes))
+        self.throttle = throttle
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS contents ("
+            "id INTEGER PRIMARY KEY, size INTEGER NOT NULL, partial TEXT, full TEXT, "
+            "path TEXT NOT NULL, first_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_contents_size_partial ON contents (size, partial)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_contents_full ON contents (full)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_contents_path ON contents (path)")
+        self._lock = threading.Lock()
+        self.bytes_read = 0
+
+    def check(self, path: str) -> Optional[Dict[str, Any]]:
+        """Record ``path``'s content; if it was seen before under another path, describe the first copy."""
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return None
+        partial = None
+        if self.partial_bytes:
+            partial = partial_hash(path, size, self.partial_bytes, self.throttle)
+            self.bytes_read += min(size, 2 * self.partial_bytes)
+            with self._lock:
+                # Rows of this path for other content are stale: it was rewritten
+                self._conn.execute(
+                    "DELETE FROM contents WHERE path = ? AND NOT (size = ? AND partial = ?)", (path, size, partial)
+                )
+                candidates = self._candidates(size, partial)
+                if not candidates:
+                    self._insert(size, partial, None, path)
+                    return None
+                own = [candidate for candidate in candidates if candidate[1] == path]
+                candidates = [candidate for candidate in candidates if candidate[1] != path]
+                if own:
+                    # The first copy itself, touched again or rewritten with the same
+                    # head and tail; a stored full hash may no longer hold
+                    self._conn.execute("DELETE FROM contents WHERE path = ?", (path,))
+                    if not candidates:
+                        self._insert(size, partial, None, path)
+                        return None
+
+        # Partial hashes collide (or are disabled): compare full hashes
+        digest, read = full_hash(path, self.throttle)
+        self.bytes_read += read
+        if partial is not None:
+            for row_id, candidate_path, candidate_full in candidates:
+                if candidate_full is None:
+                    self._fill_full(row_id, candidate_path, size)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM contents WHERE path = ? AND NOT (full = ? AND size = ?)", (path, digest, size)
+            )
+            row = self._conn.execute(
+                "SELECT path, first_seen FROM contents WHERE full = ? AND size = ? ORDER BY id LIMIT 1",
+                (digest, size)
+            ).fetchone()
+            if row is None:
+                self._insert(size, partial, digest, path)
+                return None
+            if row[0] == path:
+                return None
+        return {"duplicate_of": row[0], "first_seen": row[1], "content_hash": digest}
+
+    def confirm(self, path: str, duplicate: Dict[str, Any]) -> bool:
+        """Re-check, right before acting on it, that ``duplicate`` from ``check(path)`` still holds.
+
+        The first copy must still exist with the same size and full hash.
+        Otherwise its row is dropped and ``path`` is recorded as the first
+        copy of its content instead; returns False.
+        """
+        first = duplicate["duplicate_of"]
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return False
+        try:
+            same = os.stat(first).st_size == size
+            if same:
+                digest, read = full_hash(first, self.throttle)
+                self.bytes_read += read
+                same = digest == duplicate["content_hash"]
+        except OSError:
+            same = False
+        if same:
+            return True
+        try:
+            partial = partial_hash(path, size, self.partial_bytes, self.throttle) if self.partial_bytes else None
+        except OSError:
+            partial = None
+        with self._lock:
+            self._conn.execute("DELETE FROM contents WHERE path IN (?, ?)", (first, path))
+            self._insert(size, partial, duplicate["content_hash"], path)
+        return False
+
+    def forget(self, path: str) -> None:
+        """Drop the rows of a deleted file."""
+        with self._lock:
+            self._conn.execute("DELETE FROM contents WHERE path = ?", (path,))
+
+    def rename(self, src: str, dest: str, directory: bool = False) -> None:
+        """Follow a moved file, or with ``directory`` every file below a moved directory."""
+        with self._lock:
+            if not directory:
+                self._conn.execute("UPDATE contents SET path = ? WHERE path = ?", (dest, src))
+                return
+            prefix = src.rstrip(os.sep) + os.sep
+            self._conn.execute(
+                "UPDATE contents SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?",
+                (dest.rstrip(os.sep) + os.sep, len(prefix) + 1, prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+            )
+
+    def _candidates(self, size: int, partial: str) -> List[Tuple[int, str, Optional[str]]]:
+        return self._conn.execute(
+            "SELECT id, path, full FROM contents WHERE size = ? AND partial = ?", (size, partial)
+        ).fetchall()
+
+    def _insert(self, size: int, partial: Optional[str], digest: Optional[str], path: str) -> None:
+        self._conn.execute(
+            "INSERT INTO contents (size, partial, full, path, first_seen) VALUES (?, ?, ?, ?, ?)",
+            (size, partial, digest, path, time.time())
+        )
+
+    def _fill_full(self, row_id: int, path: str, size: int) -> None:
+        """Hash an earlier copy in full, or forget it if it is gone or no longer the same size."""
+        try:
+            if os.stat(path).st_size != size:
+                raise FileNotFoundError(path)
+            digest, read = full_hash(path, self.throttle)
+            self.bytes_read += read
+        except OSError:
+            with self._lock:
+                self._conn.execute("DELETE FROM contents WHERE id = ?", (row_id,))
+            return
+        with self._lock:
+            self._conn.execute("UPDATE contents SET full = ? WHERE id = ?", (digest, row_id))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class HashingStage:
+    """Hash files for one watcher on ``workers`` threads, off the observer and event threads.
+
+    At most ``queue_size`` files wait; ``submit()`` blocks beyond that.
+    ``callback`` receives the duplicate description from
+    ``DuplicateIndex.check()`` (None for new content or on error) on the
+    hashing thread.
+    """
+
+    def __init__(self, index: DuplicateIndex, workers: int = DEFAULT_HASH_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, name: str = "hashing",
+                 metric_labels: Optional[Dict[str, Any]] = None):
+        self.index = index
+        self.name = name
+        self.metric_labels = metric_labels or {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], default_index_path: str, name: str = "hashing",
+                    metric_labels: Optional[Dict[str, Any]] = None) -> "HashingStage":
+        max_read_mb_s = config.get('dedup_max_read_mb_s', DEFAULT_MAX_READ_MB_S)
+        index = DuplicateIndex(
+            config.get('dedup_index_path') or default_index_path,
+            partial_bytes=config.get('dedup_partial_bytes', DEFAULT_PARTIAL_BYTES),
+            throttle=Throttle(max_read_mb_s * 1024 * 1024) if max_read_mb_s else None,
+        )
+        return cls(
+            index,
+            workers=config.get('dedup_workers', DEFAULT_HASH_WORKERS),
+            queue_size=config.get('dedup_queue_size', DEFAULT_QUEUE_SIZE),
+            name=name,
+            metric_labels=metric_labels,
+        )
+
+    def start(self) -> "HashingStage":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, callback: Callable[[Optional[Dict[str, Any]]], None], path: str) -> None:
+        self._queue.put((callback, path))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self) -> None:
+        """Hash what is still queued, then stop the threads and close the index."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.index.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            callback, path = item
+            duplicate = None
+            try:
+                with metrics.timer("watcher_stage_seconds", stage="hash", **self.metric_labels):
+                    duplicate = self.index.check(path)
+            except Exception as e:
+                logger.error("❌ Hashing %s failed: %s", path, e)
+            try:
+                callback(duplicate)
+            except Exception as e:
+                logger.error("Error handling hash result for %s: %s", path, e)
@@ -1,33 +1,136 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from .db import get_db
+from .db import get_db, get_read_db, ReadSession
 from .models import User, UserRole
-from .auth import decode_token
+from .auth import decode_token_payload
+
+logger = logging.getLogger(__name__)
+
+# Set WATCHER_AUTH_DEBUG=1 to log request headers and token resolution
+# (same as WATCHER_LOG_LEVELS=app.deps=DEBUG)
+AUTH_DEBUG = os.getenv("WATCHER_AUTH_DEBUG", "").lower() in ("1", "true", "yes")
+if AUTH_DEBUG:
+    logger.setLevel(logging.DEBUG)
+AUTH_CACHE_TTL_S = float(os.getenv("WATCHER_AUTH_CACHE_TTL_S", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("WATCHER_AUTH_CACHE_SIZE", "10000"))
 
 class DebugOAuth2PasswordBearer(OAuth2PasswordBearer):
     async def __call__(self, request: Request) -> str:
-        print(f"🔐 OAuth2PasswordBearer called")
-        print(f"🔐 Headers: {dict(request.headers)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔐 OAuth2PasswordBearer called, headers: %s", dict(request.headers))
         token = await super().__call__(request)
-        print(f"🔐 Extracted token: {token[:20]}..." if token else "No token")
+        logger.debug("🔐 Extracted token: %s...", token[:20] if token else None)
         return token
 
 oauth2_scheme = DebugOAuth2PasswordBearer(tokenUrl="/auth/login")
 
+class TokenCache:
+    """Tokens resolved to users, kept for ``ttl`` seconds (never past token expiry).
+
+    Cached users are detached snapshots without the password hash. Entries
+    are dropped when the user is updated or deleted (see routers/users.py).
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_S, max_entries: int = AUTH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float]) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        snapshot = User(id=user.id, username=user.username, email=user.email, role=user.role)
+        with self._lock:
+            self._entries[token] = (expires_at, snapshot)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in [token for token, (_, user) in self._entries.items() if user.id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenCache()
+
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    print(f"🔐 get_current_user called with token: {token[:20]}..." if token else "No token")
-    username = decode_token(token)
-    print(f"🔐 Decoded username: {username}")
+    logger.debug("🔐 get_current_user called with token: %s...", token[:20] if token else None)
+    return _user_for_token(db, token)
+
+def get_stream_user(request: Request, token: Optional[str] = None, db: Session = Depends(get_db)) -> User:
+    """Like get_current_user, but also accepts ``?token=`` since EventSource cannot set headers."""
+    authorization = request.headers.get("Authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return _user_for_token(db, token)
+
+async def get_current_user_async(db: ReadSession = Depends(get_read_db), token: str = Depends(oauth2_scheme)) -> User:
+    """get_current_user for ``async def`` endpoints; cached tokens are resolved without a thread."""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    payload = _token_payload(token)
+    result = await db.execute(select(User).where(User.username == payload["sub"]))
+    return _remember_user(token, payload, result.scalars().first())
+
+def _user_for_token(db: Session, token: str) -> User:
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    payload = _token_payload(token)
+    return _remember_user(token, payload, db.query(User).filter(User.username == payload["sub"]).first())
+
+def _token_payload(token: str) -> dict:
+    payload = decode_token_payload(token)
+    username = payload.get("sub") if payload else None
+    logger.debug("🔐 Decoded username: %s", username)
     if not username:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.username == username).first()
-    print(f"🔐 Found user: {user.username if user else 'None'}")
+    return payload
+
+def _remember_user(token: str, payload: dict, user: Optional[User]) -> User:
+    logger.debug("🔐 Found user: %s", user.username if user else None)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    token_cache.put(token, user, payload.get("exp"))
     return user
 
 def require_admin(user: User = Depends(get_current_user)) -> User:
     if user.role != UserRole.admin:
         raise HTTPException(status_code=403, detail="Admin only")
-    return user
\ No newline at end of file
+    return user
+
+async def require_admin_async(user: User = Depends(get_current_user_async)) -> User:
+    if user.role != UserRole.admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return user
@@ -0,0 +1,125 @@
+import time
+import logging
+import threading
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 10000
+OVERFLOW_POLICIES = ("block", "drop_oldest", "degrade")
+
+
+class BoundedEventQueue:
+    """Bounded hand-off of ``(event_type, path)`` items to one processing thread.
+
+    What happens when ``capacity`` items are waiting depends on ``policy``:
+    ``block`` makes the producer wait, ``drop_oldest`` discards the oldest
+    waiting item, and ``degrade`` hands the new item to ``on_degraded`` in the
+    producer's thread instead. ``on_degraded`` must not block, since it
+    runs on the producer (the observer) exactly when the pipeline is behind:
+    it records the item cheaply if it can (e.g. the path without metadata)
+    and returns False if it had to give up, in which case the item counts as
+    dropped. Dropped and degraded items are counted per event type;
+    ``take_overflow()`` returns and resets the counts.
+
+    Until ``start()`` is called, items are processed synchronously.
+    """
+
+    def __init__(self, process: Callable[[str, str], None], capacity: int = DEFAULT_QUEUE_SIZE,
+                 policy: str = "block", on_degraded: Optional[Callable[[str, str], bool]] = None,
+                 name: str = "events"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}, expected one of {OVERFLOW_POLICIES}")
+        if policy == "degrade" and on_degraded is None:
+            raise ValueError("The degrade policy needs on_degraded")
+        self.process = process
+        self.capacity = max(1, int(capacity))
+        self.policy = policy
+        self.on_degraded = on_degraded
+        self.name = name
+        self._items: Deque[Tuple[str, str]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.dropped: Counter = Counter()
+        self.degraded: Counter = Counter()
+        self.blocked_s = 0.0
+        self.high_water = 0
+
+    def start(self, on_tick: Optional[Callable[[], None]] = None, tick_s: float = 1.0) -> "BoundedEventQueue":
+        """Start the processing thread; ``on_tick`` runs on it about every ``tick_s``."""
+        self._thread = threading.Thread(target=self._run, args=(on_tick, tick_s), name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, event_type: str, path: str) -> None:
+        if self._thread is None:
+            self.process(event_type, path)
+            return
+        degrade = False
+        with self._cond:
+            if len(self._items) >= self.capacity and not self._closed:
+                if self.policy == "block":
+                    started = time.monotonic()
+                    while len(self._items) >= self.capacity and not self._closed:
+                        self._cond.wait()
+                    self.blocked_s += time.monotonic() - started
+                elif self.policy == "drop_oldest":
+                    dropped_type, _ = self._items.popleft()
+                    self.dropped[dropped_type] += 1
+                else:
+                    degrade = True
+            if not degrade:
+                self._items.append((event_type, path))
+                self.high_water = max(self.high_water, len(self._items))
+                self._cond.notify_all()
+        if degrade:
+            recorded = self.on_degraded(event_type, path)
+            with self._cond:
+                (self.degraded if recorded else self.dropped)[event_type] += 1
+
+    def take_overflow(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Dropped and degraded counts by event type since the last call."""
+        with self._cond:
+            dropped, self.dropped = dict(self.dropped), Counter()
+            degraded, self.degraded = dict(self.degraded), Counter()
+        return dropped, degraded
+
+    def stop(self) -> None:
+        """Process what is still queued, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, on_tick: Optional[Callable[[], None]], tick_s: float) -> None:
+        next_tick = time.monotonic() + tick_s
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    remaining = next_tick - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                item = self._items.popleft() if self._items else None
+                if item is None and self._closed:
+                    break
+                # Wake blocked producers
+                self._cond.notify_all()
+            if item is not None:
+                try:
+                    self.process(*item)
+                except Exception as e:
+                    logger.error("Error processing %s event for %s: %s", item[0], item[1], e)
+            if on_tick is not None and time.monotonic() >= next_tick:
+                next_tick = time.monotonic() + tick_s
+                try:
+                    on_tick()
+                except Exception as e:
+                    logger.error("Error in %s tick: %s", self.name, e)
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import json
+from typing import Any, Dict, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, func
+from starlette.concurrency import run_in_threadpool
+from .db import SessionLocal
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 15
+BATCH_LIMIT = 1000
+# Events a subscriber may lag behind before it is disconnected; it then
+# reconnects with Last-Event-ID and catches up from the database
+SUBSCRIBER_QUEUE_SIZE = 5000
+
+_EVENT_COLUMNS = (
+    Event.id, Event.watcher_id, Event.event_type, Event.file_path,
+    Event.created_at, Event.video_metadata, Event.validation_result,
+)
+
+
+def _fetch_after(last_id: int, limit: int = BATCH_LIMIT, watcher_id: Optional[int] = None,
+                 event_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        query = select(*_EVENT_COLUMNS).where(Event.id > last_id)
+        if watcher_id is not None:
+            query = query.where(Event.watcher_id == watcher_id)
+        if event_type is not None:
+            query = query.where(Event.event_type == event_type)
+        rows = db.execute(query.order_by(Event.id.asc()).limit(limit)).mappings().all()
+        return [dict(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _max_event_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.max(Event.id))).scalar() or 0
+    finally:
+        db.close()
+
+
+class Subscription:
+    def __init__(self, watcher_id: Optional[int], event_type: Optional[str]):
+        self.watcher_id = watcher_id
+        self.event_type = event_type
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.watcher_id is not None and event["watcher_id"] != self.watcher_id:
+            return False
+        if self.event_type is not None and event["event_type"] != self.event_type:
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Make room for the end-of-stream marker
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroadcaster:
+    """Tail the events table once and fan new rows out to all subscribers.
+
+    Watcher processes only write to the database, so a single poller in the
+    API process replaces one full query per open dashboard. The poller only
+    runs while at least one client is subscribed.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.last_id: Optional[int] = None
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, watcher_id: Optional[int] = None, event_type: Optional[str] = None) -> Subscription:
+        subscription = Subscription(watcher_id, event_type)
+        if self.last_id is None:
+            self.last_id = await run_in_threadpool(_max_event_id)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                events = await run_in_threadpool(_fetch_after, self.last_id)
+            except Exception as e:
+                logger.error("❌ Event stream poll failed: %s", e)
+                events = []
+            for event in events:
+                for subscription in list(self._subscribers):
+                    if subscription.matches(event):
+                        subscription.offer(event)
+            if events:
+                self.last_id = events[-1]["id"]
+            if len(events) < BATCH_LIMIT:
+                await asyncio.sleep(self.poll_interval)
+        # Forget the cursor so the next subscriber starts from the current tail
+        self.last_id = None
+
+
+broadcaster = EventBroadcaster()
+
+
+def _format(event: Dict[str, Any]) -> str:
+    data = json.dumps(jsonable_encoder(event))
+    return f"id: {event['id']}\nevent: event\ndata: {data}\n\n"
+
+
+async def stream_events(resume_from: Optional[int], watcher_id: Optional[int] = None,
+                        event_type: Optional[str] = None):
+    """Yield Server-Sent Events for new rows, first replaying rows after ``resume_from``."""
+    subscription = await broadcaster.subscribe(watcher_id, event_type)
+    try:
+        live_from = broadcaster.last_id or 0
+        sent = resume_from if resume_from is not None else live_from
+        # Tell the client where the stream starts so it can resume from here
+        yield f"event: ready\ndata: {json.dumps({'last_id': sent})}\n\n"
+
+        # Replay what the client missed up to the point live delivery took over
+        while resume_from is not None and sent < live_from:
+            missed = await run_in_threadpool(_fetch_after, sent, BATCH_LIMIT, watcher_id, event_type)
+            missed = [event for event in missed if event["id"] <= live_from]
+            if not missed:
+                break
+            for event in missed:
+                yield _format(event)
+            sent = missed[-1]["id"]
+        sent = max(sent, live_from)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                # Too far behind; the client reconnects with Last-Event-ID
+                return
+            if event["id"] <= sent:
+                continue
+            sent = event["id"]
+            yield _format(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
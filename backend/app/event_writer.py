@@ -0,0 +1,260 @@
+import threading
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from .db import SessionLocal
+from .models import Event
+from .counters import apply_deltas, deltas_for_rows
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_MS = 250
+# Buffered rows, in batches, at which add() waits for the database to catch up
+DEFAULT_BUFFER_BATCHES = 10
+
+
+class EventRef:
+    """Handle to a row queued with ``EventWriter.add(track=True)``; ``id`` is set once it is inserted."""
+
+    __slots__ = ("row", "id", "buffered")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.id: Optional[int] = None
+        self.buffered = True
+
+
+class EventWriter:
+    """Buffer event rows for one watcher and persist them with bulk inserts.
+
+    Rows are flushed by a background thread once ``batch_size`` rows are
+    pending or ``flush_interval_ms`` has elapsed since the last flush,
+    whichever comes first. ``close()`` drains whatever is still buffered.
+    """
+
+    def __init__(self, watcher_id: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS, max_buffered: Optional[int] = None):
+        self.watcher_id = watcher_id
+        self.batch_size = max(1, int(batch_size))
+        self.max_buffered = max(self.batch_size, int(max_buffered or self.batch_size * DEFAULT_BUFFER_BATCHES))
+        self.flush_interval = max(1, int(flush_interval_ms)) / 1000.0
+        self._buffer: List[Dict[str, Any]] = []
+        # When the oldest buffered row was added, for the write lag metric
+        self._oldest_at: Optional[float] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Tracked rows by id(row) until their insert returns an id, and
+        # validation_result updates of rows that already left the buffer
+        self._refs: Dict[int, EventRef] = {}
+        self._updates: List[Tuple[EventRef, Dict[str, Any]]] = []
+
+    @classmethod
+    def from_config(cls, watcher_id: int, config: Optional[Dict[str, Any]]) -> "EventWriter":
+        config = config or {}
+        return cls(
+            watcher_id,
+            batch_size=config.get('event_batch_size', DEFAULT_BATCH_SIZE),
+            flush_interval_ms=config.get('event_flush_interval_ms', DEFAULT_FLUSH_INTERVAL_MS),
+            max_buffered=config.get('event_buffer_limit'),
+        )
+
+    def start(self) -> "EventWriter":
+        self._thread = threading.Thread(target=self._run, name=f"event-writer-{self.watcher_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def add(self, event_type: str, file_path: str, video_metadata: Optional[Dict[str, Any]] = None,
+            validation_result: Optional[Dict[str, Any]] = None, track: bool = False) -> Optional[EventRef]:
+        """Queue one event row for the next bulk insert.
+
+        Waits while ``max_buffered`` rows are pending, so a slow database
+        pushes back on the pipeline instead of growing the buffer. With
+        ``track`` the row's ``validation_result`` can be replaced later
+        through the returned ref (see ``update()``).
+        """
+        row = self._row(event_type, file_path, video_metadata, validation_result)
+        ref = EventRef(row) if track else None
+        with self._cond:
+            while self._full():
+                self._cond.notify_all()
+                self._cond.wait()
+            self._append(row, ref)
+        if self._thread is None:
+            # No background thread (e.g. used synchronously); write through
+            self.flush()
+        return ref
+
+    def try_add(self, event_type: str, file_path: str, validation_result: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a row like ``add()`` but never wait; False if ``max_buffered`` rows are pending."""
+        row = self._row(event_type, file_path, None, validation_result)
+        with self._cond:
+            if self._full():
+                self._cond.notify_all()
+                return False
+            self._append(row, None)
+        if self._thread is None:
+            self.flush()
+        return True
+
+    def update(self, ref: EventRef, validation_result: Dict[str, Any]) -> None:
+        """Replace the ``validation_result`` of a tracked row.
+
+        A row still in the buffer is changed in place; otherwise the update
+        is written with the next flush. Meant for rows that already carry a
+        validation result, so the event counters stay unchanged.
+        """
+        with self._cond:
+            ref.row["validation_result"] = validation_result
+            if not ref.buffered:
+                self._updates.append((ref, validation_result))
+        if self._thread is None:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered rows now. Returns the number of rows persisted."""
+        with self._flush_lock:
+            with self._cond:
+                rows, self._buffer = self._buffer, []
+                oldest_at, self._oldest_at = self._oldest_at, None
+                updates, self._updates = self._updates, []
+                refs = [self._refs.pop(id(row), None) for row in rows] if self._refs else []
+                for ref in refs:
+                    if ref is not None:
+                        ref.buffered = False
+                self._cond.notify_all()
+            written = self._write(rows, refs) if rows else 0
+            if rows and oldest_at is not None:
+                metrics.observe("watcher_write_lag_seconds", time.monotonic() - oldest_at, watcher_id=self.watcher_id)
+            if updates:
+                self._write_updates(updates)
+            return written
+
+    def buffered(self) -> int:
+        return len(self._buffer) + len(self._updates)
+
+    def close(self) -> None:
+        """Stop the flush thread and drain the buffer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _row(self, event_type: str, file_path: str, video_metadata: Optional[Dict[str, Any]],
+             validation_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "watcher_id": self.watcher_id,
+            "event_type": event_type,
+            "file_path": file_path,
+            "video_metadata": video_metadata,
+            "validation_result": validation_result,
+        }
+
+    def _full(self) -> bool:
+        # Called with _cond held; only a running flush thread can make room
+        return len(self._buffer) >= self.max_buffered and self._thread is not None and not self._closed
+
+    def _append(self, row: Dict[str, Any], ref: Optional[EventRef]) -> None:
+        # Called with _cond held
+        if not self._buffer:
+            self._oldest_at = time.monotonic()
+        self._buffer.append(row)
+        if ref is not None:
+            self._refs[id(row)] = ref
+        if len(self._buffer) >= self.batch_size:
+            self._cond.notify()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            with self._cond:
+                while not self._closed and len(self._buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+            deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, rows: List[Dict[str, Any]], refs: List[Optional[EventRef]]) -> int:
+        """Insert ``rows``; ``refs`` (empty, or one per row) receive the ids of tracked rows."""
+        tracked = any(ref is not None for ref in refs)
+        db: Session = SessionLocal()
+        try:
+            with metrics.timer("watcher_stage_seconds", watcher_id=self.watcher_id, stage="db_commit"):
+                if tracked:
+                    ids = db.execute(insert(Event).returning(Event.id, sort_by_parameter_order=True), rows).scalars().all()
+                else:
+                    db.execute(insert(Event), rows)
+                deltas = deltas_for_rows(rows)
+                apply_deltas(db, deltas)
+                db.commit()
+            if tracked:
+                for ref, event_id in zip(refs, ids):
+                    if ref is not None:
+                        ref.id = event_id
+            for (_, event_type), delta in deltas.items():
+                metrics.inc("watcher_events_written_total", delta[0], watcher_id=self.watcher_id, event_type=event_type)
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.error("Error bulk logging %s events, retrying one by one: %s", len(rows), e)
+        finally:
+            db.close()
+
+        # Fall back to per-row inserts so one bad row doesn't lose the batch
+        written = 0
+        for i, row in enumerate(rows):
+            ref = refs[i] if refs else None
+            db = SessionLocal()
+            try:
+                if ref is not None:
+                    ref.id = db.execute(insert(Event).values(**row).returning(Event.id)).scalar_one()
+                else:
+                    db.execute(insert(Event), [row])
+                apply_deltas(db, deltas_for_rows([row]))
+                db.commit()
+                written += 1
+                metrics.inc("watcher_events_written_total", watcher_id=self.watcher_id, event_type=row["event_type"])
+            except Exception as e:
+                db.rollback()
+                if ref is not None:
+                    ref.id = None
+                metrics.inc("watcher_event_write_errors_total", watcher_id=self.watcher_id)
+                logger.error("Error logging event for %s: %s", row['file_path'], e)
+            finally:
+                db.close()
+        return written
+
+    def _write_updates(self, updates: List[Tuple[EventRef, Dict[str, Any]]]) -> None:
+        # The last update of a row wins; rows whose insert failed have no id
+        values = {ref.id: validation_result for ref, validation_result in updates if ref.id is not None}
+        dropped = sum(1 for ref, _ in updates if ref.id is None)
+        if dropped:
+            logger.debug("Dropped %s updates of rows that were never written", dropped)
+        if not values:
+            return
+        db: Session = SessionLocal()
+        try:
+            with metrics.timer("watcher_stage_seconds", watcher_id=self.watcher_id, stage="db_commit"):
+                db.execute(update(Event), [
+                    {"id": event_id, "validation_result": validation_result}
+                    for event_id, validation_result in values.items()
+                ])
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            metrics.inc("watcher_event_write_errors_total", len(values), watcher_id=self.watcher_id)
+            logger.error("Error updating %s events: %s", len(values), e)
+        finally:
+            db.close()
@@ -0,0 +1,201 @@
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+from .log import configure_logging
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 100
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _exit_with_parent(parent_pid: int) -> None:
+    """Worker initializer: exit once the owning watcher process is gone.
+
+    A watcher that is killed (e.g. after missing its stop deadline) cannot
+    shut its pool down, and spawned workers would otherwise wait on the call
+    queue forever.
+    """
+    def watch() -> None:
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
+
+    threading.Thread(target=watch, name="parent-watch", daemon=True).start()
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[float, Any]:
+    """Run ``fn`` in a worker and return how long it took along with its result."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def _init_worker(parent_pid: int) -> None:
+    configure_logging()
+    _exit_with_parent(parent_pid)
+
+
+class WorkerPool:
+    """A lazily started process pool that can be shared by several stages.
+
+    The watcher process already runs observer and writer threads, so workers
+    are spawned fresh rather than forked from a threaded process.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, int(workers or default_workers()))
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(os.getpid(),)
+                )
+            return self._executor
+
+    def reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class ExtractionStage:
+    """Run metadata extraction for one watcher in a pool of worker processes.
+
+    At most ``queue_size`` jobs are in flight at a time; ``submit()`` blocks
+    the caller once that limit is reached instead of letting work pile up in
+    memory. Results are delivered to the submitted callbacks, in completion
+    order, on a dedicated results thread so validation, reject handling and
+    persistence never run inside the pool's management thread.
+
+    By default the stage owns a pool of ``workers`` processes. When a shared
+    ``pool`` is passed (supervisor mode), ``workers`` instead caps how many of
+    this watcher's jobs may be in flight, so one busy watcher cannot occupy
+    the whole pool.
+    """
+
+    def __init__(self, extract_fn: Callable[..., Optional[Dict[str, Any]]], workers: Optional[int] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, name: str = "extraction",
+                 pool: Optional[WorkerPool] = None, metric_labels: Optional[Dict[str, Any]] = None):
+        self.extract_fn = extract_fn
+        # Labels of the "extract" and "extract_queued" stage timings
+        self.metric_labels = metric_labels or {}
+        self.queue_size = max(1, int(queue_size))
+        if pool is None:
+            self.pool = WorkerPool(workers)
+            self._owns_pool = True
+        else:
+            self.pool = pool
+            self._owns_pool = False
+            if workers:
+                self.queue_size = min(self.queue_size, max(1, int(workers)))
+        self.name = name
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+        self._results: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-results", daemon=True)
+
+    @classmethod
+    def from_config(cls, extract_fn: Callable[..., Optional[Dict[str, Any]]], config: Optional[Dict[str, Any]],
+                    name: str = "extraction", pool: Optional[WorkerPool] = None,
+                    metric_labels: Optional[Dict[str, Any]] = None) -> "ExtractionStage":
+        config = config or {}
+        return cls(
+            extract_fn,
+            workers=config.get('extraction_workers'),
+            queue_size=config.get('extraction_queue_size', DEFAULT_QUEUE_SIZE),
+            name=name,
+            pool=pool,
+            metric_labels=metric_labels,
+        )
+
+    def start(self) -> "ExtractionStage":
+        self._thread.start()
+        return self
+
+    def submit(self, callback: Callable[[Optional[Dict[str, Any]]], None], *args: Any) -> None:
+        """Queue ``extract_fn(*args)``; ``callback`` receives the metadata (or None on failure)."""
+        self._slots.acquire()
+        with self._count_lock:
+            self._in_flight += 1
+        for attempt in range(2):
+            executor = self.pool.get()
+            try:
+                future = executor.submit(_timed, self.extract_fn, *args)
+                break
+            except BrokenProcessPool:
+                logger.warning("⚠️  Extraction pool %s broke, restarting it", self.name)
+                self.pool.reset(executor)
+        else:
+            self._release()
+            callback(None)
+            return
+        submitted = time.perf_counter()
+        future.add_done_callback(lambda f: self._results.put((callback, f, submitted)))
+
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self) -> None:
+        with self._count_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        """Wait for in-flight jobs, deliver their results, then stop an owned pool."""
+        for _ in range(self.queue_size):
+            self._slots.acquire()
+        self._results.put(None)
+        self._thread.join()
+        if self._owns_pool:
+            self.pool.shutdown()
+
+    def _run(self) -> None:
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            callback, future, submitted = item
+            try:
+                result = self._result(future)
+                metrics.observe("watcher_stage_seconds", time.perf_counter() - submitted,
+                                stage="extract_queued", **self.metric_labels)
+                callback(result)
+            except Exception as e:
+                logger.error("Error handling extraction result: %s", e)
+            finally:
+                self._release()
+
+    def _result(self, future: Future) -> Optional[Dict[str, Any]]:
+        try:
+            elapsed, result = future.result()
+            metrics.observe("watcher_stage_seconds", elapsed, stage="extract", **self.metric_labels)
+            return result
+        except BrokenProcessPool as e:
+            logger.error("❌ Extraction worker died: %s", e)
+            return None
+        except Exception as e:
+            logger.error("❌ Extraction failed: %s", e)
+            return None
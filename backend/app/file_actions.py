@@ -0,0 +1,212 @@
+import os
+import time
+import uuid
+import errno
+import queue
+import shutil
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACTION_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF_MS = 500
+
+Outcome = Dict[str, Any]
+
+
+def reserve_destination(target_dir: str, base: str) -> str:
+    """Create an empty placeholder for a free name in ``target_dir`` and return its path.
+
+    The name is claimed with ``O_EXCL``, so concurrent movers (other workers,
+    other watchers) never pick the same one; the move then replaces the
+    placeholder atomically. Taken names get a timestamp and then a counter
+    suffix.
+    """
+    name, ext = os.path.splitext(base)
+    stamp = int(time.time())
+    candidates = [base, f"{name}_{stamp}{ext}"]
+    for candidate in candidates + [f"{name}_{stamp}_{n}{ext}" for n in range(1, 1000)]:
+        path = os.path.join(target_dir, candidate)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return path
+        except FileExistsError:
+            continue
+    raise FileExistsError(errno.EEXIST, "No free name in target directory", os.path.join(target_dir, base))
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def move_file(src: str, dest: str) -> None:
+    """Move ``src`` onto ``dest``, copying across filesystems.
+
+    A cross-device move copies into a temporary file next to ``dest``,
+    fsyncs it, renames it into place and only then unlinks ``src``, so a
+    crash leaves at least one complete copy.
+    """
+    try:
+        os.replace(src, dest)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    target_dir = os.path.dirname(dest)
+    tmp = os.path.join(target_dir, f".{os.path.basename(dest)}.{uuid.uuid4().hex}.partial")
+    try:
+        shutil.copy2(src, tmp)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(target_dir)
+    os.unlink(src)
+
+
+class FileAction:
+    """Delete ``path``, or move it into ``target_dir`` when one is given."""
+
+    __slots__ = ("path", "target_dir")
+
+    def __init__(self, path: str, target_dir: Optional[str] = None):
+        self.path = path
+        self.target_dir = target_dir
+
+
+class FileActionExecutor:
+    """Delete and move files for one watcher on ``workers`` threads, off the event thread.
+
+    At most ``queue_size`` actions wait; ``submit()`` blocks beyond that.
+    Failed attempts are retried ``retries`` times with exponential backoff
+    starting at ``retry_backoff_ms``; a move that keeps failing falls back to
+    deleting the file. ``callback`` receives the outcome on the worker thread:
+    ``{"action", "status", "attempts"}`` plus ``destination`` of a move and
+    ``error`` on failure. ``status`` is ``done``, ``failed`` or ``missing``
+    (the file was gone).
+    """
+
+    def __init__(self, workers: int = DEFAULT_ACTION_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 retries: int = DEFAULT_RETRIES, retry_backoff_ms: int = DEFAULT_RETRY_BACKOFF_MS,
+                 name: str = "file-actions", metric_labels: Optional[Dict[str, Any]] = None):
+        self.retries = max(0, int(retries))
+        self.retry_backoff = max(0, int(retry_backoff_ms)) / 1000.0
+        self.name = name
+        self.metric_labels = metric_labels or {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str = "file-actions",
+                    metric_labels: Optional[Dict[str, Any]] = None) -> "FileActionExecutor":
+        return cls(
+            workers=config.get('file_action_workers', DEFAULT_ACTION_WORKERS),
+            queue_size=config.get('file_action_queue_size', DEFAULT_QUEUE_SIZE),
+            retries=config.get('file_action_retries', DEFAULT_RETRIES),
+            retry_backoff_ms=config.get('file_action_retry_backoff_ms', DEFAULT_RETRY_BACKOFF_MS),
+            name=name,
+            metric_labels=metric_labels,
+        )
+
+    def start(self) -> "FileActionExecutor":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, callback: Callable[[Outcome], None], action: FileAction) -> None:
+        self._queue.put((callback, action))
+
+    def try_submit(self, callback: Callable[[Outcome], None], action: FileAction) -> bool:
+        """Like ``submit()`` but never wait; False if ``queue_size`` actions are waiting."""
+        try:
+            self._queue.put_nowait((callback, action))
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self) -> None:
+        """Carry out what is still queued, then stop the threads."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            callback, action = item
+            with metrics.timer("watcher_stage_seconds", stage="file_action", **self.metric_labels):
+                outcome = self._perform(action)
+            metrics.inc("watcher_file_actions_total", action=outcome["action"], status=outcome["status"],
+                        **self.metric_labels)
+            try:
+                callback(outcome)
+            except Exception as e:
+                logger.error("Error handling file action result for %s: %s", action.path, e)
+
+    def _perform(self, action: FileAction) -> Outcome:
+        if action.target_dir:
+            outcome = self._attempt("move", action, lambda: self._move(action))
+            if outcome["status"] != "failed":
+                return outcome
+            logger.error("❌ Failed to move %s, falling back to delete: %s", action.path, outcome["error"])
+            fallback = self._attempt("delete", action, lambda: os.remove(action.path))
+            fallback["move_error"] = outcome["error"]
+            return fallback
+        return self._attempt("delete", action, lambda: os.remove(action.path))
+
+    def _move(self, action: FileAction) -> str:
+        os.makedirs(action.target_dir, exist_ok=True)
+        dest = reserve_destination(action.target_dir, os.path.basename(action.path))
+        try:
+            move_file(action.path, dest)
+        except BaseException:
+            try:
+                os.remove(dest)
+            except OSError:
+                pass
+            raise
+        return dest
+
+    def _attempt(self, kind: str, action: FileAction, run: Callable[[], Optional[str]]) -> Outcome:
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                destination = run()
+            except OSError as e:
+                if isinstance(e, FileNotFoundError) and not os.path.exists(action.path):
+                    return {"action": kind, "status": "missing", "attempts": attempts}
+                error = str(e)
+            else:
+                outcome = {"action": kind, "status": "done", "attempts": attempts}
+                if kind == "move":
+                    outcome["destination"] = destination
+                return outcome
+            if attempts > self.retries:
+                return {"action": kind, "status": "failed", "attempts": attempts, "error": error}
+            logger.warning("⚠️  %s of %s failed (attempt %s), retrying: %s", kind.capitalize(), action.path,
+                           attempts, error)
+            time.sleep(self.retry_backoff * 2 ** (attempts - 1))
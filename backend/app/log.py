@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+# Level of all app.* loggers; per-module overrides go in WATCHER_LOG_LEVELS,
+# e.g. "app.watcher_service=DEBUG,app.deps=DEBUG"
+LOG_LEVEL = os.getenv("WATCHER_LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("WATCHER_LOG_LEVELS", "")
+# "text" or "json" (one object per line)
+LOG_FORMAT = os.getenv("WATCHER_LOG_FORMAT", "text").lower()
+# Records waiting for the writer thread; more are dropped, not waited for
+LOG_QUEUE_SIZE = int(os.getenv("WATCHER_LOG_QUEUE_SIZE", "10000"))
+
+# Attributes every LogRecord has; anything else was passed as context
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_configured_pid: Optional[int] = None
+_listener: Optional[QueueListener] = None
+
+
+def _context(record: logging.LogRecord) -> Dict[str, Any]:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update(_context(record))
+        # Tracebacks were already folded into the message by QueueHandler.prepare
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """``time LEVEL logger [key=value ...] message``"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s%(context)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = _context(record)
+        record.context = "".join(f" {key}={value}" for key, value in context.items())
+        try:
+            return super().format(record)
+        finally:
+            del record.context
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"⚠️  Log queue full, dropped {dropped} records",
+                }))
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    """Adds fixed context fields (e.g. ``watcher_id``) to every record.
+
+    Unlike the stock adapter, fields passed via ``extra=`` at the call site
+    are kept.
+    """
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **(kwargs.get("extra") or {})}
+        return msg, kwargs
+
+
+def get_logger(name: str, **context: Any) -> logging.LoggerAdapter:
+    return ContextAdapter(logging.getLogger(name), context)
+
+
+def configure_logging() -> None:
+    """Route app.* loggers through a queue to a stdout writer thread.
+
+    Safe to call repeatedly; watcher processes call it again after spawn.
+    """
+    global _configured_pid, _listener
+    with _lock:
+        if _configured_pid == os.getpid():
+            return
+        _configured_pid = os.getpid()
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, LOG_QUEUE_SIZE))
+        _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+
+        root = logging.getLogger("app")
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_DroppingQueueHandler(log_queue))
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        for item in filter(None, (part.strip() for part in LOG_LEVELS.split(","))):
+            name, _, level = item.partition("=")
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
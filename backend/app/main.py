@@ -1,8 +1,16 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import auth, watchers, events, users
-from .db import engine, Base, cleanup_orphaned_events
+from .db import engine, Base, ensure_indexes, ASYNC_DB, get_async_sessionmaker, dispose_async_engine
 from .watcher_service import cleanup_all_watchers
+from .cleanup import cleanup_jobs
+from .retention import retention_scheduler
+from .counters import reconcile_scheduler, bootstrap_counters
+from .log import configure_logging
+from .metrics import collector
+
+configure_logging()
 
 app = FastAPI(title="File Watcher API")
 
@@ -25,6 +33,7 @@ app.add_middleware(
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_indexes()
 
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
@@ -34,13 +43,27 @@ app.include_router(users.router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Clean up orphaned events on startup"""
-    cleanup_orphaned_events()
+    """Clean up orphaned events, reconcile counters and start retention pruning, in the background"""
+    if ASYNC_DB:
+        # Fail at startup rather than on the first request if the driver is missing
+        get_async_sessionmaker()
+    cleanup_jobs.delete_orphans()
+    bootstrap_counters()
+    reconcile_scheduler.start()
+    retention_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up all watchers on shutdown"""
+    retention_scheduler.stop()
+    reconcile_scheduler.stop()
     cleanup_all_watchers()
+    await dispose_async_engine()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """Watcher pipeline metrics in Prometheus text format"""
+    return PlainTextResponse(collector.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,201 @@
+import os
+import logging
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from .schemas import VideoMetadataConfig
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100000
+
+# (st_dev, st_ino, st_size, st_mtime_ns, field-set digest)
+CacheKey = Tuple[int, int, int, int, str]
+
+_MISSING = object()
+
+
+def fields_digest(video_config: VideoMetadataConfig) -> str:
+    """Stable digest of the metadata fields a config asks for."""
+    fields = {
+        "general": list(video_config.general_fields),
+        "video": list(video_config.video_fields),
+        "audio": list(video_config.audio_fields),
+        "custom": list(video_config.custom_fields),
+    }
+    if video_config.probe_mode == "header":
+        # A header probe may resolve fewer fields than a full parse
+        fields["probe"] = [video_config.probe_mode, video_config.probe_max_bytes]
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class MetadataCache:
+    """Two-tier cache of extracted metadata keyed by file identity.
+
+    Entries are keyed by (device, inode, size, mtime_ns) plus the requested
+    field set, so renames within a filesystem still hit while any content
+    change misses. The memory tier is an LRU of ``max_entries``; the optional
+    disk tier is a standalone SQLite file that can be shared by several
+    watchers and is trimmed to ``max_disk_entries`` least recently used rows.
+    Lookups are counted in ``watcher_metadata_cache_total`` by tier, labelled
+    with ``metric_labels``.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, db_path: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_DISK_ENTRIES, metric_labels: Optional[Dict[str, Any]] = None):
+        self.metric_labels = metric_labels or {}
+        self.max_entries = max(0, int(max_entries))
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self._memory: "OrderedDict[CacheKey, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._open_disk(db_path)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]],
+                    metric_labels: Optional[Dict[str, Any]] = None) -> Optional["MetadataCache"]:
+        """Build the cache described by a watcher config, or None if it is disabled."""
+        config = config or {}
+        max_entries = config.get('metadata_cache_size', DEFAULT_MEMORY_ENTRIES)
+        db_path = config.get('metadata_cache_path')
+        if not max_entries and not db_path:
+            return None
+        return cls(
+            max_entries=max_entries,
+            db_path=db_path,
+            max_disk_entries=config.get('metadata_cache_max_disk_entries', DEFAULT_DISK_ENTRIES),
+            metric_labels=metric_labels,
+        )
+
+    def _open_disk(self, db_path: str) -> None:
+        try:
+            directory = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata_cache ("
+                "key TEXT PRIMARY KEY, metadata TEXT, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_metadata_cache_last_used ON metadata_cache (last_used)")
+            # Failed extractions cached by earlier versions would never be retried
+            conn.execute("DELETE FROM metadata_cache WHERE metadata IS NULL")
+            self._disk_entries = conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Metadata disk cache %s unavailable, using memory only: %s", db_path, e)
+
+    @staticmethod
+    def key_for(file_path: str, digest: str) -> Optional[CacheKey]:
+        """Identity key for ``file_path``; ``digest`` comes from ``fields_digest()``."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, digest
+
+    @staticmethod
+    def _disk_key(key: CacheKey) -> str:
+        return ":".join(str(part) for part in key)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return ``(hit, metadata)``. A hit may carry None for files with no metadata."""
+        with self._lock:
+            value = self._memory.get(key, _MISSING)
+            if value is not _MISSING:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                metrics.inc("watcher_metadata_cache_total", result="memory_hit", **self.metric_labels)
+                return True, dict(value) if value is not None else None
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT metadata FROM metadata_cache WHERE key = ?", (self._disk_key(key),)
+                    ).fetchone()
+                    if row is not None:
+                        self._conn.execute(
+                            "UPDATE metadata_cache SET last_used = ? WHERE key = ?", (time.time(), self._disk_key(key))
+                        )
+                        value = json.loads(row[0]) if row[0] is not None else None
+                        self._remember(key, value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        metrics.inc("watcher_metadata_cache_total", result="disk_hit", **self.metric_labels)
+                        return True, value
+                except sqlite3.Error as e:
+                    logger.warning("⚠️  Metadata disk cache read failed: %s", e)
+            self.misses += 1
+            metrics.inc("watcher_metadata_cache_total", result="miss", **self.metric_labels)
+            return False, None
+
+    def put(self, key: CacheKey, metadata: Optional[Dict[str, Any]]) -> None:
+        """Cache ``metadata`` for ``key``; None (a failed or empty extraction) is not cached.
+
+        Extraction returns None on transient errors too, and a cached None
+        would outlive them, across restarts in the disk tier.
+        """
+        if metadata is None:
+            return
+        with self._lock:
+            self._remember(key, metadata)
+            if self._conn is None:
+                return
+            try:
+                payload = json.dumps(metadata, default=str)
+                cur = self._conn.execute(
+                    "INSERT OR REPLACE INTO metadata_cache (key, metadata, last_used) VALUES (?, ?, ?)",
+                    (self._disk_key(key), payload, time.time())
+                )
+                # Approximate (replacements count too); corrected on eviction
+                self._disk_entries += cur.rowcount
+                if self._disk_entries > self.max_disk_entries:
+                    self._evict_disk()
+            except sqlite3.Error as e:
+                logger.warning("⚠️  Metadata disk cache write failed: %s", e)
+
+    def _remember(self, key: CacheKey, metadata: Optional[Dict[str, Any]]) -> None:
+        if not self.max_entries:
+            return
+        self._memory[key] = metadata
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        # Trim to 90% of the bound so eviction runs once per batch of inserts
+        target = int(self.max_disk_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM metadata_cache WHERE key IN ("
+            "SELECT key FROM metadata_cache ORDER BY last_used LIMIT "
+            "(SELECT MAX(COUNT(*) - ?, 0) FROM metadata_cache))",
+            (target,)
+        )
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
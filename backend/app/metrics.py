@@ -0,0 +1,283 @@
+import os
+import time
+import queue
+import bisect
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How often watcher processes send their metrics to the API process
+PUSH_INTERVAL_S = float(os.getenv("WATCHER_METRICS_PUSH_INTERVAL_S", "5"))
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "watcher_fs_events_total": ("counter", "Filesystem events received by a watcher"),
+    "watcher_events_written_total": ("counter", "Event rows committed to the database"),
+    "watcher_event_write_errors_total": ("counter", "Event rows that could not be written"),
+    "watcher_events_dropped_total": ("counter", "Events dropped because the watcher's event queue was full"),
+    "watcher_events_degraded_total": ("counter", "Events recorded without metadata because the event queue was full"),
+    "watcher_duplicates_total": ("counter", "Files whose content matched a file seen before, by dedup policy"),
+    "watcher_file_actions_total": ("counter", "Deletes and moves of rejected, excluded and duplicate files, by outcome"),
+    "watcher_metadata_cache_total": ("counter", "Metadata cache lookups, by result (memory_hit, disk_hit, miss)"),
+    "watcher_stage_seconds": ("histogram", "Time spent in a pipeline stage"),
+    "watcher_write_lag_seconds": ("histogram", "Age of the oldest buffered row when its batch was committed"),
+    "watcher_queue_depth": ("gauge", "Items waiting in a pipeline queue"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Key:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Counters, gauges and latency histograms of one process.
+
+    Gauges are callables read when a snapshot is taken, so queue depths cost
+    nothing on the event path. Histograms are stored as per-bucket counts
+    (the last bucket being +Inf) followed by sum and count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Key, float] = {}
+        self._histograms: Dict[Key, List[float]] = {}
+        self._gauges: Dict[Key, Callable[[], float]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            values = self._histograms.get(key)
+            if values is None:
+                values = self._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+            values[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def gauge(self, name: str, read: Callable[[], float], **labels: Any) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = read
+
+    def remove_gauges(self, **labels: Any) -> None:
+        """Drop the gauges carrying all of ``labels`` (e.g. of a stopped watcher)."""
+        wanted = set(_key("", labels)[1])
+        with self._lock:
+            for key in [key for key in self._gauges if wanted <= set(key[1])]:
+                del self._gauges[key]
+
+    def snapshot(self, gauges: bool = True) -> Dict[str, Dict[Key, Any]]:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            readers = list(self._gauges.items()) if gauges else []
+        values = {}
+        for key, read in readers:
+            try:
+                values[key] = float(read())
+            except Exception:
+                continue
+        return {"counters": counters, "histograms": histograms, "gauges": values}
+
+
+metrics = MetricsRegistry()
+
+
+def _merge(into: Dict[str, Dict[Key, Any]], snapshot: Dict[str, Dict[Key, Any]], gauges: bool = True) -> None:
+    for key, value in snapshot["counters"].items():
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    for key, values in snapshot["histograms"].items():
+        total = into["histograms"].get(key)
+        into["histograms"][key] = list(values) if total is None else [a + b for a, b in zip(total, values)]
+    if gauges:
+        for key, value in snapshot["gauges"].items():
+            into["gauges"][key] = into["gauges"].get(key, 0) + value
+
+
+def _subtract(into: Dict[str, Dict[Key, Any]], snapshot: Dict[str, Dict[Key, Any]]) -> None:
+    """Undo an earlier ``_merge(into, snapshot, gauges=False)``."""
+    for key, value in snapshot["counters"].items():
+        into["counters"][key] = into["counters"].get(key, 0) - value
+    for key, values in snapshot["histograms"].items():
+        total = into["histograms"].get(key)
+        if total is not None:
+            into["histograms"][key] = [a - b for a, b in zip(total, values)]
+
+
+def _empty() -> Dict[str, Dict[Key, Any]]:
+    return {"counters": {}, "histograms": {}, "gauges": {}}
+
+
+class MetricsPusher:
+    """Sends this process' registry to the API process every ``interval_s``."""
+
+    def __init__(self, target: "multiprocessing.Queue", source: str, interval_s: float = PUSH_INTERVAL_S):
+        self.target = target
+        self.source = f"{source}:{os.getpid()}"
+        self.interval_s = max(0.5, interval_s)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-push", daemon=True)
+
+    def start(self) -> "MetricsPusher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Send a final snapshot; its counters outlive the process, its gauges do not."""
+        self._stop.set()
+        self._thread.join()
+        self._push(final=True)
+        # Let the queue's feeder thread hand the last snapshot over before exit
+        self.target.close()
+        self.target.join_thread()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._push(final=False)
+
+    def _push(self, final: bool) -> None:
+        try:
+            self.target.put_nowait((self.source, final, metrics.snapshot(gauges=not final)))
+        except queue.Full:
+            pass
+        except Exception as e:
+            logger.warning("⚠️  Could not push metrics: %s", e)
+
+
+class MetricsCollector:
+    """API-side aggregate of the metrics pushed by watcher processes.
+
+    Counters and histograms of processes that stopped (or stopped pushing)
+    are kept, so totals never go backwards; their gauges are dropped. A
+    source retired as stale that pushes again (after a long pause) has its
+    retired snapshot taken back out, since pushes are cumulative.
+    """
+
+    def __init__(self, push_interval_s: float = PUSH_INTERVAL_S):
+        self._lock = threading.Lock()
+        self._queue: Optional["multiprocessing.Queue"] = None
+        self._sources: Dict[str, Tuple[float, Dict[str, Dict[Key, Any]]]] = {}
+        self._retired = _empty()
+        # Snapshots merged into _retired for sources that went stale without a final push
+        self._stale: Dict[str, Dict[str, Dict[Key, Any]]] = {}
+        self.stale_after_s = max(60.0, 6 * push_interval_s)
+
+    def queue(self) -> "multiprocessing.Queue":
+        """Queue to hand to watcher processes; starts the receiver on first use."""
+        with self._lock:
+            if self._queue is None:
+                self._queue = multiprocessing.Queue(maxsize=1000)
+                threading.Thread(target=self._receive, name="metrics-receive", daemon=True).start()
+            return self._queue
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                source, final, snapshot = self._queue.get()
+            except Exception as e:
+                logger.warning("⚠️  Metrics receive failed: %s", e)
+                time.sleep(1)
+                continue
+            with self._lock:
+                stale = self._stale.pop(source, None)
+                if stale is not None:
+                    _subtract(self._retired, stale)
+                if final:
+                    self._sources.pop(source, None)
+                    _merge(self._retired, snapshot, gauges=False)
+                else:
+                    self._sources[source] = (time.monotonic(), snapshot)
+
+    def aggregate(self) -> Dict[str, Dict[Key, Any]]:
+        total = _empty()
+        now = time.monotonic()
+        with self._lock:
+            for source, (received, snapshot) in list(self._sources.items()):
+                if now - received > self.stale_after_s:
+                    # Killed without a final push
+                    del self._sources[source]
+                    _merge(self._retired, snapshot, gauges=False)
+                    self._stale[source] = snapshot
+            _merge(total, self._retired)
+            for _, snapshot in self._sources.values():
+                _merge(total, snapshot)
+        _merge(total, metrics.snapshot())
+        return total
+
+    def by_watcher(self, kind: str, name: str, **match: Any) -> Dict[int, float]:
+        """Sum of one counter or gauge per ``watcher_id``, over series carrying ``match``."""
+        wanted = set(_key("", match)[1])
+        totals: Dict[int, float] = {}
+        for (metric, labels), value in self.aggregate()[kind].items():
+            label_map = dict(labels)
+            if metric != name or "watcher_id" not in label_map or not wanted <= set(labels):
+                continue
+            watcher_id = int(label_map["watcher_id"])
+            totals[watcher_id] = totals.get(watcher_id, 0) + value
+        return totals
+
+    def render(self) -> str:
+        return render_prometheus(self.aggregate())
+
+
+collector = MetricsCollector()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(snapshot: Dict[str, Dict[Key, Any]]) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    samples: Dict[str, List[str]] = {}
+    for kind in ("counters", "gauges"):
+        for (name, labels), value in sorted(snapshot[kind].items()):
+            samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), values in sorted(snapshot["histograms"].items()):
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), values[:-2]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_format_value(values[-1])}")
+
+    output = []
+    for name in sorted(samples):
+        kind, description = METRICS.get(name, ("untyped", name))
+        output.append(f"# HELP {name} {description}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(samples[name])
+    return "\n".join(output) + "\n"
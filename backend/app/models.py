@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, JSON, DateTime, Text
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, JSON, DateTime, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .db import Base
@@ -23,7 +23,9 @@ class Watcher(Base):
     path = Column(Text, nullable=False)
     config = Column(JSON, nullable=False, default={})
     video_config = Column(JSON, nullable=True)  # Video metadata configuration
-    events = relationship("Event", back_populates="watcher", cascade="all, delete-orphan")
+    # Events are never loaded to delete a watcher; they are removed in chunks
+    # by a background job (see cleanup.py)
+    events = relationship("Event", back_populates="watcher", cascade="save-update, merge", passive_deletes="all")
 
 class Event(Base):
     __tablename__ = "events"
@@ -31,7 +33,47 @@ class Event(Base):
     watcher_id = Column(Integer, ForeignKey("watchers.id"), nullable=False, index=True)
     event_type = Column(String(50), nullable=False)  # created | modified | deleted | rejected
     file_path = Column(Text, nullable=False)
-    video_metadata = Column(JSON, nullable=True)  # Extracted video metadata
-    validation_result = Column(JSON, nullable=True)  # Video validation results
+    # none_as_null stores None as SQL NULL rather than the JSON text "null"
+    video_metadata = Column(JSON(none_as_null=True), nullable=True)  # Extracted video metadata
+    validation_result = Column(JSON(none_as_null=True), nullable=True)  # Video validation results
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    watcher = relationship("Watcher", back_populates="events")
\ No newline at end of file
+    watcher = relationship("Watcher", back_populates="events")
+
+    # Composite indexes for keyset pagination (ORDER BY id) under the /events filters
+    __table_args__ = (
+        Index("ix_events_watcher_id_id", "watcher_id", "id"),
+        Index("ix_events_watcher_id_event_type_id", "watcher_id", "event_type", "id"),
+        Index("ix_events_event_type_id", "event_type", "id"),
+        # path_prefix is a range on file_path; this index serves it within a watcher
+        Index("ix_events_watcher_id_file_path", "watcher_id", "file_path"),
+        Index("ix_events_event_type_created_at", "event_type", "created_at"),
+        Index("ix_events_created_at", "created_at"),
+    )
+
+class EventRollup(Base):
+    """Hourly event counts kept after raw events are pruned by retention."""
+    __tablename__ = "event_rollups"
+    id = Column(Integer, primary_key=True, index=True)
+    watcher_id = Column(Integer, ForeignKey("watchers.id"), nullable=False)
+    bucket = Column(DateTime(timezone=True), nullable=False)  # start of the hour (UTC)
+    event_type = Column(String(50), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    rejected_rules = Column(JSON, nullable=True)  # {"<field> <operator> <value>": count} for rejected events
+
+    __table_args__ = (
+        UniqueConstraint("watcher_id", "bucket", "event_type", name="uq_event_rollups_watcher_bucket_type"),
+        Index("ix_event_rollups_bucket", "bucket"),
+    )
+
+class EventCounter(Base):
+    """Running event counts per watcher and event type.
+
+    Updated in the same transaction as event inserts and retention deletes,
+    so statistics never have to scan the events table.
+    """
+    __tablename__ = "event_counters"
+    watcher_id = Column(Integer, ForeignKey("watchers.id"), primary_key=True)
+    event_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    with_video_metadata = Column(Integer, nullable=False, default=0)
+    with_validation = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,272 @@
+import os
+import logging
+import time
+import sqlite3
+import functools
+from typing import Dict, List, Optional, Set, Tuple
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileModifiedEvent
+from watchdog.observers.api import BaseObserver, EventEmitter, DEFAULT_OBSERVER_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_S = 5
+DEFAULT_IO_BUDGET = 500  # filesystem operations per second
+
+# (size, mtime_ns, inode); None until the file was first stat'ed
+FileState = Optional[Tuple[int, int, int]]
+
+
+class _IOBudget:
+    """Filesystem operations left in the current poll cycle."""
+
+    def __init__(self, ops: int):
+        self.remaining = ops
+
+    def spend(self, ops: int = 1) -> None:
+        self.remaining -= ops
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+
+class DirectoryIndex:
+    """Persisted state of a polled tree: directory mtimes and file stats.
+
+    Directory paths and mtimes are also held in memory (there are far fewer
+    directories than files); file rows are only read one directory or one
+    verification batch at a time.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (dir TEXT NOT NULL, name TEXT NOT NULL, "
+            "size INTEGER, mtime_ns INTEGER, inode INTEGER, PRIMARY KEY (dir, name)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self.dirs: Dict[str, int] = {}
+        self.children: Dict[str, Set[str]] = {}
+        for path, parent, mtime_ns in self._conn.execute("SELECT path, parent, mtime_ns FROM dirs"):
+            self.dirs[path] = mtime_ns
+            if parent is not None:
+                self.children.setdefault(parent, set()).add(path)
+
+    def set_dir(self, path: str, parent: Optional[str], mtime_ns: int) -> None:
+        if path not in self.dirs and parent is not None:
+            self.children.setdefault(parent, set()).add(path)
+        self.dirs[path] = mtime_ns
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)", (path, parent, mtime_ns)
+        )
+
+    def remove_dir(self, path: str, parent: Optional[str]) -> None:
+        self.dirs.pop(path, None)
+        self.children.pop(path, None)
+        if parent in self.children:
+            self.children[parent].discard(path)
+        self._conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+        self._conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+
+    def files_in(self, directory: str) -> Dict[str, FileState]:
+        return {
+            name: (size, mtime_ns, inode) if size is not None else None
+            for name, size, mtime_ns, inode in self._conn.execute(
+                "SELECT name, size, mtime_ns, inode FROM files WHERE dir = ?", (directory,)
+            )
+        }
+
+    def set_file(self, directory: str, name: str, state: FileState) -> None:
+        size, mtime_ns, inode = state if state is not None else (None, None, None)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (dir, name, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?)",
+            (directory, name, size, mtime_ns, inode)
+        )
+
+    def remove_file(self, directory: str, name: str) -> None:
+        self._conn.execute("DELETE FROM files WHERE dir = ? AND name = ?", (directory, name))
+
+    def files_after(self, cursor: Tuple[str, str], limit: int) -> List[Tuple[str, str, FileState]]:
+        rows = self._conn.execute(
+            "SELECT dir, name, size, mtime_ns, inode FROM files WHERE (dir, name) > (?, ?) "
+            "ORDER BY dir, name LIMIT ?", (*cursor, limit)
+        ).fetchall()
+        return [(d, n, (s, m, i) if s is not None else None) for d, n, s, m, i in rows]
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+
+def _stat_state(path: str) -> FileState:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class IndexedPollingEmitter(EventEmitter):
+    """Polls a tree for mounts without change notifications (NFS, SMB).
+
+    Each cycle stats known directories round-robin and re-lists only those
+    whose mtime changed, which reveals created, deleted and renamed files.
+    Operations left over in the cycle's budget (``io_budget`` per second of
+    ``interval_s``) re-stat indexed files round-robin to catch in-place
+    modifications, which do not touch the directory mtime. The first poll of
+    an empty index only records the tree, like a freshly started observer.
+    """
+
+    def __init__(self, event_queue, watch, *, timeout: float = DEFAULT_OBSERVER_TIMEOUT, event_filter=None,
+                 index_path: str, interval_s: float = DEFAULT_INTERVAL_S, io_budget: int = DEFAULT_IO_BUDGET):
+        super().__init__(event_queue, watch, timeout=timeout, event_filter=event_filter)
+        self.root = os.path.abspath(watch.path)
+        self.recursive = watch.is_recursive
+        self.interval_s = max(0.1, float(interval_s))
+        self.io_budget = max(1, int(io_budget))
+        self.index = DirectoryIndex(index_path)
+        self._dir_cursor = 0
+        self._file_cursor: Tuple[str, str] = ("", "")
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            self.index.close()
+
+    def queue_events(self, timeout: float) -> None:
+        started = time.monotonic()
+        budget = _IOBudget(int(self.io_budget * self.interval_s))
+        try:
+            if self.root not in self.index.dirs:
+                self._relist(self.root, None, budget, emit=False)
+            else:
+                self._check_dirs(budget)
+                self._verify_files(budget)
+        except Exception as e:
+            logger.error("❌ Polling %s failed: %s", self.root, e)
+        finally:
+            self.index.commit()
+        self.stopped_event.wait(max(0.0, self.interval_s - (time.monotonic() - started)))
+
+    def _parent(self, path: str) -> Optional[str]:
+        return None if path == self.root else os.path.dirname(path)
+
+    def _check_dirs(self, budget: _IOBudget) -> None:
+        directories = list(self.index.dirs)
+        for _ in range(len(directories)):
+            if budget.exhausted or self.stopped_event.is_set():
+                return
+            self._dir_cursor %= len(directories)
+            directory = directories[self._dir_cursor]
+            self._dir_cursor += 1
+            if directory not in self.index.dirs:
+                continue  # removed along with a parent earlier in this cycle
+            budget.spend()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                self._remove_tree(directory)
+                continue
+            except OSError:
+                continue
+            if mtime_ns != self.index.dirs[directory]:
+                self._relist(directory, self._parent(directory), budget, emit=True)
+
+    def _relist(self, directory: str, parent: Optional[str], budget: _IOBudget, emit: bool) -> None:
+        try:
+            # Taken before listing, so changes made meanwhile trigger another pass
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except FileNotFoundError:
+            self._remove_tree(directory)
+            return
+        except OSError:
+            return
+        budget.spend(1 + len(entries) // 1000)
+        known = self.index.files_in(directory)
+        subdirs: List[str] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                subdirs.append(entry.path)
+                continue
+            if entry.name in known:
+                del known[entry.name]
+                continue
+            if not emit:
+                # Baseline: record the state so the first verification pass
+                # can already report modifications
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    self.index.set_file(directory, entry.name, (st.st_size, st.st_mtime_ns, st.st_ino))
+                except OSError:
+                    self.index.set_file(directory, entry.name, None)
+                continue
+            # Stat'ed later by verification, once the settle step has seen
+            # the file through being written
+            self.index.set_file(directory, entry.name, None)
+            self.queue_event(FileCreatedEvent(entry.path))
+        # Whatever is left was not listed any more
+        for name in known:
+            self.index.remove_file(directory, name)
+            if emit:
+                self.queue_event(FileDeletedEvent(os.path.join(directory, name)))
+        self.index.set_dir(directory, parent, mtime_ns)
+
+        if not self.recursive:
+            return
+        listed = set(subdirs)
+        for gone in self.index.children.get(directory, set()) - listed:
+            self._remove_tree(gone)
+        for subdir in subdirs:
+            if subdir not in self.index.dirs:
+                self._relist(subdir, directory, budget, emit)
+
+    def _remove_tree(self, directory: str) -> None:
+        for child in list(self.index.children.get(directory, ())):
+            self._remove_tree(child)
+        for name in self.index.files_in(directory):
+            self.queue_event(FileDeletedEvent(os.path.join(directory, name)))
+        self.index.remove_dir(directory, self._parent(directory))
+
+    def _verify_files(self, budget: _IOBudget) -> None:
+        while not budget.exhausted and not self.stopped_event.is_set():
+            batch = self.index.files_after(self._file_cursor, min(1000, max(1, budget.remaining)))
+            if not batch:
+                self._file_cursor = ("", "")  # wrap around next cycle
+                return
+            for directory, name, state in batch:
+                self._file_cursor = (directory, name)
+                budget.spend()
+                path = os.path.join(directory, name)
+                try:
+                    current = _stat_state(path)
+                except OSError:
+                    continue  # removal is picked up from the directory mtime
+                if current != state:
+                    self.index.set_file(directory, name, current)
+                    if state is not None:
+                        self.queue_event(FileModifiedEvent(path))
+                if budget.exhausted:
+                    return
+
+
+class IndexedPollingObserver(BaseObserver):
+    """Observer for a single polled watch; see IndexedPollingEmitter."""
+
+    def __init__(self, index_path: str, interval_s: float = DEFAULT_INTERVAL_S,
+                 io_budget: int = DEFAULT_IO_BUDGET, timeout: float = DEFAULT_OBSERVER_TIMEOUT):
+        emitter_class = functools.partial(
+            IndexedPollingEmitter, index_path=index_path, interval_s=interval_s, io_budget=io_budget
+        )
+        super().__init__(emitter_class, timeout=timeout)
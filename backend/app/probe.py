@@ -0,0 +1,126 @@
+import io
+import logging
+from typing import Any, Dict, List, Tuple
+from .schemas import VideoMetadataConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_BYTES = 8 * 1024 * 1024
+# MediaInfo ParseSpeed: 0 stops after the container headers, 0.5 is the library default
+HEADER_PARSE_SPEED = 0.0
+DEFAULT_PARSE_SPEED = 0.5
+READ_SIZE = 64 * 1024
+
+# Fields MediaInfo only fills in by parsing into the streams themselves
+# rather than from container headers and indexes
+FRAME_LEVEL_FIELDS = frozenset({
+    "bit_rate_mode", "maximum_bit_rate", "minimum_bit_rate", "frame_count", "stream_size",
+    "scan_type", "scan_order", "format_settings_gop", "gop_open_closed",
+    "hdr_format", "mastering_display_color_primaries", "mastering_display_luminance",
+    "maximum_content_light_level", "maximum_frameaverage_light_level",
+})
+
+TRACK_FIELDS = (("General", "general"), ("Video", "video"), ("Audio", "audio"))
+
+
+class BudgetedReader(io.RawIOBase):
+    """Read-only view of a file that reports end of file once ``budget`` bytes were read.
+
+    Seeks are free, so MediaInfo can still jump to an index at the end of
+    the file (a trailing ``moov`` atom, Matroska cues) as long as the
+    budget lasts.
+    """
+
+    def __init__(self, raw: io.BufferedIOBase, budget: int):
+        self.raw = raw
+        self.budget = max(0, int(budget))
+        self.bytes_read = 0
+        self.exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.budget - self.bytes_read
+        if size is None or size < 0:
+            size = remaining
+        if size > remaining:
+            self.exhausted = True
+            size = remaining
+        if size <= 0:
+            return b""
+        data = self.raw.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.raw.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.raw.tell()
+
+
+def requested_fields(video_config: VideoMetadataConfig) -> List[str]:
+    return [
+        *video_config.general_fields, *video_config.video_fields,
+        *video_config.audio_fields, *video_config.custom_fields,
+    ]
+
+
+def parse_speed_for(video_config: VideoMetadataConfig) -> float:
+    """Lowest MediaInfo ParseSpeed that still yields every requested field."""
+    if any(field in FRAME_LEVEL_FIELDS for field in requested_fields(video_config)):
+        return DEFAULT_PARSE_SPEED
+    return HEADER_PARSE_SPEED
+
+
+def probe(file_path: str, video_config: VideoMetadataConfig) -> Tuple[Any, BudgetedReader]:
+    """Parse ``file_path`` with MediaInfo, reading at most ``probe_max_bytes`` of it."""
+    from pymediainfo import MediaInfo
+
+    budget = video_config.probe_max_bytes or DEFAULT_PROBE_BYTES
+    with open(file_path, "rb") as raw:
+        reader = BudgetedReader(raw, budget)
+        # File_FileName keeps the name-derived fields (complete_name,
+        # file_extension) that a buffer parse would otherwise lack
+        media_info = MediaInfo.parse(
+            reader, parse_speed=parse_speed_for(video_config), buffer_size=min(READ_SIZE, budget),
+            mediainfo_options={"File_FileName": file_path},
+        )
+    return media_info, reader
+
+
+def unresolved_fields(metadata: Dict[str, Any], tracks: List[Any], video_config: VideoMetadataConfig,
+                      exhausted: bool) -> List[str]:
+    """Requested keys a header probe left empty.
+
+    A field of a track type the file does not have only counts when the
+    budget ran out, since the track may simply not have been reached.
+    """
+    track_types = {track.track_type for track in tracks}
+    unresolved = []
+    for track_type, prefix in TRACK_FIELDS:
+        for field in getattr(video_config, f"{prefix}_fields"):
+            key = f"{prefix}_{field}"
+            if key not in metadata and (track_type in track_types or exhausted):
+                unresolved.append(key)
+    for field in video_config.custom_fields:
+        if f"custom_{field}" not in metadata:
+            unresolved.append(f"custom_{field}")
+    return unresolved
+
+
+def probe_report(metadata: Dict[str, Any], tracks: List[Any], video_config: VideoMetadataConfig,
+                 reader: BudgetedReader) -> Dict[str, Any]:
+    """``probe_*`` keys recorded alongside header-probed metadata."""
+    report: Dict[str, Any] = {"probe_bytes_read": reader.bytes_read}
+    unresolved = unresolved_fields(metadata, tracks, video_config, reader.exhausted)
+    if unresolved:
+        report["probe_unresolved"] = unresolved
+        logger.debug("Header probe of %s left %s unresolved (%s bytes read, budget %s)",
+                     reader.raw.name, unresolved, reader.bytes_read,
+                     "exhausted" if reader.exhausted else "not exhausted")
+    return report
@@ -0,0 +1,203 @@
+import os
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import takewhile
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, func
+from .db import SessionLocal
+from .models import Event, EventCounter, EventRollup, Watcher
+from .counters import apply_deltas, deltas_for_rows, has_value
+from .cleanup import CleanupJob, PeriodicJob, cleanup_jobs, DELETE_CHUNK_SIZE, DELETE_CHUNK_PAUSE_MS
+
+logger = logging.getLogger(__name__)
+
+# How often the background pruner enforces retention (0 disables it)
+RETENTION_INTERVAL_S = int(os.getenv("WATCHER_RETENTION_INTERVAL_S", "600"))
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive UTC datetime, the form SQLite stores and returns."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _rule_key(failure: Dict[str, Any]) -> str:
+    return f"{failure.get('field')} {failure.get('operator')} {failure.get('expected_value')}"
+
+
+class RetentionPolicy:
+    """Per-watcher retention read from the watcher ``config``.
+
+    ``retention_days`` and ``retention_max_events`` bound the raw events kept;
+    ``retention_rejected_days`` keeps rejected events for a different
+    (usually longer) time than the rest, and then also exempts them from
+    ``retention_max_events``.
+    """
+
+    def __init__(self, max_age_days: Optional[float] = None, max_events: Optional[int] = None,
+                 rejected_max_age_days: Optional[float] = None):
+        self.max_age_days = max_age_days
+        self.max_events = max_events
+        self.rejected_max_age_days = rejected_max_age_days if rejected_max_age_days is not None else max_age_days
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["RetentionPolicy"]:
+        config = config or {}
+        policy = cls(
+            max_age_days=config.get('retention_days'),
+            max_events=config.get('retention_max_events'),
+            rejected_max_age_days=config.get('retention_rejected_days'),
+        )
+        if policy.max_age_days is None and policy.max_events is None and policy.rejected_max_age_days is None:
+            return None
+        return policy
+
+    @property
+    def separate_rejected(self) -> bool:
+        """Whether rejected events follow their own age limit instead of the general ones."""
+        return self.rejected_max_age_days != self.max_age_days
+
+    def apply(self, db, watcher_id: int, job: Optional[CleanupJob] = None,
+              chunk_size: int = DELETE_CHUNK_SIZE) -> int:
+        """Roll up and delete this watcher's expired events; returns rows removed."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        removed = 0
+        if self.max_age_days is not None and not self.separate_rejected:
+            cutoff = now - timedelta(days=self.max_age_days)
+            removed += _prune_older_than(db, watcher_id, cutoff, None, job, chunk_size)
+        else:
+            if self.max_age_days is not None:
+                cutoff = now - timedelta(days=self.max_age_days)
+                removed += _prune_older_than(db, watcher_id, cutoff, False, job, chunk_size)
+            if self.rejected_max_age_days is not None:
+                cutoff = now - timedelta(days=self.rejected_max_age_days)
+                removed += _prune_older_than(db, watcher_id, cutoff, True, job, chunk_size)
+        if self.max_events is not None:
+            rejected = False if self.separate_rejected else None
+            removed += _prune_over_count(db, watcher_id, int(self.max_events), rejected, job, chunk_size)
+        return removed
+
+
+def _oldest(db, watcher_id: int, rejected: Optional[bool], limit: int) -> List[Any]:
+    query = select(
+        Event.id, Event.watcher_id, Event.event_type, Event.created_at, Event.validation_result,
+        has_value(Event.video_metadata).label("has_video_metadata"),
+    ).where(Event.watcher_id == watcher_id)
+    if rejected is True:
+        query = query.where(Event.event_type == "rejected")
+    elif rejected is False:
+        query = query.where(Event.event_type != "rejected")
+    return db.execute(query.order_by(Event.id).limit(limit)).all()
+
+
+def _roll_up(db, watcher_id: int, rows: List[Any]) -> None:
+    """Add ``rows`` to the hourly rollups of ``watcher_id`` (same transaction as the delete)."""
+    buckets: Dict[Tuple[datetime, str], Tuple[int, Counter]] = {}
+    for row in rows:
+        bucket = _utc(row.created_at).replace(minute=0, second=0, microsecond=0)
+        count, rules = buckets.get((bucket, row.event_type), (0, Counter()))
+        if row.event_type == "rejected" and row.validation_result:
+            for failure in row.validation_result.get("failed_rules", []):
+                if failure.get("action") == "reject":
+                    rules[_rule_key(failure)] += 1
+        buckets[(bucket, row.event_type)] = (count + 1, rules)
+
+    existing = {
+        (_utc(rollup.bucket), rollup.event_type): rollup
+        for rollup in db.query(EventRollup).filter(
+            EventRollup.watcher_id == watcher_id,
+            EventRollup.bucket.in_(list({bucket for bucket, _ in buckets})),
+        )
+    }
+    for (bucket, event_type), (count, rules) in buckets.items():
+        rollup = existing.get((bucket, event_type))
+        if rollup is None:
+            rollup = EventRollup(watcher_id=watcher_id, bucket=bucket, event_type=event_type, count=0)
+            db.add(rollup)
+        rollup.count += count
+        if rules:
+            merged = Counter(rollup.rejected_rules or {})
+            merged.update(rules)
+            rollup.rejected_rules = dict(merged)
+
+
+def _remove(db, watcher_id: int, rows: List[Any], job: Optional[CleanupJob]) -> int:
+    _roll_up(db, watcher_id, rows)
+    apply_deltas(db, deltas_for_rows((
+        {"watcher_id": row.watcher_id, "event_type": row.event_type,
+         "video_metadata": True if row.has_video_metadata else None,
+         "validation_result": row.validation_result}
+        for row in rows
+    ), sign=-1))
+    db.execute(delete(Event).where(Event.id.in_([row.id for row in rows])))
+    db.commit()
+    if job is not None:
+        job.deleted += len(rows)
+    if DELETE_CHUNK_PAUSE_MS:
+        time.sleep(DELETE_CHUNK_PAUSE_MS / 1000.0)
+    return len(rows)
+
+
+def _prune_older_than(db, watcher_id: int, cutoff: datetime, rejected: Optional[bool],
+                      job: Optional[CleanupJob], chunk_size: int) -> int:
+    # Events are appended in time order, so the oldest ids are the expired ones
+    removed = 0
+    while True:
+        rows = _oldest(db, watcher_id, rejected, chunk_size)
+        expired = list(takewhile(lambda row: _utc(row.created_at) < cutoff, rows))
+        if expired:
+            removed += _remove(db, watcher_id, expired, job)
+        if len(expired) < chunk_size:
+            return removed
+
+
+def _counted(db, watcher_id: int, rejected: Optional[bool]) -> int:
+    """Events of ``watcher_id`` according to the counters, without scanning the events table."""
+    query = select(func.coalesce(func.sum(EventCounter.count), 0)).where(EventCounter.watcher_id == watcher_id)
+    if rejected is False:
+        query = query.where(EventCounter.event_type != "rejected")
+    return db.execute(query).scalar()
+
+
+def _prune_over_count(db, watcher_id: int, max_events: int, rejected: Optional[bool],
+                      job: Optional[CleanupJob], chunk_size: int) -> int:
+    # rejected=False leaves rejected events out of both the count and the deletes
+    excess = _counted(db, watcher_id, rejected) - max_events
+    removed = 0
+    while excess > 0:
+        rows = _oldest(db, watcher_id, rejected, min(chunk_size, excess))
+        if not rows:
+            break
+        removed += _remove(db, watcher_id, rows, job)
+        excess -= len(rows)
+    return removed
+
+
+def run_retention(job: CleanupJob) -> None:
+    """Enforce every watcher's retention policy (a cleanup job)."""
+    db = SessionLocal()
+    try:
+        for watcher_id, config in db.query(Watcher.id, Watcher.config).all():
+            policy = RetentionPolicy.from_config(config)
+            if policy is None:
+                continue
+            try:
+                policy.apply(db, watcher_id, job)
+            except Exception as e:
+                db.rollback()
+                logger.error("❌ Retention failed for watcher %s: %s", watcher_id, e)
+    finally:
+        db.close()
+    job.total = job.deleted
+    if job.deleted:
+        logger.info("🗄️  Retention rolled up and pruned %s events", job.deleted)
+
+
+def prune_now() -> CleanupJob:
+    return cleanup_jobs.submit("retention", run_retention)
+
+
+retention_scheduler = PeriodicJob("retention", run_retention, RETENTION_INTERVAL_S)
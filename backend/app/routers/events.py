@@ -1,12 +1,102 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from ..db import get_db
-from ..models import Event
-from ..schemas import EventOut
-from ..deps import get_current_user
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from ..db import get_read_db, ReadSession
+from ..models import Event, EventRollup
+from ..schemas import EventOut, EventRollupOut
+from ..deps import get_current_user_async, get_stream_user
+from ..event_stream import stream_events
 
 router = APIRouter()
 
+# Upper bound for path prefix range scans; sorts after any real path character
+_PREFIX_END = "\U0010ffff"
+
+_EVENT_COLUMNS = (
+    Event.id, Event.watcher_id, Event.event_type, Event.file_path,
+    Event.created_at, Event.video_metadata, Event.validation_result,
+)
+
 @router.get("/", response_model=list[EventOut])
-def list_events(db: Session = Depends(get_db), _: None = Depends(get_current_user)):
-    return db.query(Event).order_by(Event.id.desc()).limit(500).all()
\ No newline at end of file
+async def list_events(
+    before_id: Optional[int] = Query(None, description="Only events with a smaller id (next page of older events)"),
+    after_id: Optional[int] = Query(None, description="Only events with a larger id (newer events since a cursor)"),
+    watcher_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Only events created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events created before this time"),
+    path_prefix: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: ReadSession = Depends(get_read_db),
+    _: None = Depends(get_current_user_async),
+):
+    """List events newest first, paginated by id.
+
+    Pass the smallest id of a page as ``before_id`` to fetch the next page,
+    or the largest id seen as ``after_id`` to fetch the oldest ``limit``
+    events newer than it.
+    """
+    query = select(*_EVENT_COLUMNS)
+    if watcher_id is not None:
+        query = query.where(Event.watcher_id == watcher_id)
+    if event_type is not None:
+        query = query.where(Event.event_type == event_type)
+    if since is not None:
+        query = query.where(Event.created_at >= since)
+    if until is not None:
+        query = query.where(Event.created_at < until)
+    if path_prefix:
+        # A range instead of LIKE keeps the comparison exact and case-sensitive
+        query = query.where(Event.file_path >= path_prefix, Event.file_path < path_prefix + _PREFIX_END)
+    if before_id is not None:
+        query = query.where(Event.id < before_id)
+    if after_id is not None:
+        query = query.where(Event.id > after_id)
+        rows = (await db.execute(query.order_by(Event.id.asc()).limit(limit))).mappings().all()
+        return list(reversed(rows))
+    return (await db.execute(query.order_by(Event.id.desc()).limit(limit))).mappings().all()
+
+@router.get("/rollups", response_model=list[EventRollupOut])
+async def list_rollups(
+    watcher_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Only buckets starting at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only buckets starting before this time"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: ReadSession = Depends(get_read_db),
+    _: None = Depends(get_current_user_async),
+):
+    """Hourly counts of events already removed by retention, oldest first."""
+    query = select(EventRollup)
+    if watcher_id is not None:
+        query = query.where(EventRollup.watcher_id == watcher_id)
+    if event_type is not None:
+        query = query.where(EventRollup.event_type == event_type)
+    if since is not None:
+        query = query.where(EventRollup.bucket >= since)
+    if until is not None:
+        query = query.where(EventRollup.bucket < until)
+    query = query.order_by(EventRollup.bucket, EventRollup.watcher_id, EventRollup.event_type).limit(limit)
+    return (await db.execute(query)).scalars().all()
+
+@router.get("/stream")
+def event_stream(
+    watcher_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    after_id: Optional[int] = Query(None, description="Replay events after this id before streaming live ones"),
+    last_event_id: Optional[int] = Header(None),
+    _: None = Depends(get_stream_user),
+):
+    """Stream newly persisted events as Server-Sent Events.
+
+    Each message carries the event id, so a reconnecting EventSource sends it
+    back as ``Last-Event-ID`` and only receives what it missed.
+    """
+    resume_from = last_event_id if last_event_id is not None else after_id
+    return StreamingResponse(
+        stream_events(resume_from, watcher_id=watcher_id, event_type=event_type),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -146,6 +146,8 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
+    # Tokens resolve to the old username/role until dropped from the cache
+    deps.token_cache.invalidate_user(user_id)
     return db_user
 
 @router.delete("/{user_id}")
@@ -177,4 +179,5 @@ def delete_user(
     
     db.delete(db_user)
     db.commit()
+    deps.token_cache.invalidate_user(user_id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -1,14 +1,21 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict
-from ..db import get_db, cleanup_orphaned_events, SessionLocal
-from ..models import Watcher, Event
-from ..schemas import WatcherCreate, WatcherOut, WatcherUpdate
-from ..deps import get_current_user, require_admin
-from ..watcher_service import start_watcher, stop_watcher, list_running
+from sqlalchemy import func, delete, select
+from typing import Any, Dict, List, Optional, Tuple
+from ..db import get_db, SessionLocal, get_read_db, ReadSession
+from ..models import Watcher, Event, EventRollup, EventCounter
+from ..schemas import WatcherCreate, WatcherOut, WatcherUpdate, WatcherBulkAction, VideoMetadataConfig
+from ..deps import get_current_user, require_admin, get_current_user_async, require_admin_async
+from ..watcher_service import start_watcher, stop_watcher, list_running, start_watchers, stop_watchers
+from ..cleanup import cleanup_jobs
+from ..retention import prune_now
+from ..counters import delete_counters, reconcile_now
+from ..metrics import collector
 from pydantic import BaseModel, RootModel
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class RunningWatchersResponse(RootModel[Dict[int, bool]]):
@@ -28,33 +35,39 @@ def create_watcher(data: WatcherCreate, db: Session = Depends(get_db), _: None =
     return watcher
 
 @router.get("/", response_model=list[WatcherOut])
-def list_watchers(db: Session = Depends(get_db), _: None = Depends(get_current_user)):
-    return db.query(Watcher).all()
+async def list_watchers(db: ReadSession = Depends(get_read_db), _: None = Depends(get_current_user_async)):
+    return (await db.execute(select(Watcher))).scalars().all()
 
 @router.get("/running")
-def running(_: None = Depends(get_current_user)):
-    print(f"🔍 /watchers/running endpoint called - START")
+async def running(_: None = Depends(get_current_user_async)):
     try:
-        print(f"🔍 About to call list_running()")
-        result = list_running()
-        print(f"🔍 list_running returned: {result}")
-        print(f"🔍 /watchers/running endpoint called - SUCCESS")
-        return result
-    except Exception as e:
-        print(f"❌ Error in /watchers/running: {e}")
-        print(f"❌ Error type: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        return list_running()
+    except Exception:
+        logger.exception("❌ Error in /watchers/running")
         # Return empty dict instead of raising to avoid 422
-        print(f"🔍 Returning empty dict due to error")
         return {}
 
-@router.get("/{watcher_id}", response_model=WatcherOut)
-def get_watcher(watcher_id: int, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
-    watcher = db.get(Watcher, watcher_id)
-    if not watcher:
-        raise HTTPException(status_code=404, detail="Not found")
-    return watcher
+@router.get("/status")
+async def watcher_status(db: ReadSession = Depends(get_read_db), _: None = Depends(get_current_user_async)):
+    """Running state and event queue health of every watcher.
+
+    Dropped and degraded counts are totals since the API started, as
+    reported by the watcher processes (see /metrics).
+    """
+    running = list_running()
+    dropped = collector.by_watcher("counters", "watcher_events_dropped_total")
+    degraded = collector.by_watcher("counters", "watcher_events_degraded_total")
+    queued = collector.by_watcher("gauges", "watcher_queue_depth", queue="events")
+    watcher_ids = (await db.execute(select(Watcher.id))).scalars().all()
+    return {
+        watcher_id: {
+            "running": running.get(watcher_id, False),
+            "queued_events": int(queued.get(watcher_id, 0)),
+            "dropped_events": int(dropped.get(watcher_id, 0)),
+            "degraded_events": int(degraded.get(watcher_id, 0)),
+        }
+        for watcher_id in watcher_ids
+    }
 
 @router.delete("/{watcher_id}")
 def delete_watcher(watcher_id: int, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
@@ -62,21 +75,25 @@ def delete_watcher(watcher_id: int, db: Session = Depends(get_db), _: None = Dep
     if not watcher:
         raise HTTPException(status_code=404, detail="Not found")
     
-    # Count associated events before deletion
-    event_count = db.query(Event).filter(Event.watcher_id == watcher_id).count()
-    
-    # Stop the watcher process if it's running
+    # Stop the watcher process if it's running; this flushes its pending events
     stop_watcher(watcher_id)
-    
-    # Delete the watcher (this will cascade delete all associated events)
+
+    # Highest event id the watcher wrote; the background job deletes up to it
+    max_event_id = db.query(func.max(Event.id)).filter(Event.watcher_id == watcher_id).scalar()
+
+    # Delete the watcher row now; its events are reclaimed in chunks by a job
+    db.execute(delete(EventRollup).where(EventRollup.watcher_id == watcher_id))
+    delete_counters(db, [watcher_id])
     db.delete(watcher)
     db.commit()
-    
+
+    job = cleanup_jobs.delete_watcher_events(watcher_id, max_event_id) if max_event_id is not None else None
+
     return {
-        "ok": True, 
+        "ok": True,
         "message": f"Watcher '{watcher.name}' deleted successfully",
-        "events_deleted": event_count,
-        "details": f"Deleted {event_count} associated events"
+        "cleanup_job": job.to_dict() if job else None,
+        "details": "Associated events are being deleted in the background" if job else "No associated events"
     }
 
 @router.put("/{watcher_id}", response_model=WatcherOut)
@@ -97,19 +114,68 @@ def update_watcher(watcher_id: int, data: WatcherUpdate, db: Session = Depends(g
     db.refresh(watcher)
     return watcher
 
+def _video_config(watcher: Watcher) -> Optional[VideoMetadataConfig]:
+    # Convert video_config from JSON back to VideoMetadataConfig if it exists
+    return VideoMetadataConfig(**watcher.video_config) if watcher.video_config else None
+
+def _selected(db: Session, data: WatcherBulkAction) -> Tuple[List[Watcher], List[int]]:
+    """Watchers selected by a bulk request, and the requested ids that do not exist."""
+    if data.all:
+        return db.query(Watcher).order_by(Watcher.id).all(), []
+    ids = list(dict.fromkeys(data.ids))
+    watchers = db.query(Watcher).filter(Watcher.id.in_(ids)).all() if ids else []
+    found = {watcher.id for watcher in watchers}
+    return watchers, [watcher_id for watcher_id in ids if watcher_id not in found]
+
+def _start_selected(watchers: List[Watcher]) -> Dict[int, Dict[str, Any]]:
+    results: Dict[int, Dict[str, Any]] = {}
+    specs = []
+    for watcher in watchers:
+        try:
+            specs.append((watcher.id, watcher.path, watcher.config, _video_config(watcher)))
+        except Exception as e:
+            results[watcher.id] = {"started": False, "detail": f"Invalid video_config: {e}"}
+    for watcher_id, ok in start_watchers(specs).items():
+        results[watcher_id] = {"started": ok}
+    return results
+
+# Registered before /{watcher_id}/... so "bulk" is not taken for a watcher id
+@router.post("/bulk/start")
+def bulk_start(data: WatcherBulkAction, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
+    """Start the selected watchers in parallel; ``started`` is false for watchers already running."""
+    watchers, missing = _selected(db, data)
+    results = _start_selected(watchers)
+    results.update({watcher_id: {"started": False, "detail": "Not found"} for watcher_id in missing})
+    return {"results": results}
+
+@router.post("/bulk/stop")
+def bulk_stop(data: WatcherBulkAction, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
+    """Stop the selected watchers with one shared deadline; ``stopped`` is false for watchers not running."""
+    if data.all:
+        # Also running watchers whose rows are gone
+        ids = sorted(set(db.execute(select(Watcher.id)).scalars()) | set(list_running()))
+    else:
+        ids = list(dict.fromkeys(data.ids))
+    return {"results": {watcher_id: {"stopped": ok} for watcher_id, ok in stop_watchers(ids).items()}}
+
+@router.post("/bulk/restart")
+def bulk_restart(data: WatcherBulkAction, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
+    """Stop the selected watchers together, then start them together with their current configuration."""
+    watchers, missing = _selected(db, data)
+    stopped = stop_watchers([watcher.id for watcher in watchers])
+    results = _start_selected(watchers)
+    for watcher_id, result in results.items():
+        result["stopped"] = stopped.get(watcher_id, False)
+    results.update({watcher_id: {"stopped": False, "started": False, "detail": "Not found"} for watcher_id in missing})
+    return {"results": results}
+
 @router.post("/{watcher_id}/start")
 def start_w(watcher_id: int, db: Session = Depends(get_db), _: None = Depends(get_current_user)):
     watcher = db.get(Watcher, watcher_id)
     if not watcher:
         raise HTTPException(status_code=404, detail="Not found")
     
-    # Convert video_config from JSON back to VideoMetadataConfig if it exists
-    video_config = None
-    if watcher.video_config:
-        from ..schemas import VideoMetadataConfig
-        video_config = VideoMetadataConfig(**watcher.video_config)
-    
-    ok = start_watcher(watcher_id, watcher.path, watcher.config, video_config)
+    ok = start_watcher(watcher_id, watcher.path, watcher.config, _video_config(watcher))
     return {"started": ok}
 
 @router.post("/{watcher_id}/stop")
@@ -119,69 +185,80 @@ def stop_w(watcher_id: int, _: None = Depends(get_current_user)):
 
 @router.post("/cleanup", dependencies=[Depends(require_admin)])
 def cleanup_database():
-    """Clean up orphaned events and return database statistics."""
+    """Start a background cleanup of orphaned events."""
+    job = cleanup_jobs.delete_orphans()
+    db = SessionLocal()
     try:
-        # Clean up orphaned events
-        orphaned_count = cleanup_orphaned_events()
-        
-        # Get database statistics
-        db = SessionLocal()
-        try:
-            watcher_count = db.query(Watcher).count()
-            event_count = db.query(Event).count()
-            
-            # Group events by watcher
-            events_by_watcher = db.query(Event.watcher_id, func.count(Event.id)).group_by(Event.watcher_id).all()
-            
-            stats = {
-                "watchers": watcher_count,
-                "total_events": event_count,
-                "events_by_watcher": {str(wid): count for wid, count in events_by_watcher},
-                "orphaned_events_cleaned": orphaned_count
-            }
-            
-            return {
-                "success": True,
-                "message": f"Database cleanup completed. Cleaned up {orphaned_count} orphaned events.",
-                "statistics": stats
-            }
-            
-        finally:
-            db.close()
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
+        stats = _statistics(db)
+    finally:
+        db.close()
+    return {
+        "success": True,
+        "message": "Orphaned event cleanup started",
+        "job": job.to_dict(),
+        "statistics": {
+            "watchers": stats["watchers"],
+            "total_events": stats["total_events"],
+            "events_by_watcher": stats["events_by_watcher"]
+        }
+    }
+
+@router.post("/stats/reconcile", dependencies=[Depends(require_admin)])
+def reconcile_stats():
+    """Recompute the event counters from the events table in the background."""
+    return {"success": True, "job": reconcile_now().to_dict()}
+
+@router.post("/retention/run", dependencies=[Depends(require_admin)])
+def run_retention_now():
+    """Enforce watcher retention policies now instead of at the next interval."""
+    return {"success": True, "job": prune_now().to_dict()}
+
+@router.get("/cleanup/jobs", dependencies=[Depends(require_admin)])
+def list_cleanup_jobs():
+    """Progress of recent background deletion jobs."""
+    return [job.to_dict() for job in cleanup_jobs.list()]
+
+@router.get("/cleanup/jobs/{job_id}")
+def get_cleanup_job(job_id: int, _: None = Depends(get_current_user)):
+    job = cleanup_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return job.to_dict()
 
-@router.get("/stats", dependencies=[Depends(require_admin)])
-def get_database_stats():
+def _statistics(db: Session) -> Dict[str, Any]:
+    """Event statistics from the counters table; one row per watcher and event type."""
+    return _summarize(db.query(EventCounter).all(), db.query(func.count(Watcher.id)).scalar())
+
+def _summarize(counters: list, watchers: int) -> Dict[str, Any]:
+    events_by_watcher: Dict[str, int] = {}
+    events_by_type: Dict[str, int] = {}
+    for counter in counters:
+        events_by_watcher[str(counter.watcher_id)] = events_by_watcher.get(str(counter.watcher_id), 0) + counter.count
+        events_by_type[counter.event_type] = events_by_type.get(counter.event_type, 0) + counter.count
+    return {
+        "watchers": watchers,
+        "total_events": sum(counter.count for counter in counters),
+        "events_with_video_metadata": sum(counter.with_video_metadata for counter in counters),
+        "events_with_validation": sum(counter.with_validation for counter in counters),
+        "events_by_watcher": events_by_watcher,
+        "events_by_type": events_by_type
+    }
+
+@router.get("/stats", dependencies=[Depends(require_admin_async)])
+async def get_database_stats(db: ReadSession = Depends(get_read_db)):
     """Get database statistics."""
     try:
-        db = SessionLocal()
-        try:
-            watcher_count = db.query(Watcher).count()
-            event_count = db.query(Event).count()
-            
-            # Count events with video metadata
-            video_events = db.query(Event).filter(Event.video_metadata.isnot(None)).count()
-            
-            # Count events with validation results
-            validation_events = db.query(Event).filter(Event.validation_result.isnot(None)).count()
-            
-            # Group events by watcher
-            events_by_watcher = db.query(Event.watcher_id, func.count(Event.id)).group_by(Event.watcher_id).all()
-            
-            stats = {
-                "watchers": watcher_count,
-                "total_events": event_count,
-                "events_with_video_metadata": video_events,
-            "events_with_validation": validation_events,
-                "events_by_watcher": {str(wid): count for wid, count in events_by_watcher}
-            }
-            
-            return stats
-            
-        finally:
-            db.close()
-            
+        counters = (await db.execute(select(EventCounter))).scalars().all()
+        watchers = (await db.execute(select(func.count(Watcher.id)))).scalar()
+        return _summarize(counters, watchers)
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
+
+# Registered last so it does not shadow static paths such as /stats
+@router.get("/{watcher_id}", response_model=WatcherOut)
+async def get_watcher(watcher_id: int, db: ReadSession = Depends(get_read_db), _: None = Depends(get_current_user_async)):
+    watcher = (await db.execute(select(Watcher).where(Watcher.id == watcher_id))).scalars().first()
+    if not watcher:
+        raise HTTPException(status_code=404, detail="Not found")
+    return watcher
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Literal, Optional, List, Union
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, validator, field_validator
 from .models import UserRole
@@ -53,10 +53,19 @@ class VideoMetadataConfig(BaseModel):
         "format_name", "file_size", "duration", "overall_bit_rate"
     ]
     custom_fields: List[str] = []
+    # 'full' lets MediaInfo read as much of the file as it likes; 'header'
+    # reads at most probe_max_bytes (container header plus index)
+    probe_mode: Literal['full', 'header'] = 'full'
+    probe_max_bytes: int = 8 * 1024 * 1024
+    # Read MP4/MOV/Matroska headers in Python first; MediaInfo only runs for
+    # what they cannot answer (headers larger than probe_max_bytes included)
+    fast_parse: bool = False
     
     # Validation rules
     validation_rules: List[ValidationRule] = []
     enable_validation: bool = False
+    # Stop at the first rejecting rule instead of reporting every failed rule
+    validation_fail_fast: bool = False
     # What to do with rejected files: 'delete' or 'move'
     reject_handling: Optional[str] = 'delete'
     # If reject_handling == 'move', move rejected files to this directory
@@ -83,6 +92,11 @@ class WatcherOut(BaseModel):
     class Config:
         from_attributes = True
 
+class WatcherBulkAction(BaseModel):
+    """Watchers to start, stop or restart together: those in ``ids``, or every watcher with ``all``"""
+    ids: List[int] = []
+    all: bool = False
+
 class EventOut(BaseModel):
     id: int
     watcher_id: int
@@ -92,4 +106,13 @@ class EventOut(BaseModel):
     video_metadata: Optional[Dict[str, Any]] = None
     validation_result: Optional[Dict[str, Any]] = None  # Validation results
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EventRollupOut(BaseModel):
+    watcher_id: int
+    bucket: datetime  # start of the hour
+    event_type: str
+    count: int
+    rejected_rules: Optional[Dict[str, int]] = None  # failed reject rule -> count
+    class Config:
+        from_attributes = True
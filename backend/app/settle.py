@@ -0,0 +1,157 @@
+import os
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_MS = 1000
+
+
+class _Pending:
+    __slots__ = ("event_type", "stat", "stable_since", "closed")
+
+    def __init__(self, event_type: str, stat: Optional[Tuple[int, int]], now: float):
+        self.event_type = event_type
+        self.stat = stat
+        self.stable_since = now
+        self.closed = False
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class SettleTracker:
+    """Coalesce bursts of created/modified events per path until the file settles.
+
+    A path is considered settled when a close-after-write notification arrives
+    (inotify ``IN_CLOSE_WRITE``, where the platform supports it) or when its
+    size and mtime have not changed for ``settle_ms``. Each burst produces a
+    single ``on_settled(event_type, path)`` call; ``event_type`` is ``created``
+    if the burst started with a creation and ``modified`` otherwise.
+    """
+
+    def __init__(self, on_settled: Callable[[str, str], None], settle_ms: int = DEFAULT_SETTLE_MS,
+                 name: str = "settle", max_pending: Optional[int] = None):
+        self.on_settled = on_settled
+        self.max_pending = max_pending
+        self.settle = max(0, int(settle_ms)) / 1000.0
+        # Re-check often enough that a settled file is emitted within ~25% of settle_ms
+        self.poll_interval = min(max(self.settle / 4, 0.05), 0.5)
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "SettleTracker":
+        self._thread.start()
+        return self
+
+    def touch(self, event_type: str, path: str) -> bool:
+        """Record a created/modified notification for ``path``.
+
+        Returns False, without tracking it, for a new path while ``max_pending``
+        paths are already waiting to settle.
+        """
+        now = time.monotonic()
+        stat = _file_stat(path)
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is None:
+                if self.max_pending is not None and len(self._pending) >= self.max_pending:
+                    return False
+                self._pending[path] = _Pending(event_type, stat, now)
+                return True
+            if event_type == "created":
+                pending.event_type = "created"
+            if stat != pending.stat:
+                pending.stat = stat
+                pending.stable_since = now
+            pending.closed = False
+        return True
+
+    def closed(self, path: str) -> None:
+        """Record a close-after-write notification; the path settles on the next sweep."""
+        stat = _file_stat(path)
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is None:
+                return
+            pending.stat = stat
+            pending.closed = True
+        self._wake.set()
+
+    def discard(self, path: str) -> None:
+        """Forget a pending path, e.g. because it was deleted before settling."""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        """Stop sweeping and hand every path still waiting to settle to ``on_settled``.
+
+        A stop or restart must not lose the last writes, so unsettled paths
+        are emitted as they are rather than dropped.
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        with self._lock:
+            remaining = [(pending.event_type, path) for path, pending in self._pending.items()]
+            self._pending.clear()
+        if remaining:
+            logger.info("Flushing %s files that had not settled before shutdown", len(remaining))
+        for event_type, path in remaining:
+            try:
+                self.on_settled(event_type, path)
+            except Exception as e:
+                logger.error("Error handling unsettled file %s: %s", path, e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            for event_type, path in self._sweep():
+                try:
+                    self.on_settled(event_type, path)
+                except Exception as e:
+                    logger.error("Error handling settled file %s: %s", path, e)
+
+    def _sweep(self):
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._pending.items())
+        settled = []
+        for path, pending in candidates:
+            # stat() outside the lock so slow mounts don't block the observer thread
+            stat = _file_stat(path)
+            with self._lock:
+                if self._pending.get(path) is not pending:
+                    continue
+                if stat is None:
+                    # Vanished before settling; the deleted event is handled separately
+                    del self._pending[path]
+                    continue
+                if pending.closed and stat == pending.stat:
+                    del self._pending[path]
+                    settled.append((pending.event_type, path))
+                elif stat != pending.stat:
+                    pending.stat = stat
+                    pending.stable_since = now
+                    pending.closed = False
+                elif now - pending.stable_since >= self.settle:
+                    del self._pending[path]
+                    settled.append((pending.event_type, path))
+        return settled
@@ -0,0 +1,191 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .schemas import ValidationRule
+
+# Fields reported by MediaInfo in milliseconds but written as seconds in rules
+DURATION_FIELDS = frozenset({'general_duration', 'video_duration'})
+
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Relative evaluation cost used to order rules; membership tests on
+# unhashable values or substrings are the slowest
+_COST_SCALAR = 1
+_COST_SET = 2
+_COST_SEQUENCE = 3
+
+_COERCE_NONE = 0
+_COERCE_NUMBER = 1
+_COERCE_STRING = 2
+
+# Re-rank rules by observed rejection rate this often (evaluations)
+_REORDER_EVERY = 256
+
+
+class _CompiledRule:
+    __slots__ = ("index", "rule", "field", "test", "coerce", "is_duration", "invert", "cost", "hits")
+
+    def __init__(self, index: int, rule: ValidationRule, test: Callable[[Any], bool], cost: int):
+        self.index = index
+        self.rule = rule
+        self.field = rule.field
+        self.test = test
+        self.cost = cost
+        self.is_duration = rule.field in DURATION_FIELDS
+        self.invert = rule.action == "reject"
+        self.hits = 0  # times this rule rejected a file
+        if isinstance(rule.value, (int, float)):
+            self.coerce = _COERCE_NUMBER
+        elif isinstance(rule.value, str):
+            self.coerce = _COERCE_STRING
+        else:
+            self.coerce = _COERCE_NONE
+
+    def failure(self, actual_value: Any) -> Dict[str, Any]:
+        rule = self.rule
+        return {
+            "field": rule.field,
+            "operator": rule.operator,
+            "expected_value": rule.value,
+            "actual_value": actual_value,
+            "action": rule.action,
+            "description": rule.description
+        }
+
+
+def _membership_test(values: Any, negate: bool) -> Tuple[Callable[[Any], bool], int]:
+    if isinstance(values, (list, tuple)):
+        sequence = tuple(values)
+        try:
+            members = frozenset(sequence)
+        except TypeError:
+            members = None
+        if members is not None:
+            def contains(value: Any) -> bool:
+                try:
+                    return value in members
+                except TypeError:
+                    # Unhashable metadata value; fall back to equality scan
+                    return value in sequence
+            cost = _COST_SET
+        else:
+            def contains(value: Any) -> bool:
+                return value in sequence
+            cost = _COST_SEQUENCE
+    else:
+        # A scalar right-hand side keeps Python's own semantics (substring for str)
+        def contains(value: Any) -> bool:
+            return value in values
+        cost = _COST_SEQUENCE
+    if negate:
+        return (lambda value: not contains(value)), cost
+    return contains, cost
+
+
+def _compile_rule(index: int, rule: ValidationRule) -> Optional[_CompiledRule]:
+    if rule.operator in _COMPARATORS:
+        compare = _COMPARATORS[rule.operator]
+        threshold = rule.value
+        return _CompiledRule(index, rule, lambda value: compare(value, threshold), _COST_SCALAR)
+    if rule.operator in ("in", "not_in"):
+        test, cost = _membership_test(rule.value, negate=rule.operator == "not_in")
+        return _CompiledRule(index, rule, test, cost)
+    return None
+
+
+class ValidationPlan:
+    """Validation rules compiled once per watcher.
+
+    Operators are resolved to comparator callables, list operands of
+    ``in``/``not_in`` become frozensets and the field coercion each rule
+    needs is decided up front. ``evaluate()`` returns the same
+    ``(is_valid, validation_result)`` pair as ``validate_video_metadata``.
+
+    Rules run cheapest first and, over time, most-often-rejecting first. With
+    ``fail_fast`` evaluation stops at the first rejecting rule, so
+    ``rules_checked`` and ``failed_rules`` only cover the rules that ran.
+    """
+
+    def __init__(self, rules: List[ValidationRule], fail_fast: bool = False):
+        self.fail_fast = fail_fast
+        # Rules with an unknown operator are still reported in rules_checked
+        self._all: List[Tuple[int, str, Optional[_CompiledRule]]] = [
+            (index, rule.field, _compile_rule(index, rule)) for index, rule in enumerate(rules)
+        ]
+        self._order = sorted(self._all, key=lambda item: (item[2].cost if item[2] else 0, item[0]))
+        self._evaluations = 0
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def _reorder(self) -> None:
+        self._order = sorted(
+            self._all,
+            key=lambda item: (-(item[2].hits if item[2] else 0), item[2].cost if item[2] else 0, item[0])
+        )
+
+    def evaluate(self, metadata: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        self._evaluations += 1
+        if self._evaluations % _REORDER_EVERY == 0:
+            self._reorder()
+
+        checked: List[Tuple[int, str]] = []
+        failed: List[Tuple[int, Dict[str, Any]]] = []
+        rejected = False
+
+        for index, field, compiled in self._order:
+            if field not in metadata:
+                continue
+            checked.append((index, field))
+            if compiled is None:
+                continue
+
+            value = metadata[field]
+            if compiled.is_duration and isinstance(value, (int, float)):
+                value = value / 1000.0  # milliseconds -> seconds
+            if compiled.coerce == _COERCE_NUMBER:
+                if isinstance(value, str):
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        continue
+            elif compiled.coerce == _COERCE_STRING:
+                if isinstance(value, (int, float)):
+                    value = str(value)
+
+            try:
+                passed = compiled.test(value)
+            except TypeError:
+                # Incomparable types (e.g. str vs number); treat like an unknown operator
+                continue
+            if compiled.invert:
+                passed = not passed
+
+            if not passed:
+                failed.append((index, compiled.failure(value)))
+                if compiled.invert:
+                    rejected = True
+                    compiled.hits += 1
+                    if self.fail_fast:
+                        break
+
+        # Report in rule-definition order regardless of evaluation order
+        checked.sort(key=lambda item: item[0])
+        failed.sort(key=lambda item: item[0])
+        validation_result = {
+            "valid": not rejected,
+            "rules_checked": [field for _, field in checked],
+            "failed_rules": [failure for _, failure in failed],
+            "passed": not rejected
+        }
+        return not rejected, validation_result
+
+
+def compile_validation_rules(rules: List[ValidationRule], fail_fast: bool = False) -> ValidationPlan:
+    return ValidationPlan(rules, fail_fast=fail_fast)
@@ -1,99 +1,69 @@
 import time
 import os
 import fnmatch
-from multiprocessing import Process
-from typing import Dict, Any, Optional, List, Tuple
+import signal
+import atexit
+import logging
+import threading
+from multiprocessing import Process, Pipe
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from sqlalchemy.orm import Session
-from .db import SessionLocal
-from .models import Event
+from .event_writer import EventWriter, EventRef
+from .settle import SettleTracker, DEFAULT_SETTLE_MS
+from .event_queue import BoundedEventQueue, DEFAULT_QUEUE_SIZE as DEFAULT_EVENT_QUEUE_SIZE
+from .extraction import ExtractionStage, WorkerPool
+from .metadata_cache import MetadataCache, fields_digest
+from .dedup import HashingStage, DEDUP_POLICIES
+from .file_actions import FileAction, FileActionExecutor
+from .validation import ValidationPlan, compile_validation_rules
+from .catchup import CatchUpScan, SnapshotStore, file_state, DEFAULT_SCAN_WORKERS
+from .polling import IndexedPollingObserver, DEFAULT_INTERVAL_S, DEFAULT_IO_BUDGET
+from .probe import probe, probe_report
+from .container_parser import fast_tracks
 from .schemas import VideoMetadataConfig, ValidationRule
+from .log import configure_logging, get_logger, shutdown_logging
+from .metrics import metrics, collector, MetricsPusher
+
+logger = logging.getLogger(__name__)
+
+# "process" runs one OS process per watcher; "supervisor" hosts watchers on a
+# shared Observer inside WATCHER_SUPERVISOR_SHARDS processes (sharded by id)
+EXECUTION_MODE = os.getenv("WATCHER_EXECUTION_MODE", "process")
+SUPERVISOR_SHARDS = max(1, int(os.getenv("WATCHER_SUPERVISOR_SHARDS", "1")))
+# Size of each supervisor's shared extraction pool (default: CPU cores)
+SUPERVISOR_EXTRACTION_WORKERS = int(os.getenv("WATCHER_SUPERVISOR_EXTRACTION_WORKERS", "0")) or None
+
+# Seconds between "overflow" event rows while a watcher's event queue overflows
+OVERFLOW_REPORT_INTERVAL_S = 10
+
+# How long a stopping watcher may drain before it is killed, and how long the
+# kill may take
+STOP_TIMEOUT_S = 5
+KILL_TIMEOUT_S = 2
+# Threads checking watcher paths (which may be slow network mounts) in bulk starts
+BULK_START_THREADS = 32
+
+WatcherSpec = Tuple[int, str, Dict[str, Any], Optional[VideoMetadataConfig]]
 
 _running_processes: Dict[int, Process] = {}
+_supervisors: Dict[int, "_SupervisorClient"] = {}
+_supervisors_lock = threading.Lock()
+_supervised: Dict[int, "_SupervisorClient"] = {}
 
 def validate_video_metadata(metadata: Dict[str, Any], rules: List[ValidationRule]) -> Tuple[bool, Dict[str, Any]]:
-    """Validate video metadata against rules."""
-    rules_checked = []
-    failed_rules = []
-    
-    for rule in rules:
-        if rule.field not in metadata:
-            # Field not found in metadata, skip this rule
-            continue
-        
-        field_value = metadata[rule.field]
-        rules_checked.append(rule.field)
-        
-        # Special handling for duration fields - convert from milliseconds to seconds
-        if rule.field in ['general_duration', 'video_duration'] and isinstance(field_value, (int, float)):
-            original_value = field_value
-            field_value = field_value / 1000.0  # Convert milliseconds to seconds
-            print(f"   Converting {rule.field}: {original_value}ms -> {field_value}s")
-        
-        # Try to convert field_value to the same type as rule.value for comparison
-        try:
-            if isinstance(rule.value, (int, float)) and isinstance(field_value, str):
-                field_value = float(field_value)
-            elif isinstance(rule.value, str) and isinstance(field_value, (int, float)):
-                field_value = str(field_value)
-        except (ValueError, TypeError):
-            # Can't convert, skip this rule
-            continue
-        
-        # Apply validation logic
-        rule_passed = False
-        
-        if rule.operator == ">":
-            rule_passed = field_value > rule.value
-        elif rule.operator == "<":
-            rule_passed = field_value < rule.value
-        elif rule.operator == ">=":
-            rule_passed = field_value >= rule.value
-        elif rule.operator == "<=":
-            rule_passed = field_value <= rule.value
-        elif rule.operator == "==":
-            rule_passed = field_value == rule.value
-        elif rule.operator == "!=":
-            rule_passed = field_value != rule.value
-        elif rule.operator == "in":
-            rule_passed = field_value in rule.value
-        elif rule.operator == "not_in":
-            rule_passed = field_value not in rule.value
-        else:
-            # Unknown operator, skip this rule
-            continue
-        
-        # For reject rules: if condition is TRUE, the file should be rejected (rule FAILED)
-        # For accept rules: if condition is TRUE, the file should be accepted (rule PASSED)
-        if rule.action == "reject":
-            # Invert the logic for reject rules
-            rule_passed = not rule_passed
-        
-        # If rule failed, add to failed rules
-        if not rule_passed:
-            failed_rules.append({
-                "field": rule.field,
-                "operator": rule.operator,
-                "expected_value": rule.value,
-                "actual_value": field_value,
-                "action": rule.action,
-                "description": rule.description
-            })
-    
-    # Determine if validation passed
-    # If any rule with action="reject" failed, the file is rejected
-    # If any rule with action="accept" failed, the file is rejected
-    rejected = any(rule["action"] == "reject" for rule in failed_rules)
-    
-    validation_result = {
-        "valid": not rejected,
-        "rules_checked": rules_checked,
-        "failed_rules": failed_rules,
-        "passed": not rejected
-    }
-    
-    return not rejected, validation_result
+    """Validate video metadata against rules.
+
+    Compiles the rules on every call; watchers compile once at startup and
+    call ``ValidationPlan.evaluate`` directly.
+    """
+    return compile_validation_rules(rules).evaluate(metadata)
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.3gp', '.ts'}
+
+def is_video_file(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in VIDEO_EXTENSIONS
 
 def extract_video_metadata(file_path: str, video_config: Optional[VideoMetadataConfig]) -> Optional[Dict[str, Any]]:
     """Extract video metadata using pymediainfo if enabled and file is a video."""
@@ -101,23 +71,31 @@ def extract_video_metadata(file_path: str, video_config: Optional[VideoMetadataC
         return None
     
     # Check if file is a video by extension
-    video_extensions = {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.3gp', '.ts'}
-    file_ext = os.path.splitext(file_path)[1].lower()
-    
-    if file_ext not in video_extensions:
+    if not is_video_file(file_path):
         return None
     
     try:
-        from pymediainfo import MediaInfo
-        
-        media_info = MediaInfo.parse(file_path)
-        if not media_info.tracks:
+        # Container headers answer the common fields without loading libmediainfo
+        fast = fast_tracks(file_path, video_config) if video_config.fast_parse else None
+        tracks, reader = fast if fast is not None else (None, None)
+        if video_config.probe_mode != 'header':
+            # probe_* keys are only reported in header mode, whichever parser ran
+            reader = None
+        if tracks is None:
+            from pymediainfo import MediaInfo
+            
+            if video_config.probe_mode == 'header':
+                media_info, reader = probe(file_path, video_config)
+            else:
+                media_info = MediaInfo.parse(file_path)
+            tracks = media_info.tracks
+        if not tracks:
             return None
         
         metadata = {}
         
         # Extract general info
-        for track in media_info.tracks:
+        for track in tracks:
             if track.track_type == "General":
                 for field in video_config.general_fields:
                     if hasattr(track, field) and getattr(track, field) is not None:
@@ -135,22 +113,35 @@ def extract_video_metadata(file_path: str, video_config: Optional[VideoMetadataC
         
         # Add custom fields if specified
         for field in video_config.custom_fields:
-            for track in media_info.tracks:
+            for track in tracks:
                 if hasattr(track, field) and getattr(track, field) is not None:
                     metadata[f"custom_{field}"] = getattr(track, field)
                     break
         
+        if reader is not None:
+            # The report only annotates the result; a fault in it must not discard the metadata
+            try:
+                metadata.update(probe_report(metadata, tracks, video_config, reader))
+            except Exception as e:
+                logger.warning("Error reporting header probe of %s: %s", file_path, e)
+        
         return metadata if metadata else None
         
     except Exception as e:
-        print(f"Error extracting video metadata from {file_path}: {e}")
+        logger.warning("Error extracting video metadata from %s: %s", file_path, e)
         return None
 
 class _Handler(FileSystemEventHandler):
-    def __init__(self, watcher_id: int, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig] = None):
+    def __init__(self, watcher_id: int, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig] = None,
+                 writer: Optional[EventWriter] = None, extraction_pool: Optional[WorkerPool] = None,
+                 path: Optional[str] = None):
         self.watcher_id = watcher_id
+        self.path = path
         self.config = config or {}
+        self.logger = get_logger(__name__, watcher_id=watcher_id)
         self.video_config = video_config
+        # Without a started writer, add() writes through synchronously
+        self.writer = writer or EventWriter.from_config(watcher_id, self.config)
         
         # Default configuration
         self.recursive = self.config.get('recursive', True)
@@ -159,6 +150,127 @@ class _Handler(FileSystemEventHandler):
         self.event_types = self.config.get('event_types', ['created', 'modified', 'deleted'])
         self.auto_delete_excluded = self.config.get('auto_delete_excluded', True)  # New option
 
+        # Events wait here for processing; what happens once event_queue_size
+        # are waiting is up to overflow_policy (block, drop_oldest or degrade)
+        queue_size = self.config.get('event_queue_size', DEFAULT_EVENT_QUEUE_SIZE)
+        self.events = BoundedEventQueue(
+            self._log, capacity=queue_size, policy=self.config.get('overflow_policy', 'block'),
+            on_degraded=self._log_degraded, name=f"events-{watcher_id}",
+        )
+        self._overflow: Dict[str, Dict[str, int]] = {"dropped": {}, "degraded": {}}
+        self._overflow_reported = time.monotonic()
+
+        # Coalesce created/modified bursts until the file stops changing (0 disables)
+        settle_ms = self.config.get('settle_ms', DEFAULT_SETTLE_MS)
+        self.settle_tracker = (
+            SettleTracker(self.events.put, settle_ms=settle_ms, name=f"settle-{watcher_id}", max_pending=queue_size)
+            if settle_ms else None
+        )
+
+        # Metadata extraction runs in worker processes, off the observer thread
+        self.extraction = None
+        self.metadata_cache = None
+        if self.video_config and self.video_config.extract_video_metadata:
+            self.extraction = ExtractionStage.from_config(
+                extract_video_metadata, self.config, name=f"extraction-{watcher_id}", pool=extraction_pool,
+                metric_labels={"watcher_id": watcher_id}
+            )
+            self.metadata_cache = MetadataCache.from_config(self.config, metric_labels={"watcher_id": watcher_id})
+            self._fields_digest = fields_digest(self.video_config)
+
+        # Content hashing flags copies of files already seen, on its own threads
+        self.hashing: Optional[HashingStage] = None
+        self.dedup_policy = self.config.get('dedup_policy', 'tag')
+        if self.config.get('dedup', False):
+            if self.dedup_policy not in DEDUP_POLICIES:
+                raise ValueError(f"Unknown dedup policy {self.dedup_policy!r}, expected one of {DEDUP_POLICIES}")
+            index_path = os.path.join("snapshots", f"watcher_{watcher_id}_hashes.sqlite")
+            try:
+                self.hashing = HashingStage.from_config(
+                    self.config, index_path, name=f"hashing-{watcher_id}", metric_labels={"watcher_id": watcher_id}
+                )
+            except Exception as e:
+                self.logger.warning("⚠️  Duplicate index unavailable, duplicate detection disabled: %s", e)
+
+        # Deleting and moving files (rejects, excluded files, duplicates) can
+        # take minutes across devices, so it runs on its own threads
+        self.file_actions = FileActionExecutor.from_config(
+            self.config, name=f"file-actions-{watcher_id}", metric_labels={"watcher_id": watcher_id}
+        )
+
+        # Validation rules are compiled once for the lifetime of the watcher
+        self.validation_plan: Optional[ValidationPlan] = None
+        if self.video_config and self.video_config.enable_validation and self.video_config.validation_rules:
+            self.validation_plan = compile_validation_rules(
+                self.video_config.validation_rules, fail_fast=self.video_config.validation_fail_fast
+            )
+
+        # Snapshot of the tree for the catch-up scan, kept current by live events
+        self.snapshot: Optional[SnapshotStore] = None
+        self.catch_up: Optional[CatchUpScan] = None
+        if self.config.get('catchup_scan', False):
+            snapshot_path = self.config.get('catchup_snapshot_path') or os.path.join(
+                "snapshots", f"watcher_{watcher_id}.sqlite"
+            )
+            try:
+                self.snapshot = SnapshotStore(snapshot_path)
+            except Exception as e:
+                self.logger.warning("⚠️  Catch-up snapshot %s unavailable, scan disabled: %s", snapshot_path, e)
+
+    def start(self):
+        if self.extraction:
+            self.extraction.start()
+        if self.hashing:
+            self.hashing.start()
+        self.file_actions.start()
+        self.events.start(on_tick=self._report_overflow)
+        if self.settle_tracker:
+            self.settle_tracker.start()
+
+    def start_catch_up(self, path: str):
+        """Replay changes made while the watcher was not running; call once live events flow."""
+        if self.snapshot is None:
+            return
+        self.catch_up = CatchUpScan(
+            path, self.snapshot, self.events.put, self._should_track_file, recursive=self.recursive,
+            workers=self.config.get('catchup_scan_workers', DEFAULT_SCAN_WORKERS),
+            name=f"catchup-{self.watcher_id}",
+        ).start()
+
+    def stop(self):
+        if self.catch_up:
+            self.catch_up.stop()
+        if self.settle_tracker:
+            self.settle_tracker.stop()
+        self.events.stop()
+        self._report_overflow(final=True)
+        if self.hashing:
+            self.hashing.shutdown()
+        if self.extraction:
+            self.extraction.shutdown()
+        self.file_actions.shutdown()
+        if self.metadata_cache:
+            self.logger.info("📊 Metadata cache: %s", self.metadata_cache.stats())
+            self.metadata_cache.close()
+        if self.snapshot:
+            self.snapshot.close()
+
+    def register_gauges(self):
+        labels = {"watcher_id": self.watcher_id}
+        metrics.gauge("watcher_queue_depth", self.events.__len__, queue="events", **labels)
+        metrics.gauge("watcher_queue_depth", self.writer.buffered, queue="writer", **labels)
+        metrics.gauge("watcher_queue_depth", self.file_actions.pending, queue="file_actions", **labels)
+        if self.settle_tracker:
+            metrics.gauge("watcher_queue_depth", self.settle_tracker.pending_count, queue="settle", **labels)
+        if self.extraction:
+            metrics.gauge("watcher_queue_depth", self.extraction.in_flight, queue="extraction", **labels)
+        if self.hashing:
+            metrics.gauge("watcher_queue_depth", self.hashing.pending, queue="hashing", **labels)
+
+    def dispatch(self, event):
+        metrics.inc("watcher_fs_events_total", watcher_id=self.watcher_id, event_type=event.event_type)
+        super().dispatch(event)
+
     def _should_track_file(self, file_path: str) -> bool:
         """Check if the file should be tracked based on patterns."""
         filename = os.path.basename(file_path)
@@ -175,190 +287,701 @@ class _Handler(FileSystemEventHandler):
         
         return False
 
+    def _report_overflow(self, final: bool = False):
+        """Count overflowing events and, at most every OVERFLOW_REPORT_INTERVAL_S, record them as an event row."""
+        dropped, degraded = self.events.take_overflow()
+        for kind, counts in (("dropped", dropped), ("degraded", degraded)):
+            for event_type, count in counts.items():
+                metrics.inc(f"watcher_events_{kind}_total", count, watcher_id=self.watcher_id, event_type=event_type)
+                totals = self._overflow[kind]
+                totals[event_type] = totals.get(event_type, 0) + count
+        if not (self._overflow["dropped"] or self._overflow["degraded"]):
+            return
+        if not final and time.monotonic() - self._overflow_reported < OVERFLOW_REPORT_INTERVAL_S:
+            return
+        self._overflow_reported = time.monotonic()
+        report = {
+            "policy": self.events.policy,
+            "queue_size": self.events.capacity,
+            "dropped": self._overflow["dropped"],
+            "degraded": self._overflow["degraded"],
+        }
+        self._overflow = {"dropped": {}, "degraded": {}}
+        self.logger.warning("⚠️  Event queue overflowed: %s", report)
+        self.writer.add(event_type="overflow", file_path=self.path or "", validation_result=report)
+
+    def _log_degraded(self, event_type: str, file_path: str) -> bool:
+        """Record an event that found the event queue full, on the observer thread.
+
+        Only the path is recorded, without metadata extraction or validation,
+        and nothing here may block: if the writer buffer or the file action
+        queue is full too, the event is given up on (returns False, counted
+        as dropped). Degraded files are not marked in the catch-up snapshot,
+        so the next catch-up scan processes them in full.
+        """
+        if event_type not in self.event_types:
+            return True
+        if not self._should_track_file(file_path):
+            # No existence check here: the executor reports a missing file
+            if event_type == 'created' and self.auto_delete_excluded:
+                return self.file_actions.try_submit(
+                    lambda outcome: self._excluded_deleted(file_path, outcome), FileAction(file_path)
+                )
+            return True
+        return self.writer.try_add(
+            event_type, file_path, validation_result={"degraded": True, "reason": "event_queue_full"}
+        )
+
     def _log(self, event_type: str, file_path: str):
         """Log an event if it matches the configuration."""
+        if event_type == 'deleted' and self.hashing:
+            # A deleted first copy must not mark later copies as duplicates,
+            # whether or not deletions are logged
+            self.hashing.index.forget(file_path)
         if event_type not in self.event_types:
             return
         
         # Check if file should be tracked
         should_track = self._should_track_file(file_path)
         
-        # If file is excluded and it's a 'created' event, delete it immediately (if enabled)
+        # If file is excluded and it's a 'created' event, delete it (if enabled);
+        # the deletion event is logged once the executor has removed it
         if not should_track and event_type == 'created' and os.path.exists(file_path) and self.auto_delete_excluded:
-            try:
-                os.remove(file_path)
-                print(f"🗑️  Excluded file {file_path} automatically deleted")
-                # Log the deletion event
-                self._log_deletion_event(file_path, "excluded_auto_delete")
-                return
-            except Exception as e:
-                print(f"❌ Failed to delete excluded file {file_path}: {e}")
+            self.file_actions.submit(lambda outcome: self._excluded_deleted(file_path, outcome), FileAction(file_path))
+            return
         
         # If file should not be tracked, don't proceed with normal logging
         if not should_track:
             return
         
-        # Extract video metadata if enabled
-        video_metadata = None
+        # Written files are hashed first; _deduplicated() picks up from there
+        if event_type in ['created', 'modified'] and self.hashing:
+            self.hashing.submit(lambda duplicate: self._deduplicated(event_type, file_path, duplicate), file_path)
+            return
+
+        self._process(event_type, file_path)
+
+    def _deduplicated(self, event_type: str, file_path: str, duplicate: Optional[Dict[str, Any]]):
+        """Apply dedup_policy to a copy of content seen before; new content continues normally."""
+        if duplicate is None:
+            self._process(event_type, file_path)
+            return
+        # Only delete while another copy verifiably exists
+        if self.dedup_policy == 'delete' and not self.hashing.index.confirm(file_path, duplicate):
+            self.logger.warning(
+                "⚠️  %s no longer holds this content, keeping %s as the first copy",
+                duplicate["duplicate_of"], file_path
+            )
+            self._process(event_type, file_path)
+            return
+        metrics.inc("watcher_duplicates_total", watcher_id=self.watcher_id, policy=self.dedup_policy)
+        self.logger.info("♻️  %s duplicates %s", file_path, duplicate["duplicate_of"])
+        if self.dedup_policy == 'delete':
+            self.file_actions.submit(
+                lambda outcome: self._duplicate_deleted(event_type, file_path, duplicate, outcome), FileAction(file_path)
+            )
+            return
+        if self.dedup_policy == 'skip':
+            self._remember(event_type, file_path)
+            return
+        self._tag_duplicate(event_type, file_path, duplicate)
+
+    def _duplicate_deleted(self, event_type: str, file_path: str, duplicate: Dict[str, Any], outcome: Dict[str, Any]):
+        if outcome["status"] == "done":
+            self.logger.info("🗑️  Duplicate file %s automatically deleted", file_path)
+            self._log_deletion_event(file_path, "duplicate_auto_delete", duplicate_of=duplicate["duplicate_of"])
+            self._remember("deleted", file_path)
+            return
+        if outcome["status"] == "failed":
+            self.logger.error("❌ Failed to delete duplicate file %s: %s", file_path, outcome["error"])
+        # Still there (or gone by other means): record it like a tagged copy
+        self._tag_duplicate(event_type, file_path, duplicate)
+
+    def _tag_duplicate(self, event_type: str, file_path: str, duplicate: Dict[str, Any]):
+        # Tagged copies are recorded without extracting or validating them again
+        self.writer.add(
+            event_type=event_type,
+            file_path=file_path,
+            video_metadata=None,
+            validation_result={"duplicate": True, **duplicate}
+        )
+        self._remember(event_type, file_path)
+
+    def _process(self, event_type: str, file_path: str):
+        # Hand video files to the extraction pool; the rest of the pipeline
+        # continues in _complete() once the metadata is back
+        if event_type in ['created', 'modified'] and self.extraction and is_video_file(file_path):
+            cache_key = None
+            if self.metadata_cache:
+                cache_key = MetadataCache.key_for(file_path, self._fields_digest)
+                if cache_key is not None:
+                    hit, metadata = self.metadata_cache.get(cache_key)
+                    if hit:
+                        self._complete(event_type, file_path, metadata)
+                        return
+            self.extraction.submit(
+                lambda metadata: self._extracted(event_type, file_path, cache_key, metadata),
+                file_path, self.video_config
+            )
+            return
+        
+        self._complete(event_type, file_path, None)
+
+    def _extracted(self, event_type: str, file_path: str, cache_key, video_metadata: Optional[Dict[str, Any]]):
+        # Failures are not cached: they may be transient (I/O, permissions)
+        if cache_key is not None and video_metadata is not None:
+            self.metadata_cache.put(cache_key, video_metadata)
+        self._complete(event_type, file_path, video_metadata)
+
+    def _complete(self, event_type: str, file_path: str, video_metadata: Optional[Dict[str, Any]]):
+        """Validate, handle rejection and persist an event once its metadata is known."""
         validation_result = None
         file_rejected = False
+        reject_action: Optional[FileAction] = None
         
         if event_type in ['created', 'modified'] and self.video_config:
-            video_metadata = extract_video_metadata(file_path, self.video_config)
-            
-            # Debug: Log extracted metadata
             if video_metadata:
-                print(f"📹 Extracted metadata for {file_path}:")
-                for key, value in video_metadata.items():
-                    print(f"   {key}: {value}")
+                self.logger.debug("📹 Extracted metadata for %s: %s", file_path, video_metadata)
             
             # Apply validation if enabled
-            if (video_metadata and self.video_config.enable_validation and 
-                self.video_config.validation_rules):
-                
-                print(f"🔍 Validation enabled for {file_path}")
-                print(f"   Rules to check: {len(self.video_config.validation_rules)}")
-                for rule in self.video_config.validation_rules:
-                    print(f"   Rule: {rule.field} {rule.operator} {rule.value} -> {rule.action}")
-                
-                is_valid, validation_result = validate_video_metadata(
-                    video_metadata, self.video_config.validation_rules
-                )
-                
-                print(f"   Validation result: {validation_result}")
+            if video_metadata and self.validation_plan:
+                with metrics.timer("watcher_stage_seconds", watcher_id=self.watcher_id, stage="validate"):
+                    is_valid, validation_result = self.validation_plan.evaluate(video_metadata)
                 
                 # Check if file should be rejected
                 if not is_valid:
                     file_rejected = True
-                    print(f"🚫 Video validation failed for {file_path}")
-                    print(f"   Validation result: {validation_result}")
+                    self.logger.info("🚫 Video validation failed for %s", file_path,
+                                     extra={"failed_rules": validation_result.get("failed_rules")})
                     
-                    # Handle rejected file per configuration
-                    try:
-                        if os.path.exists(file_path):
-                            handling = getattr(self.video_config, 'reject_handling', 'delete')
-                            if handling == 'move':
-                                target_dir = getattr(self.video_config, 'reject_move_to_dir', None)
-                                if target_dir and isinstance(target_dir, str):
-                                    try:
-                                        os.makedirs(target_dir, exist_ok=True)
-                                        base = os.path.basename(file_path)
-                                        dest_path = os.path.join(target_dir, base)
-                                        # If destination exists, append timestamp
-                                        if os.path.exists(dest_path):
-                                            name, ext = os.path.splitext(base)
-                                            dest_path = os.path.join(target_dir, f"{name}_{int(time.time())}{ext}")
-                                        os.replace(file_path, dest_path)
-                                        print(f"📁 Rejected file moved to: {dest_path}")
-                                    except Exception as move_err:
-                                        print(f"❌ Failed to move rejected file, falling back to delete: {move_err}")
-                                        os.remove(file_path)
-                                        print(f"🗑️  Rejected file deleted: {file_path}")
-                                else:
-                                    # No valid dir; delete as fallback
-                                    os.remove(file_path)
-                                    print(f"🗑️  Rejected file deleted (no valid move dir): {file_path}")
-                            else:
-                                os.remove(file_path)
-                                print(f"🗑️  Rejected file deleted: {file_path}")
-                            # Change event type to indicate rejection
-                            event_type = "rejected"
-                        else:
-                            print(f"⚠️  File {file_path} no longer exists, cannot handle rejection")
-                    except Exception as e:
-                        print(f"❌ Error handling rejected file {file_path}: {e}")
+                    # Delete or move it on the file action executor once the
+                    # row is queued; the outcome replaces its pending file_action
+                    if os.path.exists(file_path):
+                        reject_action = self._reject_action(file_path)
+                        validation_result = {**validation_result, "file_action": {
+                            "action": "move" if reject_action.target_dir else "delete", "status": "pending"
+                        }}
+                        # Change event type to indicate rejection
+                        event_type = "rejected"
+                    else:
+                        self.logger.warning("⚠️  File %s no longer exists, cannot handle rejection", file_path)
                 else:
-                    print(f"✅ Video validation passed for {file_path}")
-            else:
-                print(f"⚠️  Validation not enabled or no rules for {file_path}")
-                if not video_metadata:
-                    print("   No video metadata extracted")
-                if not self.video_config.enable_validation:
-                    print("   Validation not enabled")
-                if not self.video_config.validation_rules:
-                    print("   No validation rules")
+                    self.logger.debug("✅ Video validation passed for %s", file_path)
+            elif self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Validation skipped for %s (metadata: %s, validation enabled: %s, rules: %s)", file_path,
+                    bool(video_metadata), self.video_config.enable_validation, len(self.video_config.validation_rules or [])
+                )
             
-        db: Session = SessionLocal()
-        try:
-            event = Event(
-                watcher_id=self.watcher_id, 
-                event_type=event_type, 
-                file_path=file_path,
-                video_metadata=video_metadata,
-                validation_result=validation_result
+        ref = self.writer.add(
+            event_type=event_type,
+            file_path=file_path,
+            video_metadata=video_metadata,
+            validation_result=validation_result,
+            track=reject_action is not None
+        )
+        self._remember(event_type, file_path)
+        if reject_action is not None:
+            self.file_actions.submit(
+                lambda outcome: self._rejected(ref, file_path, validation_result, outcome), reject_action
             )
-            db.add(event)
-            db.commit()
-        except Exception as e:
-            print(f"Error logging event: {e}")
-        finally:
-            db.close()
 
-    def _log_deletion_event(self, file_path: str, reason: str):
-        """Log when an excluded file is automatically deleted."""
-        try:
-            db: Session = SessionLocal()
-            event = Event(
-                watcher_id=self.watcher_id, 
-                event_type="deleted", 
-                file_path=file_path,
-                video_metadata=None,
-                validation_result={"reason": reason, "auto_deleted": True}
-            )
-            db.add(event)
-            db.commit()
-            print(f"📝 Logged auto-deletion event for {file_path}")
-        except Exception as e:
-            print(f"Error logging auto-deletion event: {e}")
-        finally:
-            db.close()
+    def _remember(self, event_type: str, file_path: str):
+        """Record the processed state of a file so the next catch-up scan skips it."""
+        if self.snapshot is None:
+            return
+        if event_type in ('created', 'modified'):
+            try:
+                self.snapshot.mark(file_path, file_state(os.stat(file_path)))
+                return
+            except OSError:
+                pass
+        self.snapshot.forget(file_path)
+
+    def _reject_action(self, file_path: str) -> FileAction:
+        """What to do with a rejected file according to reject_handling."""
+        if getattr(self.video_config, 'reject_handling', 'delete') == 'move':
+            target_dir = getattr(self.video_config, 'reject_move_to_dir', None)
+            if target_dir and isinstance(target_dir, str):
+                return FileAction(file_path, target_dir)
+            # No valid dir; delete as fallback
+            self.logger.warning("⚠️  No valid reject_move_to_dir, rejected file %s will be deleted", file_path)
+        return FileAction(file_path)
+
+    def _rejected(self, ref: EventRef, file_path: str, validation_result: Dict[str, Any], outcome: Dict[str, Any]):
+        """Record how a rejected file was handled on its event row."""
+        if outcome["status"] == "done":
+            if outcome["action"] == "move":
+                self.logger.info("📁 Rejected file moved to: %s", outcome["destination"])
+            else:
+                self.logger.info("🗑️  Rejected file deleted: %s", file_path)
+        elif outcome["status"] == "missing":
+            self.logger.warning("⚠️  File %s no longer exists, cannot handle rejection", file_path)
+        else:
+            self.logger.error("❌ Error handling rejected file %s: %s", file_path, outcome["error"])
+        self.writer.update(ref, {**validation_result, "file_action": outcome})
+
+    def _excluded_deleted(self, file_path: str, outcome: Dict[str, Any]):
+        if outcome["status"] == "done":
+            self.logger.info("🗑️  Excluded file %s automatically deleted", file_path)
+            self._log_deletion_event(file_path, "excluded_auto_delete")
+        elif outcome["status"] == "failed":
+            self.logger.error("❌ Failed to delete excluded file %s: %s", file_path, outcome["error"])
+
+    def _log_deletion_event(self, file_path: str, reason: str, **details: Any):
+        """Log when an excluded or duplicate file is automatically deleted."""
+        self.writer.add(
+            event_type="deleted",
+            file_path=file_path,
+            video_metadata=None,
+            validation_result={"reason": reason, "auto_deleted": True, **details}
+        )
+        self.logger.debug("📝 Queued auto-deletion event for %s", file_path)
+
+    def _on_write(self, event_type: str, file_path: str):
+        # Excluded files skip settling so auto-deletion stays immediate; so do
+        # files arriving while the settle tracker is full
+        if self.settle_tracker and self._should_track_file(file_path):
+            if self.settle_tracker.touch(event_type, file_path):
+                return
+        self.events.put(event_type, file_path)
 
     def on_created(self, event):
         if not event.is_directory:
-            self._log("created", event.src_path)
+            self._on_write("created", event.src_path)
 
     def on_modified(self, event):
         if not event.is_directory:
-            self._log("modified", event.src_path)
+            self._on_write("modified", event.src_path)
+
+    def on_closed(self, event):
+        if not event.is_directory and self.settle_tracker:
+            self.settle_tracker.closed(event.src_path)
 
     def on_deleted(self, event):
         if not event.is_directory:
-            self._log("deleted", event.src_path)
+            if self.settle_tracker:
+                self.settle_tracker.discard(event.src_path)
+            self.events.put("deleted", event.src_path)
+
+    def on_moved(self, event):
+        # Moves are not logged, but the dedup index follows the moved files
+        if self.hashing:
+            try:
+                self.hashing.index.rename(event.src_path, event.dest_path, directory=event.is_directory)
+            except Exception as e:
+                self.logger.error("❌ Error updating dedup index for move of %s: %s", event.src_path, e)
+
+
+class _WatcherRuntime:
+    """Writer and handler for one watcher, scheduled on an observer."""
+
+    def __init__(self, watcher_id: int, path: str, config: Dict[str, Any],
+                 video_config: Optional[VideoMetadataConfig] = None, extraction_pool: Optional[WorkerPool] = None):
+        config = config or {}
+        self.watcher_id = watcher_id
+        self.path = path
+        # Use recursive setting from config
+        self.recursive = config.get('recursive', True)
+        self.writer = EventWriter.from_config(watcher_id, config).start()
+        self.handler = _Handler(watcher_id=watcher_id, config=config, video_config=video_config,
+                                writer=self.writer, extraction_pool=extraction_pool, path=path)
+        self.watch = None
+        # "polling" watches mounts without change notifications (NFS, SMB)
+        # with a private observer instead of the shared native one
+        self.polling_observer: Optional[IndexedPollingObserver] = None
+        if config.get('observer', 'native') == 'polling':
+            self.polling_observer = IndexedPollingObserver(
+                index_path=config.get('polling_index_path') or os.path.join(
+                    "snapshots", f"watcher_{watcher_id}_poll.sqlite"
+                ),
+                interval_s=config.get('polling_interval_s', DEFAULT_INTERVAL_S),
+                io_budget=config.get('polling_io_budget', DEFAULT_IO_BUDGET),
+            )
+        self.observer = None
+
+    def start(self, observer) -> None:
+        self.handler.start()
+        if self.polling_observer is not None:
+            observer = self.polling_observer
+            observer.start()
+        self.observer = observer
+        self.watch = observer.schedule(self.handler, path=self.path, recursive=self.recursive)
+        self.handler.register_gauges()
+        if self.polling_observer is not None:
+            metrics.gauge("watcher_queue_depth", self.polling_observer.event_queue.qsize,
+                          queue="observer", watcher_id=self.watcher_id)
+
+    def start_catch_up(self) -> None:
+        """Start the catch-up scan; call once the observer runs and this watch is scheduled.
+
+        The scan only diffs files last changed before it started, so anything
+        changed earlier than the live watch is in place would be missed by both.
+        """
+        self.handler.start_catch_up(self.path)
+
+    def shares_watch_with(self, other: "_WatcherRuntime") -> bool:
+        return other.observer is self.observer and other.watch == self.watch
+
+    def detach(self, observer, watch_shared: bool = False) -> None:
+        """Stop receiving events; other handlers on a shared watch keep theirs."""
+        if self.watch is None:
+            return
+        if self.polling_observer is not None:
+            self.polling_observer.stop()
+            self.polling_observer.join()
+        elif watch_shared:
+            observer.remove_handler_for_watch(self.handler, self.watch)
+        else:
+            observer.unschedule(self.watch)
+        self.watch = None
+
+    def stop(self) -> None:
+        """Drain the pipeline: pending settles, in-flight extractions, then buffered rows."""
+        self.handler.stop()
+        self.writer.close()
+        metrics.remove_gauges(watcher_id=self.watcher_id)
+
 
+def _run_observer(watcher_id: int, path: str, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig] = None,
+                  metrics_queue=None):
+    configure_logging()
+    pusher = MetricsPusher(metrics_queue, f"watcher-{watcher_id}").start() if metrics_queue is not None else None
+    # stop_watcher() sends SIGTERM; turn it into an orderly shutdown so the
+    # event buffer is drained instead of being lost with the process
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
 
-def _run_observer(watcher_id: int, path: str, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig] = None):
+    runtime = _WatcherRuntime(watcher_id, path, config, video_config)
     observer = Observer()
-    handler = _Handler(watcher_id=watcher_id, config=config, video_config=video_config)
-    
-    # Use recursive setting from config
-    recursive = config.get('recursive', True) if config else True
-    
-    observer.schedule(handler, path=path, recursive=recursive)
+    runtime.start(observer)
+    if runtime.polling_observer is None:
+        metrics.gauge("watcher_queue_depth", observer.event_queue.qsize, queue="observer", watcher_id=watcher_id)
+    observer.start()
+    runtime.start_catch_up()
+    try:
+        while not stop_requested.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Detach while the observer still knows the watch; unschedule() fails
+        # once it is stopped. The pipeline is drained whatever happens here.
+        try:
+            runtime.detach(observer)
+        except Exception as e:
+            logger.error("Error detaching watcher %s: %s", watcher_id, e)
+        finally:
+            try:
+                observer.stop()
+                observer.join()
+            finally:
+                runtime.stop()
+                if pusher is not None:
+                    pusher.stop()
+                shutdown_logging()
+
+
+def _run_supervisor(shard: int, conn, metrics_queue=None) -> None:
+    """Host many watchers on one shared Observer and extraction pool.
+
+    Commands arrive over ``conn`` as ``(seq, command, args)`` and each gets a
+    ``(seq, result)`` reply. SIGTERM (or the parent closing the pipe) drains
+    and stops every hosted watcher.
+    """
+    configure_logging()
+    pusher = MetricsPusher(metrics_queue, f"supervisor-{shard}").start() if metrics_queue is not None else None
+    stop_requested = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_requested.set())
+
+    pool = WorkerPool(SUPERVISOR_EXTRACTION_WORKERS)
+    observer = Observer()
+    metrics.gauge("watcher_queue_depth", observer.event_queue.qsize, queue="observer", supervisor=shard)
     observer.start()
+    runtimes: Dict[int, _WatcherRuntime] = {}
+
+    def start(watcher_id: int, path: str, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig]) -> bool:
+        if watcher_id in runtimes:
+            return False
+        try:
+            runtime = _WatcherRuntime(watcher_id, path, config, video_config, extraction_pool=pool)
+            runtime.start(observer)
+            runtime.start_catch_up()
+        except Exception as e:
+            logger.error("❌ Supervisor %s failed to start watcher %s: %s", shard, watcher_id, e)
+            return False
+        runtimes[watcher_id] = runtime
+        return True
+
+    def detach(watcher_id: int) -> Optional[_WatcherRuntime]:
+        runtime = runtimes.pop(watcher_id, None)
+        if runtime is None:
+            return None
+        try:
+            shared = any(runtime.shares_watch_with(other) for other in runtimes.values())
+            runtime.detach(observer, watch_shared=shared)
+        except Exception as e:
+            logger.error("Error detaching watcher %s in supervisor %s: %s", watcher_id, shard, e)
+        return runtime
+
+    def drain(watcher_id: int, runtime: _WatcherRuntime) -> None:
+        try:
+            runtime.stop()
+        except Exception as e:
+            logger.error("Error stopping watcher %s in supervisor %s: %s", watcher_id, shard, e)
+
+    def stop(watcher_id: int) -> bool:
+        runtime = detach(watcher_id)
+        if runtime is None:
+            return False
+        drain(watcher_id, runtime)
+        return True
+
+    def start_many(specs: List[WatcherSpec]) -> Dict[int, bool]:
+        return {spec[0]: start(*spec) for spec in specs}
+
+    def stop_many(watcher_ids: List[int]) -> Dict[int, bool]:
+        # Detach one at a time (the observer is shared), then drain in parallel
+        detached = {watcher_id: detach(watcher_id) for watcher_id in watcher_ids}
+        threads = [
+            threading.Thread(target=drain, args=(watcher_id, runtime), name=f"stop-{watcher_id}")
+            for watcher_id, runtime in detached.items() if runtime is not None
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {watcher_id: runtime is not None for watcher_id, runtime in detached.items()}
+
+    commands = {"start": start, "stop": stop, "start_many": start_many, "stop_many": stop_many}
     try:
-        while True:
-            time.sleep(1)
+        while not stop_requested.is_set():
+            if not conn.poll(1):
+                continue
+            try:
+                seq, command, args = conn.recv()
+            except EOFError:
+                break
+            conn.send((seq, commands[command](*args)))
+    except KeyboardInterrupt:
+        pass
     finally:
+        for watcher_id in list(runtimes.keys()):
+            stop(watcher_id)
         observer.stop()
         observer.join()
+        pool.shutdown()
+        if pusher is not None:
+            pusher.stop()
+        shutdown_logging()
 
 
-def start_watcher(watcher_id: int, path: str, config: Dict[str, Any] = None, video_config: Optional[VideoMetadataConfig] = None) -> bool:
+class _SupervisorClient:
+    """Parent-side handle for one supervisor process."""
+
+    def __init__(self, shard: int):
+        self.shard = shard
+        self.conn, child_conn = Pipe()
+        # Not a daemon for the same reason as per-process watchers
+        self.process = Process(target=_run_supervisor, args=(shard, child_conn, collector.queue()), daemon=False,
+                               name=f"watcher-supervisor-{shard}")
+        self.process.start()
+        child_conn.close()
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def request(self, command: str, *args: Any, timeout: float = 30) -> Optional[Any]:
+        """Send a command and wait for its reply; None on timeout or a dead supervisor."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            try:
+                self.conn.send((seq, command, args))
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.conn.poll(remaining):
+                        logger.warning("⚠️  Supervisor %s did not answer %s in %ss", self.shard, command, timeout)
+                        return None
+                    reply_seq, result = self.conn.recv()
+                    # Replies to earlier requests that timed out are discarded
+                    if reply_seq == seq:
+                        return result
+            except (EOFError, OSError) as e:
+                logger.error("❌ Supervisor %s unavailable: %s", self.shard, e)
+                return None
+
+    def terminate(self, timeout: float = 10) -> None:
+        try:
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=timeout)
+                if self.process.is_alive():
+                    self.process.kill()
+                    self.process.join(timeout=2)
+        finally:
+            self.conn.close()
+
+
+def _supervisor_for(watcher_id: int) -> _SupervisorClient:
+    shard = watcher_id % SUPERVISOR_SHARDS
+    with _supervisors_lock:
+        client = _supervisors.get(shard)
+        if client is None or not client.is_alive():
+            client = _SupervisorClient(shard)
+            _supervisors[shard] = client
+        return client
+
+
+def _is_running(watcher_id: int) -> bool:
     if watcher_id in _running_processes and _running_processes[watcher_id].is_alive():
+        return True
+    client = _supervised.get(watcher_id)
+    return client is not None and client.is_alive()
+
+
+def start_watcher(watcher_id: int, path: str, config: Dict[str, Any] = None, video_config: Optional[VideoMetadataConfig] = None) -> bool:
+    if _is_running(watcher_id):
         return False
     
     # Validate path exists
     if not os.path.exists(path):
         return False
     
-    p = Process(target=_run_observer, args=(watcher_id, path, config, video_config), daemon=True)
+    if EXECUTION_MODE == "supervisor":
+        client = _supervisor_for(watcher_id)
+        if not client.request("start", watcher_id, path, config, video_config):
+            return False
+        _supervised[watcher_id] = client
+        return True
+    
+    _spawn(watcher_id, path, config, video_config)
+    return True
+
+
+def _spawn(watcher_id: int, path: str, config: Dict[str, Any], video_config: Optional[VideoMetadataConfig]) -> None:
+    # Not a daemon: daemonic processes may not own the extraction worker pool.
+    # cleanup_all_watchers() (also registered with atexit) stops them instead.
+    p = Process(target=_run_observer, args=(watcher_id, path, config, video_config, collector.queue()), daemon=False)
     p.start()
     _running_processes[watcher_id] = p
-    return True
+
+
+def _per_supervisor(command: str, batches: Dict[_SupervisorClient, list]) -> Dict[_SupervisorClient, Optional[Dict[int, bool]]]:
+    """Send ``command`` with each supervisor's batch, to all supervisors at once."""
+    if not batches:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        futures = {client: executor.submit(client.request, command, batch) for client, batch in batches.items()}
+        return {client: future.result() for client, future in futures.items()}
+
+
+def start_watchers(specs: List[WatcherSpec]) -> Dict[int, bool]:
+    """Start several watchers at once; like start_watcher(), False for a watcher means not started.
+
+    Paths are checked in parallel. Processes are forked from this thread,
+    one after another, since forking is cheap but not safe from several
+    threads; supervisors each get one batch, all at the same time.
+    """
+    if not specs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(BULK_START_THREADS, len(specs))) as executor:
+        exists = list(executor.map(lambda spec: os.path.exists(spec[1]), specs))
+    results: Dict[int, bool] = {}
+    pending: List[WatcherSpec] = []
+    for spec, path_exists in zip(specs, exists):
+        startable = path_exists and not _is_running(spec[0])
+        results[spec[0]] = startable
+        if startable:
+            pending.append(spec)
+
+    if EXECUTION_MODE == "supervisor":
+        batches: Dict[_SupervisorClient, List[WatcherSpec]] = {}
+        for spec in pending:
+            batches.setdefault(_supervisor_for(spec[0]), []).append(spec)
+        for client, replies in _per_supervisor("start_many", batches).items():
+            for spec in batches[client]:
+                started = bool(replies and replies.get(spec[0]))
+                results[spec[0]] = started
+                if started:
+                    _supervised[spec[0]] = client
+        return results
+
+    for spec in pending:
+        try:
+            _spawn(*spec)
+        except Exception as e:
+            logger.error("❌ Failed to start watcher %s: %s", spec[0], e)
+            results[spec[0]] = False
+    return results
+
+
+def stop_watchers(watcher_ids: Iterable[int], timeout: float = STOP_TIMEOUT_S) -> Dict[int, bool]:
+    """Stop several watchers at once; like stop_watcher(), False for a watcher means it was not running.
+
+    Every watcher process is sent SIGTERM first and all of them are then
+    joined against one shared deadline, so stopping many takes about as
+    long as stopping the slowest one. Supervisors drain their batches in
+    parallel.
+    """
+    results: Dict[int, bool] = {}
+    batches: Dict[_SupervisorClient, List[int]] = {}
+    processes: Dict[int, Process] = {}
+    for watcher_id in watcher_ids:
+        client = _supervised.pop(watcher_id, None)
+        if client is not None:
+            results[watcher_id] = True
+            if client.is_alive():
+                batches.setdefault(client, []).append(watcher_id)
+            continue
+        p = _running_processes.get(watcher_id)
+        results[watcher_id] = p is not None
+        if p is not None:
+            processes[watcher_id] = p
+
+    # Supervisors drain their batches while the processes below wind down
+    supervisors = threading.Thread(target=_per_supervisor, args=("stop_many", batches), name="stop-supervisors")
+    if batches:
+        supervisors.start()
+    try:
+        for watcher_id, p in processes.items():
+            try:
+                if p.is_alive():
+                    p.terminate()
+            except Exception as e:
+                logger.error("Error stopping watcher %s: %s", watcher_id, e)
+        _join_all(processes.values(), timeout)
+        survivors = [p for p in processes.values() if p.is_alive()]
+        for p in survivors:
+            # Force kill if still alive
+            p.kill()
+        _join_all(survivors, KILL_TIMEOUT_S)
+    finally:
+        # Always remove from running processes
+        for watcher_id in processes:
+            _running_processes.pop(watcher_id, None)
+        if batches:
+            supervisors.join()
+    return results
+
+
+def _join_all(processes: Iterable[Process], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    for p in processes:
+        p.join(timeout=max(0.0, deadline - time.monotonic()))
 
 
 def stop_watcher(watcher_id: int) -> bool:
     """Stop a watcher and clean up its process."""
+    client = _supervised.pop(watcher_id, None)
+    if client is not None:
+        if client.is_alive():
+            client.request("stop", watcher_id)
+        return True
+    
     p = _running_processes.get(watcher_id)
     if not p:
         return False
@@ -366,13 +989,13 @@ def stop_watcher(watcher_id: int) -> bool:
     try:
         if p.is_alive():
             p.terminate()
-            p.join(timeout=5)
+            p.join(timeout=STOP_TIMEOUT_S)
             if p.is_alive():
                 # Force kill if still alive
                 p.kill()
-                p.join(timeout=2)
+                p.join(timeout=KILL_TIMEOUT_S)
     except Exception as e:
-        print(f"Error stopping watcher {watcher_id}: {e}")
+        logger.error("Error stopping watcher %s: %s", watcher_id, e)
     finally:
         # Always remove from running processes
         _running_processes.pop(watcher_id, None)
@@ -386,20 +1009,30 @@ def cleanup_watcher(watcher_id: int) -> bool:
     stop_watcher(watcher_id)
     
     # Additional cleanup if needed
-    print(f"Cleaned up watcher {watcher_id}")
+    logger.info("Cleaned up watcher %s", watcher_id)
     return True
 
 
 def list_running() -> Dict[int, bool]:
     """List all running watchers and their status."""
-    print(f"🔍 list_running called")
-    print(f"🔍 _running_processes keys: {list(_running_processes.keys())}")
     result = {wid: proc.is_alive() for wid, proc in _running_processes.items()}
-    print(f"🔍 Returning result: {result}")
+    result.update({wid: client.is_alive() for wid, client in _supervised.items()})
+    logger.debug("🔍 Running watchers: %s", result)
     return result
 
 
 def cleanup_all_watchers() -> None:
     """Clean up all running watchers. Useful for shutdown."""
-    for watcher_id in list(_running_processes.keys()):
-        cleanup_watcher(watcher_id)
\ No newline at end of file
+    stopped = stop_watchers(list(_running_processes.keys()))
+    if stopped:
+        logger.info("Cleaned up %s watchers", len(stopped))
+    # Supervisors drain every hosted watcher on SIGTERM
+    _supervised.clear()
+    with _supervisors_lock:
+        clients = list(_supervisors.values())
+        _supervisors.clear()
+    for client in clients:
+        client.terminate()
+
+
+atexit.register(cleanup_all_watchers)
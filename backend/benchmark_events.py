@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+End-to-end watcher benchmark: generates file storms in temporary directories
+and measures how long it takes from a file being created to its Event row
+being committed (so settle time and extraction count too), plus CPU and
+memory of each watcher process.
+
+Runs against a throwaway SQLite database (unless WATCHER_DATABASE_URL is
+set) and writes the results as JSON:
+
+    python benchmark_events.py --scenario all --files 2000 --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+_TMP = tempfile.mkdtemp(prefix="watcher-bench-")
+os.environ.setdefault("WATCHER_DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'bench.db')}")
+# Keep watcher output off stdout, where the results may go
+os.environ.setdefault("WATCHER_LOG_LEVEL", "WARNING")
+
+from sqlalchemy import select, func  # noqa: E402
+from app.db import SessionLocal, init_db  # noqa: E402
+from app.models import Watcher, Event  # noqa: E402
+from app import watcher_service  # noqa: E402
+from app.schemas import VideoMetadataConfig, ValidationRule  # noqa: E402
+
+POLL_INTERVAL_S = 0.02
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+class Recorder:
+    """Times at which the generator created and finished writing each file."""
+
+    def __init__(self):
+        self.created: Dict[str, float] = {}
+        self.ready: Dict[str, float] = {}
+        self.excluded = 0
+
+    def creating(self, path: str) -> None:
+        self.created[path] = time.time()
+
+    def written(self, path: str) -> None:
+        self.ready[path] = time.time()
+        self.created.setdefault(path, self.ready[path])
+
+
+def _pace(index: int, started: float, rate: float) -> None:
+    if rate > 0:
+        delay = started + index / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _write(path: str, size: int) -> None:
+    with open(path, "wb") as f:
+        f.write(os.urandom(size) if size else b"")
+
+
+def _mp4_header(payload_size: int) -> bytes:
+    """ftyp box plus the header of an mdat box holding ``payload_size`` bytes.
+
+    Enough for MediaInfo to recognise the file as MPEG-4 and report its
+    general fields, so extraction and validation do real work.
+    """
+    ftyp = struct.pack(">I4s4sI8s", 24, b"ftyp", b"isom", 0x200, b"isommp41")
+    mdat = struct.pack(">I4sQ", 1, b"mdat", 16 + payload_size)
+    return ftyp + mdat
+
+
+def small_files(root: str, args: argparse.Namespace, recorder: Recorder) -> None:
+    """Many small files in one directory."""
+    started = time.monotonic()
+    for i in range(args.files):
+        _pace(i, started, args.rate)
+        path = os.path.join(root, f"small_{i:07d}.txt")
+        _write(path, args.small_size)
+        recorder.written(path)
+
+
+def growing_videos(root: str, args: argparse.Namespace, recorder: Recorder) -> None:
+    """A few large .mp4 files written in chunks in parallel, like a slow copy."""
+    chunk = os.urandom(1024 * 1024)
+    chunks = max(1, args.video_mb)
+
+    def grow(index: int) -> None:
+        path = os.path.join(root, f"video_{index:03d}.mp4")
+        recorder.creating(path)
+        with open(path, "wb") as f:
+            f.write(_mp4_header(chunks * len(chunk)))
+            for _ in range(chunks):
+                f.write(chunk)
+                f.flush()
+                time.sleep(args.video_chunk_ms / 1000.0)
+        recorder.written(path)
+
+    threads = [threading.Thread(target=grow, args=(i,)) for i in range(args.videos)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def deep_tree(root: str, args: argparse.Namespace, recorder: Recorder) -> None:
+    """Files spread over a tree ``depth`` levels deep, created along with it."""
+    started = time.monotonic()
+    for i in range(args.files):
+        _pace(i, started, args.rate)
+        parts = [f"d{(i // (args.fanout ** level)) % args.fanout}" for level in range(args.depth)]
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"file_{i:07d}.txt")
+        _write(path, args.small_size)
+        recorder.written(path)
+
+
+def excluded_storm(root: str, args: argparse.Namespace, recorder: Recorder) -> None:
+    """Mostly excluded temporary files (auto-deleted) with a few tracked ones."""
+    started = time.monotonic()
+    for i in range(args.files):
+        _pace(i, started, args.rate)
+        if i % args.exclude_ratio == 0:
+            path = os.path.join(root, f"keep_{i:07d}.txt")
+            _write(path, args.small_size)
+            recorder.written(path)
+        else:
+            _write(os.path.join(root, f"junk_{i:07d}.tmp"), args.small_size)
+            recorder.excluded += 1
+
+
+# Extraction plus a reject rule that never matches, so every file is validated but kept
+GROWING_VIDEOS_CONFIG = VideoMetadataConfig(
+    extract_video_metadata=True,
+    enable_validation=True,
+    validation_rules=[ValidationRule(field="general_file_size", operator="<", value=1024, action="reject")],
+)
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "small_files": {"generate": small_files, "config": {}},
+    "growing_videos": {
+        "generate": growing_videos,
+        "config": {"include_patterns": ["*.mp4"]},
+        "video_config": GROWING_VIDEOS_CONFIG,
+    },
+    "deep_tree": {"generate": deep_tree, "config": {"recursive": True}},
+    "excluded_storm": {
+        "generate": excluded_storm,
+        "config": {"exclude_patterns": ["*.tmp"], "auto_delete_excluded": True},
+    },
+}
+
+
+def _proc_stat(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces; fields start after ")"
+            return f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+
+
+def _process_tree(pid: int) -> List[int]:
+    """``pid`` and its descendants (the extraction workers)."""
+    parents: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            fields = _proc_stat(int(entry))
+            if fields:
+                parents.setdefault(int(fields[1]), []).append(int(entry))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(parents.get(current, []))
+    return tree
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class ResourceSampler:
+    """Samples CPU time and RSS of a watcher process tree (Linux /proc only)."""
+
+    def __init__(self, pid: Optional[int], interval_s: float = 0.25):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.peak_rss_kb = 0
+        self._cpu_ticks: Dict[int, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.available = pid is not None and os.path.isdir("/proc")
+
+    def start(self) -> "ResourceSampler":
+        if self.available:
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def sample(self) -> None:
+        rss = 0
+        for pid in _process_tree(self.pid):
+            fields = _proc_stat(pid)
+            if fields:
+                # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+                self._cpu_ticks[pid] = int(fields[11]) + int(fields[12])
+            rss += _rss_kb(pid)
+        self.peak_rss_kb = max(self.peak_rss_kb, rss)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval_s)
+
+    def cpu_seconds(self) -> float:
+        return sum(self._cpu_ticks.values()) / CLOCK_TICKS
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _wait_for_rows(watcher_id: int, recorder: Recorder, generation_done: threading.Event,
+                   timeout_s: float) -> Dict[str, float]:
+    """Poll the events table and note when each generated file's row became visible."""
+    seen: Dict[str, float] = {}
+    last_id = 0
+    deadline = None
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Event.id, Event.file_path).where(Event.watcher_id == watcher_id, Event.id > last_id)
+                .order_by(Event.id)
+            ).all()
+        finally:
+            db.close()
+        now = time.time()
+        for row_id, file_path in rows:
+            last_id = row_id
+            seen.setdefault(file_path, now)
+        if generation_done.is_set():
+            if deadline is None:
+                deadline = time.monotonic() + timeout_s
+            if all(path in seen for path in list(recorder.ready)) or time.monotonic() > deadline:
+                return seen
+        time.sleep(POLL_INTERVAL_S)
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    scenario = SCENARIOS[name]
+    root = os.path.join(_TMP, name)
+    os.makedirs(root)
+    config = {**scenario["config"], "settle_ms": args.settle_ms,
+              "event_batch_size": args.batch_size, "event_flush_interval_ms": args.flush_interval_ms}
+    video_config: Optional[VideoMetadataConfig] = scenario.get("video_config")
+
+    db = SessionLocal()
+    try:
+        watcher = Watcher(name=f"benchmark {name}", path=root, config=config,
+                          video_config=video_config.model_dump() if video_config else None)
+        db.add(watcher)
+        db.commit()
+        watcher_id = watcher.id
+    finally:
+        db.close()
+
+    if not watcher_service.start_watcher(watcher_id, root, config, video_config):
+        raise RuntimeError(f"Could not start watcher for {name}")
+    time.sleep(args.warmup_s)
+    # In supervisor mode this is the shared supervisor process
+    process = watcher_service._running_processes.get(watcher_id)
+    client = watcher_service._supervised.get(watcher_id)
+    pid = process.pid if process is not None else client.process.pid if client is not None else None
+    sampler = ResourceSampler(pid).start()
+    cpu_before = None
+    if sampler.available:
+        sampler.sample()
+        cpu_before = sampler.cpu_seconds()
+
+    recorder = Recorder()
+    generation_done = threading.Event()
+    result: Dict[str, Any] = {"scenario": name}
+
+    def generate() -> None:
+        started = time.monotonic()
+        try:
+            scenario["generate"](root, args, recorder)
+        finally:
+            result["generation_s"] = time.monotonic() - started
+            generation_done.set()
+
+    started = time.time()
+    generator = threading.Thread(target=generate, name=f"generate-{name}")
+    generator.start()
+    seen = _wait_for_rows(watcher_id, recorder, generation_done, args.timeout_s)
+    generator.join()
+    elapsed = time.time() - started
+    sampler.stop()
+    if sampler.available:
+        sampler.sample()
+    watcher_service.stop_watcher(watcher_id)
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(func.count()).select_from(Event).where(Event.watcher_id == watcher_id)).scalar()
+    finally:
+        db.close()
+
+    # From creation, so the time a file spends being written and settling counts
+    latencies = [(seen[path] - recorder.created[path]) * 1000 for path in recorder.ready if path in seen]
+    after_write = [(seen[path] - ready) * 1000 for path, ready in recorder.ready.items() if path in seen]
+    last_seen = max(seen.values(), default=started)
+    result.update({
+        "files": len(recorder.ready),
+        "excluded_files": recorder.excluded,
+        "rows": rows,
+        "missing": len(recorder.ready) - len(latencies),
+        "duration_s": round(elapsed, 3),
+        "throughput_rows_per_s": round(rows / max(1e-9, last_seen - started), 1),
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p90": _percentile(latencies, 0.90),
+            "p99": _percentile(latencies, 0.99),
+            "max": max(latencies, default=None),
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+        },
+        "after_write_ms": {
+            "p50": _percentile(after_write, 0.50),
+            "p99": _percentile(after_write, 0.99),
+        },
+        "cpu_percent": (
+            round(100 * (sampler.cpu_seconds() - cpu_before) / max(1e-9, elapsed), 1) if cpu_before is not None else None
+        ),
+        "rss_peak_mb": round(sampler.peak_rss_kb / 1024, 1) if sampler.available else None,
+    })
+    result["generation_s"] = round(result["generation_s"], 3)
+    for section in ("latency_ms", "after_write_ms"):
+        for key, value in result[section].items():
+            if value is not None:
+                result[section][key] = round(value, 2)
+    shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=["all", *SCENARIOS],
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--files", type=int, default=1000, help="Files per storm scenario (default: 1000)")
+    parser.add_argument("--rate", type=float, default=0, help="Files per second, 0 for as fast as possible")
+    parser.add_argument("--small-size", type=int, default=1024, help="Bytes per small file (default: 1024)")
+    parser.add_argument("--videos", type=int, default=4, help="Files in growing_videos (default: 4)")
+    parser.add_argument("--video-mb", type=int, default=64, help="Size of each growing video in MB (default: 64)")
+    parser.add_argument("--video-chunk-ms", type=float, default=10, help="Pause between 1 MB writes (default: 10)")
+    parser.add_argument("--depth", type=int, default=6, help="Directory levels in deep_tree (default: 6)")
+    parser.add_argument("--fanout", type=int, default=4, help="Subdirectories per level in deep_tree (default: 4)")
+    parser.add_argument("--exclude-ratio", type=int, default=10,
+                        help="One tracked file per this many in excluded_storm (default: 10)")
+    parser.add_argument("--settle-ms", type=int, default=1000, help="Watcher settle_ms (default: 1000)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Watcher event_batch_size (default: 500)")
+    parser.add_argument("--flush-interval-ms", type=int, default=250,
+                        help="Watcher event_flush_interval_ms (default: 250)")
+    parser.add_argument("--warmup-s", type=float, default=1.0, help="Wait after starting a watcher (default: 1)")
+    parser.add_argument("--timeout-s", type=float, default=120,
+                        help="How long to wait for rows once generation finished (default: 120)")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    names = args.scenario or ["all"]
+    if "all" in names:
+        names = list(SCENARIOS)
+    init_db()
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "execution_mode": watcher_service.EXECUTION_MODE,
+        "database_url": os.environ["WATCHER_DATABASE_URL"],
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "scenarios": [],
+    }
+    try:
+        for name in names:
+            print(f"▶️  {name}...", file=sys.stderr)
+            result = run_scenario(name, args)
+            results["scenarios"].append(result)
+            print(f"   {result['files']} files, {result['throughput_rows_per_s']} rows/s, "
+                  f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms, "
+                  f"cpu {result['cpu_percent']}%, rss {result['rss_peak_mb']} MB", file=sys.stderr)
+    finally:
+        watcher_service.cleanup_all_watchers()
+        shutil.rmtree(_TMP, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
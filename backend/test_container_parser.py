@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Generated MP4 and Matroska files for the header parser in app/container_parser.py.
+
+Each case builds a small file in a temporary directory and checks either the
+fields the parser reports or that it hands the file back to MediaInfo (the
+fallback rules: variable frame rate, SBR AAC, oversized and fragmented
+headers). Run with pytest from the backend directory. With pymediainfo
+installed, test_matches_mediainfo also compares every field the parser
+claims against libmediainfo.
+"""
+
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from app.container_parser import parse_tracks, fast_tracks, covers
+from app.schemas import VideoMetadataConfig
+
+# 1 s of 25 fps video (timescale 12800) and 1 s of 48 kHz AAC-LC audio
+TIMESCALE = 1000
+VIDEO_TIMESCALE = 12800
+FRAMES = 25
+FRAME_SIZE = 4000
+AUDIO_FRAMES = 47
+AUDIO_FRAME_SIZE = 300
+
+
+# ---------------------------------------------------------------- MP4 / MOV
+
+def box(kind: bytes, *payload: bytes) -> bytes:
+    data = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(data), kind) + data
+
+
+def full_box(kind: bytes, version: int, *payload: bytes) -> bytes:
+    return box(kind, struct.pack(">I", version << 24), *payload)
+
+
+IDENTITY = struct.pack(">9i", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+
+
+def tkhd(track_id: int, duration: int, width: int = 0, height: int = 0) -> bytes:
+    return full_box(
+        b"tkhd", 0,
+        struct.pack(">IIIII", 0, 0, track_id, 0, duration),
+        b"\0" * 16, IDENTITY, struct.pack(">II", width << 16, height << 16),
+    )
+
+
+def mdhd(timescale: int, duration: int) -> bytes:
+    return full_box(b"mdhd", 0, struct.pack(">IIIIHH", 0, 0, timescale, duration, 0x55C4, 0))
+
+
+def hdlr(handler: bytes) -> bytes:
+    return full_box(b"hdlr", 0, struct.pack(">I4s", 0, handler), b"\0" * 12, b"\0")
+
+
+def stts(*entries: Tuple[int, int]) -> bytes:
+    return full_box(b"stts", 0, struct.pack(">I", len(entries)),
+                    *(struct.pack(">II", count, delta) for count, delta in entries))
+
+
+def stsz(count: int, size: int) -> bytes:
+    return full_box(b"stsz", 0, struct.pack(">II", size, count))
+
+
+def avc1(width: int, height: int) -> bytes:
+    return box(
+        b"avc1", b"\0" * 6, struct.pack(">H", 1), b"\0" * 16, struct.pack(">HH", width, height),
+        struct.pack(">III", 0x480000, 0x480000, 0), struct.pack(">H", 1), b"\0" * 32, struct.pack(">hh", 24, -1),
+    )
+
+
+def esds(audio_object_type: int, channels: int) -> bytes:
+    # AudioSpecificConfig: object type, 48 kHz (index 3), channel configuration
+    config = ((audio_object_type << 11) | (3 << 7) | (channels << 3)).to_bytes(2, "big")
+    decoder_specific = b"\x05" + bytes([len(config)]) + config
+    decoder_config = b"\x04" + bytes([13 + len(decoder_specific)]) + bytes([0x40, 0x15]) + b"\0" * 11 + decoder_specific
+    sl_config = b"\x06\x01\x02"
+    es = struct.pack(">HB", 1, 0) + decoder_config + sl_config
+    return full_box(b"esds", 0, b"\x03" + bytes([len(es)]) + es)
+
+
+def mp4a(channels: int, sample_rate: int, audio_object_type: int) -> bytes:
+    return box(
+        b"mp4a", b"\0" * 6, struct.pack(">H", 1), struct.pack(">HHI", 0, 0, 0),
+        struct.pack(">HHHHI", channels, 16, 0, 0, sample_rate << 16), esds(audio_object_type, channels),
+    )
+
+
+def trak(track_id: int, handler: bytes, timescale: int, media_duration: int, entry: bytes,
+         timing: bytes, sizes: bytes, width: int = 0, height: int = 0) -> bytes:
+    stbl = box(b"stbl", full_box(b"stsd", 0, struct.pack(">I", 1), entry), timing, sizes)
+    return box(
+        b"trak", tkhd(track_id, TIMESCALE, width, height),
+        box(b"mdia", mdhd(timescale, media_duration), hdlr(handler), box(b"minf", stbl)),
+    )
+
+
+def mp4(video_timing: Optional[bytes] = None, audio_object_type: int = 2, fragmented: bool = False,
+        moov_padding: int = 0) -> bytes:
+    """ftyp, moov (one video and one audio track), then mdat."""
+    video = trak(1, b"vide", VIDEO_TIMESCALE, VIDEO_TIMESCALE, avc1(640, 360),
+                 video_timing or stts((FRAMES, VIDEO_TIMESCALE // FRAMES)), stsz(FRAMES, FRAME_SIZE), 640, 360)
+    audio = trak(2, b"soun", 48000, 48000, mp4a(2, 48000, audio_object_type),
+                 stts((AUDIO_FRAMES, 1024)), stsz(AUDIO_FRAMES, AUDIO_FRAME_SIZE))
+    mvhd = full_box(b"mvhd", 0, struct.pack(">IIII", 0, 0, TIMESCALE, TIMESCALE), b"\0" * 80)
+    extra = box(b"mvex", full_box(b"trex", 0, b"\0" * 20)) if fragmented else b""
+    padding = box(b"free", b"\0" * moov_padding) if moov_padding else b""
+    moov = box(b"moov", mvhd, video, audio, extra, padding)
+    ftyp = box(b"ftyp", b"isom", struct.pack(">I", 0x200), b"isomavc1mp41")
+    mdat = box(b"mdat", b"\0" * (FRAMES * FRAME_SIZE + AUDIO_FRAMES * AUDIO_FRAME_SIZE))
+    return ftyp + moov + mdat
+
+
+# ---------------------------------------------------------------- Matroska
+
+def element(element_id: int, *payload: bytes) -> bytes:
+    data = b"".join(payload)
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + b"\x01" + len(data).to_bytes(7, "big") + data
+
+
+def uint(element_id: int, value: int) -> bytes:
+    return element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def mkv(codec_private: Optional[bytes] = None) -> bytes:
+    """EBML header and a Segment with Info, Tracks (H.264 25 fps, AAC) and one Cluster."""
+    header = element(0x1A45DFA3, uint(0x4286, 1), element(0x4282, b"matroska"), uint(0x4287, 4))
+    info = element(0x1549A966, uint(0x2AD7B1, 1000000), element(0x4489, struct.pack(">d", 1000.0)))
+    video = element(
+        0xAE, uint(0xD7, 1), uint(0x83, 1), element(0x86, b"V_MPEG4/ISO/AVC"), uint(0x23E383, 40000000),
+        element(0xE0, uint(0xB0, 1280), uint(0xBA, 720)),
+    )
+    audio = element(
+        0xAE, uint(0xD7, 2), uint(0x83, 2), element(0x86, b"A_AAC"),
+        element(0x63A2, codec_private) if codec_private is not None else b"",
+        element(0xE1, uint(0x9F, 2), element(0xB5, struct.pack(">d", 48000.0))),
+    )
+    cluster = element(0x1F43B675, uint(0xE7, 0))
+    return header + element(0x18538067, info, element(0x1654AE6B, video, audio), cluster)
+
+
+# AudioSpecificConfig of AAC-LC and HE-AAC (SBR), 48 kHz stereo
+AAC_LC_CONFIG = bytes([0x11, 0x90])
+SBR_CONFIG = bytes([0x29, 0x90])
+
+
+# ---------------------------------------------------------------- cases
+
+MP4_CONFIG = VideoMetadataConfig(extract_video_metadata=True)
+MKV_CONFIG = VideoMetadataConfig(
+    extract_video_metadata=True,
+    general_fields=["file_size", "duration"],
+    video_fields=["width", "height", "frame_rate", "display_aspect_ratio"],
+    audio_fields=["channel_s", "sampling_rate"],
+)
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(name: str, data: bytes) -> str:
+        path = os.path.join(tmp_path, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    return write
+
+
+def _by_type(tracks) -> Dict[str, List]:
+    result: Dict[str, List] = {}
+    for track in tracks:
+        result.setdefault(track.track_type, []).append(track)
+    return result
+
+
+def test_mp4_constant_frame_rate(write):
+    path = write("cfr.mp4", mp4())
+    tracks = fast_tracks(path, MP4_CONFIG)
+    assert tracks is not None
+    tracks, reader = tracks
+    assert 0 < reader.bytes_read < os.path.getsize(path)
+    by_type = _by_type(tracks)
+    general, video, audio = by_type["General"][0], by_type["Video"][0], by_type["Audio"][0]
+    assert general.format == "MPEG-4" and general.duration == 1000
+    assert general.file_size == os.path.getsize(path)
+    assert (video.format, video.width, video.height) == ("AVC", 640, 360)
+    assert video.frame_rate == "25.000" and video.frame_count == str(FRAMES)
+    assert video.bit_rate == FRAMES * FRAME_SIZE * 8
+    assert video.display_aspect_ratio == "1.778" and video.pixel_aspect_ratio == "1.000"
+    assert (audio.format, audio.codec_id, audio.channel_s, audio.sampling_rate) == ("AAC", "mp4a-40-2", 2, 48000)
+    assert audio.bit_rate == AUDIO_FRAMES * AUDIO_FRAME_SIZE * 8
+
+
+def test_mp4_variable_frame_rate_falls_back(write):
+    path = write("vfr.mp4", mp4(video_timing=stts((10, 512), (15, 510))))
+    video = _by_type(parse_tracks(path, MP4_CONFIG.probe_max_bytes))["Video"][0]
+    assert "frame_rate" not in video.fields and "bit_rate" not in video.fields
+    assert fast_tracks(path, MP4_CONFIG) is None
+
+
+def test_mp4_sbr_aac_falls_back(write):
+    path = write("sbr.mp4", mp4(audio_object_type=5))
+    audio = _by_type(parse_tracks(path, MP4_CONFIG.probe_max_bytes))["Audio"][0]
+    assert "sampling_rate" not in audio.fields and "bit_rate" not in audio.fields
+    assert fast_tracks(path, MP4_CONFIG) is None
+
+
+def test_mp4_oversized_moov_falls_back(write):
+    path = write("big_moov.mp4", mp4(moov_padding=64 * 1024))
+    assert parse_tracks(path, 32 * 1024) is None
+    assert parse_tracks(path, 1024 * 1024) is not None
+
+
+def test_mp4_fragmented_falls_back(write):
+    path = write("fragmented.mp4", mp4(fragmented=True))
+    assert parse_tracks(path, MP4_CONFIG.probe_max_bytes) is None
+
+
+def test_matroska(write):
+    path = write("plain.mkv", mkv(AAC_LC_CONFIG))
+    result = fast_tracks(path, MKV_CONFIG)
+    assert result is not None
+    by_type = _by_type(result[0])
+    general, video, audio = by_type["General"][0], by_type["Video"][0], by_type["Audio"][0]
+    assert general.format == "Matroska" and general.duration == 1000
+    assert (video.format, video.width, video.height, video.frame_rate) == ("AVC", 1280, 720, "25.000")
+    assert video.display_aspect_ratio == "1.778"
+    assert (audio.format, audio.codec_id, audio.channel_s, audio.sampling_rate) == ("AAC", "A_AAC-2", 2, 48000)
+
+
+def test_matroska_sbr_aac_falls_back(write):
+    path = write("sbr.mkv", mkv(SBR_CONFIG))
+    audio = _by_type(parse_tracks(path, MKV_CONFIG.probe_max_bytes))["Audio"][0]
+    assert "channel_s" not in audio.fields
+    assert fast_tracks(path, MKV_CONFIG) is None
+
+
+def test_matroska_bit_rate_falls_back(write):
+    path = write("bit_rate.mkv", mkv(AAC_LC_CONFIG))
+    config = MKV_CONFIG.model_copy(update={"video_fields": ["width", "bit_rate"]})
+    assert not covers(parse_tracks(path, config.probe_max_bytes), config)
+
+
+def test_header_probe_keys_on_fast_path(write):
+    watcher_service = pytest.importorskip("app.watcher_service")
+    path = write("probe.mp4", mp4())
+    config = MP4_CONFIG.model_copy(update={"fast_parse": True, "probe_mode": "header"})
+    metadata = watcher_service.extract_video_metadata(path, config)
+    assert metadata["video_width"] == 640
+    assert 0 < metadata["probe_bytes_read"] < os.path.getsize(path)
+    # Only the names MediaInfo never fills are left, as with a MediaInfo probe
+    assert set(metadata.get("probe_unresolved", [])) <= {
+        "general_format_name", "video_codec_name", "audio_codec_name", "audio_channels", "audio_sample_rate",
+    }
+
+
+@pytest.mark.parametrize("name, data, config", [
+    ("cfr.mp4", mp4(), MP4_CONFIG),
+    ("plain.mkv", mkv(AAC_LC_CONFIG), MKV_CONFIG),
+    ("no_codec_private.mkv", mkv(), MKV_CONFIG),
+])
+def test_matches_mediainfo(write, name, data, config):
+    pymediainfo = pytest.importorskip("pymediainfo")
+    path = write(name, data)
+    parsed = _by_type(fast_tracks(path, config)[0])
+    reference = _by_type(pymediainfo.MediaInfo.parse(path).tracks)
+    for track_type, tracks in parsed.items():
+        for track, expected in zip(tracks, reference.get(track_type, [])):
+            for field, value in track.fields.items():
+                assert getattr(expected, field) == value, (track_type, field)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
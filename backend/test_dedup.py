@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash index in app/dedup.py.
+
+Each test keeps a fresh index and files in a temporary directory. Cases run
+with the partial (head and tail) comparison and with full hashes only. Run
+with pytest from the backend directory.
+"""
+
+import os
+
+import pytest
+
+from app.dedup import DuplicateIndex
+
+
+@pytest.fixture(params=[4, 0], ids=["partial", "full"])
+def index(tmp_path, request):
+    index = DuplicateIndex(str(tmp_path / "hashes.sqlite"), partial_bytes=request.param)
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(name: str, data: bytes) -> str:
+        path = str(tmp_path / name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    return write
+
+
+def _paths(index):
+    return sorted(row[0] for row in index._conn.execute("SELECT path FROM contents"))
+
+
+def test_copy_is_reported(index, write):
+    first = write("a.mp4", b"x" * 100)
+    assert index.check(first) is None
+    duplicate = index.check(write("b.mp4", b"x" * 100))
+    assert duplicate["duplicate_of"] == first
+    # The first copy itself is not a duplicate of anything
+    assert index.check(first) is None
+
+
+def test_same_ends_different_middle_is_not_a_copy(index, write):
+    index.check(write("a.mp4", b"head" + b"x" * 100 + b"tail"))
+    assert index.check(write("b.mp4", b"head" + b"y" * 100 + b"tail")) is None
+
+
+def test_forgotten_after_delete(index, write):
+    first = write("a.mp4", b"x" * 100)
+    index.check(first)
+    os.remove(first)
+    index.forget(first)
+    assert _paths(index) == []
+    assert index.check(write("b.mp4", b"x" * 100)) is None
+
+
+def test_follows_moved_file(index, write):
+    first = write("a.mp4", b"x" * 100)
+    index.check(first)
+    moved = first + ".moved"
+    os.rename(first, moved)
+    index.rename(first, moved)
+    assert index.check(write("b.mp4", b"x" * 100))["duplicate_of"] == moved
+
+
+def test_follows_moved_directory(index, write, tmp_path):
+    first = write("in/a.mp4", b"x" * 100)
+    sibling = write("in2/c.mp4", b"z" * 100)
+    index.check(first)
+    index.check(sibling)
+    os.rename(tmp_path / "in", tmp_path / "out")
+    index.rename(str(tmp_path / "in"), str(tmp_path / "out"), directory=True)
+    # Only paths below the moved directory change, not those sharing its prefix
+    assert _paths(index) == sorted([str(tmp_path / "out" / "a.mp4"), sibling])
+
+
+def test_rewritten_file_replaces_its_row(index, write):
+    path = write("a.mp4", b"x" * 100)
+    index.check(path)
+    write("a.mp4", b"y" * 120)
+    assert index.check(path) is None
+    assert _paths(index) == [path]
+    # The old content is no longer claimed by the rewritten path
+    assert index.check(write("b.mp4", b"x" * 100)) is None
+
+
+def test_rewritten_with_same_ends(index, write):
+    path = write("a.mp4", b"head" + b"x" * 100 + b"tail")
+    index.check(path)
+    index.check(write("b.mp4", b"head" + b"y" * 100 + b"tail"))  # stores full hashes for both
+    write("a.mp4", b"head" + b"z" * 100 + b"tail")
+    assert index.check(path) is None
+    assert index.check(write("c.mp4", b"head" + b"x" * 100 + b"tail")) is None
+
+
+def test_confirm_with_first_copy_intact(index, write):
+    index.check(write("a.mp4", b"x" * 100))
+    copy = write("b.mp4", b"x" * 100)
+    assert index.confirm(copy, index.check(copy))
+
+
+def test_confirm_when_first_copy_is_gone(index, write):
+    first = write("a.mp4", b"x" * 100)
+    index.check(first)
+    copy = write("b.mp4", b"x" * 100)
+    duplicate = index.check(copy)
+    os.remove(first)  # no deleted event reached the index
+    assert not index.confirm(copy, duplicate)
+    # The copy is the first copy now
+    assert _paths(index) == [copy]
+    assert index.check(write("c.mp4", b"x" * 100))["duplicate_of"] == copy
+
+
+def test_confirm_when_first_copy_changed(index, write):
+    first = write("a.mp4", b"x" * 100)
+    index.check(first)
+    copy = write("b.mp4", b"x" * 100)
+    duplicate = index.check(copy)
+    write("a.mp4", b"w" * 100)
+    assert not index.confirm(copy, duplicate)
+    assert _paths(index) == [copy]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the buffered bulk inserts of app/event_writer.py.
+
+Each test writes to a fresh SQLite database in a temporary directory. Run
+with pytest from the backend directory.
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import event_writer
+from app.db import Base
+from app.event_writer import EventWriter
+from app.models import Event, EventCounter
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(event_writer, "SessionLocal", session_factory)
+    yield session_factory
+    engine.dispose()
+
+
+def _rows(session):
+    with session() as db:
+        return db.execute(select(Event.file_path, Event.validation_result).order_by(Event.id)).all()
+
+
+def _count(session, event_type):
+    with session() as db:
+        counter = db.get(EventCounter, (1, event_type))
+        return counter.count if counter else 0
+
+
+def test_flushes_in_batches(session):
+    writer = EventWriter(1, batch_size=3, flush_interval_ms=60000).start()
+    for i in range(7):
+        writer.add("created", f"/in/{i}.mp4")
+    writer.close()
+    assert [path for path, _ in _rows(session)] == [f"/in/{i}.mp4" for i in range(7)]
+    assert _count(session, "created") == 7
+
+
+def test_bad_row_falls_back_to_per_row_inserts(session):
+    writer = EventWriter(1, batch_size=100, flush_interval_ms=60000).start()
+    writer.add("created", "/in/a.mp4")
+    writer.add("created", None)  # violates NOT NULL, fails the bulk insert
+    writer.add("modified", "/in/b.mp4")
+    writer.close()
+    assert [path for path, _ in _rows(session)] == ["/in/a.mp4", "/in/b.mp4"]
+    # Counters only include the rows that were written
+    assert (_count(session, "created"), _count(session, "modified")) == (1, 1)
+
+
+def test_update_of_a_buffered_row(session):
+    writer = EventWriter(1, flush_interval_ms=60000).start()
+    ref = writer.add("rejected", "/in/a.mp4", validation_result={"status": "pending"}, track=True)
+    assert ref.buffered
+    writer.update(ref, {"status": "done"})
+    writer.close()
+    assert _rows(session) == [("/in/a.mp4", {"status": "done"})]
+    assert ref.id is not None
+
+
+def test_update_of_a_flushed_row(session):
+    writer = EventWriter(1)
+    ref = writer.add("rejected", "/in/a.mp4", validation_result={"status": "pending"}, track=True)
+    assert ref.id is not None and not ref.buffered
+    writer.update(ref, {"status": "done"})
+    assert _rows(session) == [("/in/a.mp4", {"status": "done"})]
+    # An update replaces the result; the counters stay as they were
+    assert _count(session, "rejected") == 1
+
+
+def test_update_of_a_row_that_failed_to_insert(session):
+    writer = EventWriter(1)
+    ref = writer.add("rejected", None, validation_result={"status": "pending"}, track=True)
+    assert ref.id is None
+    writer.update(ref, {"status": "done"})
+    assert _rows(session) == []
+
+
+def test_try_add_never_waits_on_a_full_buffer(session):
+    writer = EventWriter(1, batch_size=2, flush_interval_ms=60000, max_buffered=2)
+    writer._thread = object()  # A flush thread that is not making progress
+    assert writer.try_add("created", "/in/a.mp4") and writer.try_add("created", "/in/b.mp4")
+    assert not writer.try_add("created", "/in/c.mp4", validation_result={"degraded": True})
+    writer._thread = None
+    writer.flush()
+    assert [path for path, _ in _rows(session)] == ["/in/a.mp4", "/in/b.mp4"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
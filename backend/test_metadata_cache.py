@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the file-identity metadata cache in app/metadata_cache.py.
+
+Run with pytest from the backend directory.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from app.metadata_cache import MetadataCache, fields_digest
+from app.schemas import VideoMetadataConfig
+
+CONFIG = VideoMetadataConfig(extract_video_metadata=True)
+DIGEST = fields_digest(CONFIG)
+METADATA = {"video_width": 1920, "video_height": 1080}
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "in.mp4")
+    with open(path, "wb") as f:
+        f.write(b"\0" * 1024)
+    return path
+
+
+def test_hit_for_an_unchanged_file(video):
+    cache = MetadataCache()
+    cache.put(MetadataCache.key_for(video, DIGEST), METADATA)
+    assert cache.get(MetadataCache.key_for(video, DIGEST)) == (True, METADATA)
+
+
+def test_rename_keeps_the_key(video):
+    key = MetadataCache.key_for(video, DIGEST)
+    os.rename(video, video + ".moved")
+    assert MetadataCache.key_for(video + ".moved", DIGEST) == key
+
+
+def test_size_change_misses(video):
+    cache = MetadataCache()
+    cache.put(MetadataCache.key_for(video, DIGEST), METADATA)
+    st = os.stat(video)
+    with open(video, "ab") as f:
+        f.write(b"\0")
+    os.utime(video, ns=(st.st_atime_ns, st.st_mtime_ns))  # same mtime, new size
+    assert cache.get(MetadataCache.key_for(video, DIGEST)) == (False, None)
+
+
+def test_mtime_change_misses(video):
+    cache = MetadataCache()
+    cache.put(MetadataCache.key_for(video, DIGEST), METADATA)
+    st = os.stat(video)
+    os.utime(video, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    assert cache.get(MetadataCache.key_for(video, DIGEST)) == (False, None)
+
+
+def test_field_set_is_part_of_the_key(video):
+    cache = MetadataCache()
+    cache.put(MetadataCache.key_for(video, DIGEST), METADATA)
+    other = fields_digest(CONFIG.model_copy(update={"video_fields": ["width"]}))
+    header = fields_digest(CONFIG.model_copy(update={"probe_mode": "header"}))
+    assert len({DIGEST, other, header}) == 3
+    assert cache.get(MetadataCache.key_for(video, other)) == (False, None)
+
+
+def test_missing_file_has_no_key(tmp_path):
+    assert MetadataCache.key_for(str(tmp_path / "gone.mp4"), DIGEST) is None
+
+
+def test_none_is_not_cached(tmp_path, video):
+    cache = MetadataCache(db_path=str(tmp_path / "cache.sqlite"))
+    key = MetadataCache.key_for(video, DIGEST)
+    cache.put(key, None)
+    assert cache.get(key) == (False, None)
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_tier_survives_restart(tmp_path, video):
+    db_path = str(tmp_path / "cache.sqlite")
+    key = MetadataCache.key_for(video, DIGEST)
+    cache = MetadataCache(db_path=db_path)
+    cache.put(key, METADATA)
+    cache.close()
+    cache = MetadataCache(db_path=db_path)
+    assert cache.get(key) == (True, METADATA)
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_cached_failures_are_purged_on_open(tmp_path, video):
+    db_path = str(tmp_path / "cache.sqlite")
+    key = MetadataCache.key_for(video, DIGEST)
+    MetadataCache(db_path=db_path).close()
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO metadata_cache (key, metadata, last_used) VALUES (?, NULL, 0)",
+                 (MetadataCache._disk_key(key),))
+    conn.commit()
+    conn.close()
+    cache = MetadataCache(db_path=db_path)
+    assert cache.get(key) == (False, None)
+
+
+def test_memory_tier_is_an_lru():
+    cache = MetadataCache(max_entries=2)
+    keys = [(0, inode, 1, 1, DIGEST) for inode in range(3)]
+    for key in keys:
+        cache.put(key, METADATA)
+    assert cache.get(keys[0]) == (False, None)
+    assert cache.get(keys[2]) == (True, METADATA)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
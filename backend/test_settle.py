@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing created/modified bursts in app/settle.py.
+
+Most cases call the tracker's sweep directly instead of waiting on its
+thread, so they do not depend on timing beyond short sleeps past settle_ms.
+Run with pytest from the backend directory.
+"""
+
+import time
+
+import pytest
+
+from app.settle import SettleTracker
+
+SETTLE_MS = 50
+
+
+@pytest.fixture
+def settled():
+    return []
+
+
+@pytest.fixture
+def tracker(settled):
+    return SettleTracker(lambda event_type, path: settled.append((event_type, path)), settle_ms=SETTLE_MS)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "in.mp4")
+    with open(path, "wb") as f:
+        f.write(b"\0" * 1024)
+    return path
+
+
+def _append(path: str, size: int = 1024) -> None:
+    with open(path, "ab") as f:
+        f.write(b"\0" * size)
+
+
+def _wait_settle() -> None:
+    time.sleep(SETTLE_MS / 1000.0 * 1.5)
+
+
+def test_burst_is_reported_once_as_created(tracker, video):
+    for event_type in ("created", "modified", "modified", "modified"):
+        assert tracker.touch(event_type, video)
+    assert tracker._sweep() == []
+    _wait_settle()
+    assert tracker._sweep() == [("created", video)]
+    assert tracker.pending_count() == 0
+
+
+def test_modifications_only_are_reported_as_modified(tracker, video):
+    tracker.touch("modified", video)
+    tracker.touch("modified", video)
+    _wait_settle()
+    assert tracker._sweep() == [("modified", video)]
+
+
+def test_growing_file_waits_until_stable(tracker, video):
+    tracker.touch("created", video)
+    _wait_settle()
+    _append(video)
+    assert tracker._sweep() == []
+    _wait_settle()
+    assert tracker._sweep() == [("created", video)]
+
+
+def test_close_after_write_settles_without_waiting(settled, video):
+    tracker = SettleTracker(lambda *args: settled.append(args), settle_ms=60000)
+    tracker.touch("created", video)
+    tracker.closed(video)
+    assert tracker._sweep() == [("created", video)]
+
+
+def test_write_after_close_keeps_waiting(settled, video):
+    tracker = SettleTracker(lambda *args: settled.append(args), settle_ms=60000)
+    tracker.touch("created", video)
+    tracker.closed(video)
+    _append(video)
+    tracker.touch("modified", video)
+    assert tracker._sweep() == []
+
+
+def test_deleted_files_are_forgotten(tracker, video):
+    tracker.touch("created", video)
+    tracker.discard(video)
+    other = video + ".part"
+    tracker.touch("created", other)  # never existed on disk
+    _wait_settle()
+    assert tracker._sweep() == []
+    assert tracker.pending_count() == 0
+
+
+def test_max_pending(settled, tmp_path):
+    tracker = SettleTracker(lambda *args: settled.append(args), settle_ms=SETTLE_MS, max_pending=1)
+    assert tracker.touch("created", str(tmp_path / "a.mp4"))
+    assert tracker.touch("modified", str(tmp_path / "a.mp4"))
+    assert not tracker.touch("created", str(tmp_path / "b.mp4"))
+
+
+def test_stop_flushes_unsettled_files(settled, video):
+    tracker = SettleTracker(lambda *args: settled.append(args), settle_ms=60000).start()
+    tracker.touch("created", video)
+    tracker.touch("modified", video)
+    tracker.stop()
+    assert settled == [("created", video)]
+
+
+def test_thread_reports_settled_files(tracker, settled, video):
+    tracker.start()
+    try:
+        tracker.touch("created", video)
+        tracker.touch("modified", video)
+        deadline = time.monotonic() + 5
+        while not settled and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        tracker.stop()
+    assert settled == [("created", video)]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
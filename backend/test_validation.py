@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Table tests for the compiled validation rules in app/validation.py.
+
+Every case runs the same rules and metadata through a copy of the per-event
+interpreter that ValidationPlan replaced (reference_validate below) and
+through ValidationPlan.evaluate, with validation_fail_fast off and on. Run
+with pytest from the backend directory.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from app.schemas import ValidationRule
+from app.validation import ValidationPlan, _REORDER_EVERY
+
+
+def reference_validate(metadata: Dict[str, Any], rules: List[ValidationRule]) -> Tuple[bool, Dict[str, Any]]:
+    """The rule interpreter as it was before rules were compiled, minus its prints."""
+    rules_checked = []
+    failed_rules = []
+
+    for rule in rules:
+        if rule.field not in metadata:
+            continue
+
+        field_value = metadata[rule.field]
+        rules_checked.append(rule.field)
+
+        if rule.field in ['general_duration', 'video_duration'] and isinstance(field_value, (int, float)):
+            field_value = field_value / 1000.0
+
+        try:
+            if isinstance(rule.value, (int, float)) and isinstance(field_value, str):
+                field_value = float(field_value)
+            elif isinstance(rule.value, str) and isinstance(field_value, (int, float)):
+                field_value = str(field_value)
+        except (ValueError, TypeError):
+            continue
+
+        if rule.operator == ">":
+            rule_passed = field_value > rule.value
+        elif rule.operator == "<":
+            rule_passed = field_value < rule.value
+        elif rule.operator == ">=":
+            rule_passed = field_value >= rule.value
+        elif rule.operator == "<=":
+            rule_passed = field_value <= rule.value
+        elif rule.operator == "==":
+            rule_passed = field_value == rule.value
+        elif rule.operator == "!=":
+            rule_passed = field_value != rule.value
+        elif rule.operator == "in":
+            rule_passed = field_value in rule.value
+        elif rule.operator == "not_in":
+            rule_passed = field_value not in rule.value
+        else:
+            continue
+
+        if rule.action == "reject":
+            rule_passed = not rule_passed
+
+        if not rule_passed:
+            failed_rules.append({
+                "field": rule.field,
+                "operator": rule.operator,
+                "expected_value": rule.value,
+                "actual_value": field_value,
+                "action": rule.action,
+                "description": rule.description
+            })
+
+    rejected = any(rule["action"] == "reject" for rule in failed_rules)
+    validation_result = {
+        "valid": not rejected,
+        "rules_checked": rules_checked,
+        "failed_rules": failed_rules,
+        "passed": not rejected
+    }
+    return not rejected, validation_result
+
+
+def rule(field: str, operator: str, value: Any, action: str = "accept", description: str = None) -> ValidationRule:
+    return ValidationRule(field=field, operator=operator, value=value, action=action, description=description)
+
+
+HD = {
+    "video_width": 1920, "video_height": 1080, "video_format": "AVC", "video_frame_rate": "25.000",
+    "general_duration": 95000, "audio_channel_s": 2, "general_format": "MPEG-4",
+}
+SD = {**HD, "video_width": 720, "video_height": 576, "video_format": "MPEG-2 Video", "general_duration": 4000}
+
+RULE_SETS = {
+    "accept_thresholds": [
+        rule("video_width", ">=", 1280), rule("video_height", ">=", 720, description="HD only"),
+    ],
+    "reject_thresholds": [
+        rule("video_width", "<", 1280, action="reject"), rule("general_duration", "<", 10, action="reject"),
+    ],
+    "membership": [
+        rule("video_format", "in", ["AVC", "HEVC"], action="accept"),
+        rule("video_format", "not_in", ["AVC", "HEVC"], action="reject"),
+        rule("general_format", "in", "MPEG-4 Matroska"),
+    ],
+    "coercion": [
+        # Numeric strings against numbers, numbers against strings, durations in seconds
+        rule("video_frame_rate", "==", 25), rule("audio_channel_s", "==", "2"),
+        rule("video_duration", ">", 60), rule("general_duration", "<=", 100, action="reject"),
+    ],
+    "missing_fields": [
+        rule("video_bit_depth", ">", 8, action="reject"), rule("audio_format", "==", "AAC"),
+        rule("video_width", "!=", 720, action="reject"),
+    ],
+    "unknown_operator_and_bad_number": [
+        rule("video_width", "~", 1920, action="reject"), rule("video_frame_rate", ">", 24, action="reject"),
+    ],
+    "mixed": [
+        rule("video_format", "in", ["MPEG-2 Video"], action="reject", description="no MPEG-2"),
+        rule("video_width", ">=", 1920), rule("general_duration", "<", 5, action="reject"),
+        rule("video_height", "in", [576, 1080]), rule("audio_channel_s", ">", 2),
+    ],
+}
+
+METADATA = {
+    "hd": HD,
+    "sd": SD,
+    "empty": {},
+    "variable_frame_rate": {**HD, "video_frame_rate": "", "video_duration": 95000},
+}
+
+CASES = [(rules, metadata) for rules in RULE_SETS for metadata in METADATA]
+
+
+@pytest.mark.parametrize("rules, metadata", CASES)
+def test_matches_reference(rules, metadata):
+    expected = reference_validate(METADATA[metadata], RULE_SETS[rules])
+    assert ValidationPlan(RULE_SETS[rules]).evaluate(METADATA[metadata]) == expected
+
+
+@pytest.mark.parametrize("rules, metadata", CASES)
+def test_fail_fast_matches_reference_verdict(rules, metadata):
+    _, expected = reference_validate(METADATA[metadata], RULE_SETS[rules])
+    is_valid, result = ValidationPlan(RULE_SETS[rules], fail_fast=True).evaluate(METADATA[metadata])
+    assert is_valid == expected["valid"] == result["valid"] == result["passed"]
+    # Only the rules that ran are reported, in definition order
+    assert set(result["rules_checked"]) <= set(expected["rules_checked"])
+    assert all(failure in expected["failed_rules"] for failure in result["failed_rules"])
+    assert [f for f in expected["failed_rules"] if f in result["failed_rules"]] == result["failed_rules"]
+    # Evaluation stops at the first rejecting rule
+    assert sum(failure["action"] == "reject" for failure in result["failed_rules"]) == (0 if is_valid else 1)
+
+
+def test_reordering_keeps_results():
+    rules = RULE_SETS["mixed"]
+    plan = ValidationPlan(rules)
+    for _ in range(_REORDER_EVERY + 1):
+        for metadata in METADATA.values():
+            assert plan.evaluate(metadata) == reference_validate(metadata, rules)
+
+
+def test_failed_rules_contents():
+    _, result = ValidationPlan(RULE_SETS["mixed"]).evaluate(SD)
+    assert result["failed_rules"] == [
+        {"field": "video_format", "operator": "in", "expected_value": ["MPEG-2 Video"],
+         "actual_value": "MPEG-2 Video", "action": "reject", "description": "no MPEG-2"},
+        {"field": "video_width", "operator": ">=", "expected_value": 1920,
+         "actual_value": 720, "action": "accept", "description": None},
+        {"field": "general_duration", "operator": "<", "expected_value": 5,
+         "actual_value": 4.0, "action": "reject", "description": None},
+        {"field": "audio_channel_s", "operator": ">", "expected_value": 2,
+         "actual_value": 2, "action": "accept", "description": None},
+    ]
+
+
+def test_incomparable_types_are_skipped():
+    # The old interpreter raised TypeError here and lost the event
+    rules = [rule("video_width", ">", [1280], action="reject"), rule("video_height", "<", 720, action="reject")]
+    is_valid, result = ValidationPlan(rules).evaluate(SD)
+    assert not is_valid
+    assert result["rules_checked"] == ["video_width", "video_height"]
+    assert [failure["field"] for failure in result["failed_rules"]] == ["video_height"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -36,3 +36,23 @@ api.interceptors.response.use(
     return Promise.reject(error);
   }
 );
+
+// Subscribe to live events over Server-Sent Events. EventSource cannot send
+// headers, so the token goes in the query string; on reconnect the browser
+// resumes from the last received id via the Last-Event-ID header.
+export function openEventStream(
+  params: { afterId?: number; watcherId?: number; eventType?: string },
+  onEvent: (event: any) => void
+): () => void {
+  const query = new URLSearchParams();
+  const token = localStorage.getItem('token');
+  if (token) query.set('token', token);
+  if (params.afterId !== undefined) query.set('after_id', String(params.afterId));
+  if (params.watcherId !== undefined) query.set('watcher_id', String(params.watcherId));
+  if (params.eventType) query.set('event_type', params.eventType);
+  const source = new EventSource(`${api.defaults.baseURL}/events/stream?${query.toString()}`);
+  source.addEventListener('event', (message) => {
+    onEvent(JSON.parse((message as MessageEvent).data));
+  });
+  return () => source.close();
+}
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from 'react';
-import { api } from '../api';
+import { api, openEventStream } from '../api';
 
 type Event = { 
   id: number; 
@@ -11,6 +11,8 @@ type Event = {
   validation_result?: any;
 };
 
+const MAX_EVENTS = 500;
+
 export default function Events() {
   const [items, setItems] = useState<Event[]>([]);
   const [expandedEvents, setExpandedEvents] = useState<Set<number>>(new Set());
@@ -35,15 +37,28 @@ export default function Events() {
       }
       
       setItems(data);
+      return data as Event[];
     } catch (error) {
       console.error('Failed to load events:', error);
+      return [];
     }
   };
 
   useEffect(() => {
-    load();
-    const interval = setInterval(load, 3000);
-    return () => clearInterval(interval);
+    let close: (() => void) | null = null;
+    let cancelled = false;
+    // Load the latest page once, then receive new events as they are persisted
+    load().then((initial) => {
+      if (cancelled) return;
+      const afterId = initial.length > 0 ? initial[0].id : undefined;
+      close = openEventStream({ afterId }, (event: Event) => {
+        setItems((prev) => (prev.some((e) => e.id === event.id) ? prev : [event, ...prev].slice(0, MAX_EVENTS)));
+      });
+    });
+    return () => {
+      cancelled = true;
+      if (close) close();
+    };
   }, []);
 
   const toggleEventExpansion = (eventId: number) => {
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { api } from '../api';
+import { api, openEventStream } from '../api';
 import { Link } from 'react-router-dom';
 
 type Watcher = { id: number; name: string; path: string; config: any; video_config?: any };
@@ -86,6 +86,11 @@ export default function Watchers() {
 
   useEffect(() => {
     load();
+    // Keep the latest event per watcher current without re-fetching
+    const close = openEventStream({}, (event: EventItem) => {
+      setLatestByWatcher((prev) => ({ ...prev, [event.watcher_id]: event }));
+    });
+    return close;
   }, []);
 
   // creation moved to dedicated page